@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from attendees.models import Attendee, Category
+from attendees.models import Attendee, Category, TicketEmail
 
 
 @admin.register(Category)
@@ -15,3 +15,10 @@ class AttendeeAdmin(admin.ModelAdmin):
     list_display = ["name", "branch", "event", "cc", "has_checked_in", "included_balance", "created_at"]
     list_filter = ["branch", "event", "has_checked_in"]
     search_fields = ["name", "cc", "email"]
+
+
+@admin.register(TicketEmail)
+class TicketEmailAdmin(admin.ModelAdmin):
+    list_display = ["attendee", "status", "attempts", "next_attempt_at", "sent_at", "updated_at"]
+    list_filter = ["status"]
+    search_fields = ["attendee__name", "attendee__cc", "attendee__email"]
@@ -1,24 +1,880 @@
-from django.db import transaction
+import csv
+import hashlib
+import io
+import re
+import zipfile
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+
+import openpyxl
+from openpyxl.utils.exceptions import InvalidFileException
+
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, Count, IntegerField, Max, Q, Value, When
+from django.db.models.expressions import RawSQL
 from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from django.utils.dateparse import parse_datetime
 
-from attendees.models import Attendee
+from attendees.models import Attendee, Category, TicketEmail, attendee_counter_deltas
+from attendees.search import normalize_search_cc, normalize_search_text
+from events.application import (
+    bump_event_counters,
+    bump_operator_check_ins,
+    get_event_counters,
+    get_operator_check_ins,
+    lock_event_counters,
+)
+from events.models import EventCategoryCounters
+from media_assets.application import bulk_delete_assets
+from ticketing.application import TicketEmailSender, send_attendee_ticket_email
+from ticketing.qr_signing import is_signed_qr_code, verify_signed_qr_code
+
+
+TICKET_EMAIL_BACKOFF_SECONDS = 30
+TICKET_EMAIL_MAX_BACKOFF_SECONDS = 3600
+TICKET_EMAIL_SENDING_TIMEOUT = timedelta(minutes=10)
+OFFLINE_MANIFEST_FIELDS = ("id", "qr", "cc", "category", "balance", "checked_in")
+OFFLINE_MANIFEST_HASH_LENGTH = 16
+# Rows committed slightly out of timestamp order are resent instead of missed.
+OFFLINE_MANIFEST_OVERLAP = timedelta(seconds=5)
+OFFLINE_SYNC_MAX_SCANS = 500
+# Offline scan times are only trusted from shortly before the event starts and within the last day.
+OFFLINE_SCAN_EARLY_GRACE = timedelta(hours=2)
+OFFLINE_SCAN_MAX_AGE = timedelta(days=1)
+CHECK_IN_BATCH_MAX_CODES = 200
+CHECK_IN_TOKEN_SALT = "attendees.check_in"
+CHECK_IN_TOKEN_MAX_AGE = 120
+QR_REISSUE_BATCH_SIZE = 500
+LIVE_COUNTERS_POLL_SECONDS = 2
+LIST_CURSOR_SALT = "attendees.list_cursor"
+SEARCH_RESULTS_LIMIT = 20
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_HEADERS = (
+    "NOMBRE",
+    "CEDULA",
+    "TELEFONO",
+    "CORREO",
+    "CATEGORIA",
+    "PRECIO PAGADO",
+    "BALANCE",
+    "ESTADO",
+    "FECHA REGISTRO",
+    "FECHA INGRESO",
+    "VERIFICADO POR",
+)
+EXPORT_DATETIME_FORMAT = "%d/%m/%Y %H:%M"
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_REPORTED_ERRORS = 500
+# Header aliases after normalize_search_text, so "Cédula" and "CEDULA" both map to cc.
+IMPORT_COLUMNS = {
+    "nombre": "name",
+    "nombre completo": "name",
+    "cedula": "cc",
+    "cc": "cc",
+    "documento": "cc",
+    "telefono": "phone",
+    "celular": "phone",
+    "correo": "email",
+    "email": "email",
+    "categoria": "category",
+    "precio pagado": "paid_amount",
+    "precio": "paid_amount",
+}
+IMPORT_REQUIRED_COLUMNS = {"name": "NOMBRE", "cc": "CEDULA", "category": "CATEGORIA"}
+IMPORT_DUPLICATE_MESSAGE = "Ya existe un asistente con esa cedula en este evento."
+IMPORT_MAX_AMOUNT = Decimal("100000000")
+# "15.000" or "15.000,50" as typed in es-CO; anything else is read with "." as the decimal point.
+LOCAL_AMOUNT_RE = re.compile(r"^\d{1,3}(\.\d{3})+(,\d+)?$")
+# InnoDB drops shorter tokens from FULLTEXT indexes (innodb_ft_min_token_size).
+FULLTEXT_MIN_WORD_LENGTH = 3
+MANIFEST_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
 
 
-@transaction.atomic
 def check_in_attendee(attendee, user):
     if attendee.has_checked_in:
         return attendee, False
 
+    # The conditional UPDATE is the only check-in write, so concurrent scans have exactly one winner.
+    now = timezone.now()
+    with transaction.atomic():
+        lock_event_counters(attendee.event_id)
+        updated = Attendee.objects.filter(pk=attendee.pk, has_checked_in=False).update(
+            has_checked_in=True,
+            checked_in_at=now,
+            checked_in_by=user,
+            updated_at=now,
+        )
+        if updated:
+            bump_event_counters(attendee.event_id, attendee.category_id, checked_in=1)
+            bump_operator_check_ins(attendee.event_id, user.pk, timezone.localdate(now), 1)
+    if not updated:
+        attendee.refresh_from_db(fields=["has_checked_in", "checked_in_at", "checked_in_by", "updated_at"])
+        return attendee, False
+
     attendee.has_checked_in = True
-    attendee.checked_in_at = timezone.now()
+    attendee.checked_in_at = now
     attendee.checked_in_by = user
-    attendee.save(update_fields=["has_checked_in", "checked_in_at", "checked_in_by"])
+    attendee.updated_at = now
     return attendee, True
 
 
+def issue_check_in_token(attendee):
+    return signing.dumps(
+        {
+            "id": attendee.pk,
+            "event": attendee.event_id,
+            "name": attendee.name,
+            "cc": attendee.cc,
+            "category": attendee.category.name,
+            "category_id": attendee.category_id,
+            "balance": attendee.included_balance,
+        },
+        salt=CHECK_IN_TOKEN_SALT,
+        compress=True,
+    )
+
+
+def redeem_check_in_token(event, user, token):
+    # The signed preview already carries everything confirm needs, so only the conditional UPDATE runs.
+    try:
+        ticket = signing.loads(token, salt=CHECK_IN_TOKEN_SALT, max_age=CHECK_IN_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    if not isinstance(ticket, dict) or ticket.get("event") != event.pk:
+        return None
+
+    now = timezone.now()
+    with transaction.atomic():
+        lock_event_counters(event.pk)
+        updated = Attendee.objects.filter(pk=ticket["id"], event=event, has_checked_in=False).update(
+            has_checked_in=True,
+            checked_in_at=now,
+            checked_in_by=user,
+            updated_at=now,
+        )
+        if updated:
+            bump_event_counters(event.pk, ticket.get("category_id"), checked_in=1)
+            bump_operator_check_ins(event.pk, user.pk, timezone.localdate(now), 1)
+    if updated:
+        return {**ticket, "status": "checked_in", "created": True, "checked_in_at": now}
+    # The token is only a snapshot: the row tells whether someone got in first or the attendee was deleted.
+    current = Attendee.objects.filter(pk=ticket["id"], event=event).values("checked_in_at").first()
+    if current is None:
+        return {**ticket, "status": "not_found", "created": False, "checked_in_at": None}
+    return {**ticket, "status": "already_checked_in", "created": False, "checked_in_at": current["checked_in_at"]}
+
+
+def _is_rejected_signed_code(event, code):
+    # Forged or foreign-event signed codes are turned away without touching the database.
+    if not is_signed_qr_code(code):
+        return False
+    signed_ids = verify_signed_qr_code(code)
+    return signed_ids is None or signed_ids[0] != event.pk
+
+
+def _is_event_qr_code(branch, event, code):
+    return code.startswith(f"{branch.code_prefix}-{event.qr_prefix}-")
+
+
 def get_attendee_for_branch(branch, event, code_or_cc):
-    queryset = Attendee.objects.filter(branch=branch, event=event).select_related("category")
-    return queryset.filter(qr_code=code_or_cc).first() or queryset.filter(cc=code_or_cc).first()
+    # Attendees always share their event's branch, so (event, qr_code) and (event, cc) are enough.
+    if not code_or_cc or event.branch_id != branch.pk:
+        return None
+    queryset = Attendee.objects.filter(event=event).select_related("category").order_by()
+    if is_signed_qr_code(code_or_cc):
+        if _is_rejected_signed_code(event, code_or_cc):
+            return None
+        return queryset.filter(pk=verify_signed_qr_code(code_or_cc)[1], qr_code=code_or_cc).first()
+    if _is_event_qr_code(branch, event, code_or_cc):
+        return queryset.filter(qr_code=code_or_cc).first()
+
+    # Codes issued before a prefix change still resolve here; a QR match wins over a cedula.
+    matches = list(queryset.filter(Q(qr_code=code_or_cc) | Q(cc=code_or_cc))[:2])
+    for attendee in matches:
+        if attendee.qr_code == code_or_cc:
+            return attendee
+    return matches[0] if matches else None
+
+
+def _resolve_attendee_codes(branch, event, codes):
+    # One IN query for the whole list, each code looked up once; a QR match wins over a cedula.
+    lookup_codes = [code for code in dict.fromkeys(codes) if code and not _is_rejected_signed_code(event, code)]
+    attendees = []
+    if lookup_codes and event.branch_id == branch.pk:
+        attendees = list(
+            Attendee.objects.filter(event=event)
+            .filter(Q(qr_code__in=lookup_codes) | Q(cc__in=lookup_codes))
+            .select_related("category", "checked_in_by")
+            .order_by()
+        )
+    by_qr_code = {attendee.qr_code: attendee for attendee in attendees}
+    by_cc = {attendee.cc: attendee for attendee in attendees}
+    return [(code, by_qr_code.get(code) or by_cc.get(code)) for code in codes]
+
+
+def check_in_attendees_batch(branch, event, user, codes):
+    # Every submitted code gets its own result, in order.
+    codes = [str(code or "").strip() for code in codes]
+    resolved = _resolve_attendee_codes(branch, event, codes)
+    attendees = list({attendee.pk: attendee for _, attendee in resolved if attendee}.values())
+
+    pending_ids = {attendee.pk for _, attendee in resolved if attendee and not attendee.has_checked_in}
+    now = timezone.now()
+    won_ids = set()
+    if pending_ids:
+        with transaction.atomic():
+            lock_event_counters(event.pk)
+            # The rows still pending under the lock are exactly the ones this batch wins.
+            won_ids = set(
+                Attendee.objects.filter(pk__in=pending_ids, has_checked_in=False)
+                .select_for_update()
+                .values_list("pk", flat=True)
+            )
+            if won_ids:
+                Attendee.objects.filter(pk__in=won_ids).update(
+                    has_checked_in=True,
+                    checked_in_at=now,
+                    checked_in_by=user,
+                    updated_at=now,
+                )
+            lost_ids = pending_ids - won_ids
+            if lost_ids:
+                # Another scanner got these first; report who.
+                current = {
+                    row["pk"]: row
+                    for row in Attendee.objects.filter(pk__in=lost_ids).values("pk", "checked_in_at", "checked_in_by")
+                }
+                for _, attendee in resolved:
+                    if attendee and attendee.pk in current:
+                        attendee.has_checked_in = True
+                        attendee.checked_in_at = current[attendee.pk]["checked_in_at"]
+                        attendee.checked_in_by_id = current[attendee.pk]["checked_in_by"]
+            won_by_category = Counter(attendee.category_id for attendee in attendees if attendee.pk in won_ids)
+            for category_id, checked_in in won_by_category.items():
+                bump_event_counters(event.pk, category_id, checked_in=checked_in)
+            bump_operator_check_ins(event.pk, user.pk, timezone.localdate(now), len(won_ids))
+
+    results = []
+    seen_ids = set()
+    for code, attendee in resolved:
+        if attendee is None:
+            results.append({"code": code, "status": "not_found", "attendee": None})
+            continue
+        if attendee.pk in seen_ids:
+            results.append({"code": code, "status": "duplicate", "attendee": attendee})
+            continue
+        seen_ids.add(attendee.pk)
+        checked_in = attendee.pk in won_ids
+        if checked_in:
+            attendee.has_checked_in = True
+            attendee.checked_in_at = now
+            attendee.checked_in_by = user
+            attendee.updated_at = now
+        results.append(
+            {"code": code, "status": "checked_in" if checked_in else "already_checked_in", "attendee": attendee}
+        )
+    return results
+
+
+def _progress(checked_in, total):
+    return int((checked_in / total) * 100) if total else 0
+
+
+def get_live_counters_version(event):
+    return _manifest_version(get_event_counters(event.pk).updated_at)
+
+
+def get_live_counters(event, user):
+    # Reads the maintained counter rows only; nothing here aggregates over attendees.
+    counters = get_event_counters(event.pk)
+    categories = [
+        {
+            "name": row.category.name,
+            "total": row.attendees,
+            "checked_in": row.checked_in,
+            "pending": row.attendees - row.checked_in,
+            "progress": _progress(row.checked_in, row.attendees),
+        }
+        for row in EventCategoryCounters.objects.filter(event_id=event.pk, attendees__gt=0)
+        .select_related("category")
+        .order_by("category__name")
+    ]
+    return {
+        "version": _manifest_version(counters.updated_at),
+        "total": counters.attendees,
+        "checked_in": counters.checked_in,
+        "pending": counters.attendees - counters.checked_in,
+        "progress": _progress(counters.checked_in, counters.attendees),
+        "categories": categories,
+        "my_verifications": get_operator_check_ins(event.pk, user.pk, timezone.localdate()),
+    }
+
+
+def _name_search_filter(words):
+    # Each word must start a word of the name. On MySQL longer words go through the FULLTEXT index.
+    against = ""
+    if connection.vendor == "mysql":
+        against = " ".join(f"+{word}*" for word in words if len(word) >= FULLTEXT_MIN_WORD_LENGTH)
+        if against:
+            words = [word for word in words if len(word) < FULLTEXT_MIN_WORD_LENGTH]
+    condition = Q(search_name_match__gt=0) if against else Q()
+    for word in words:
+        condition &= Q(search_name__startswith=word) | Q(search_name__contains=f" {word}")
+    return condition, against
+
+
+def search_attendees(queryset, term):
+    # Matches on the normalized columns kept by Attendee.save, so "jose" finds "José" and
+    # "1.234.567" finds "1234567". Rows are annotated with search_rank: exact cc first, then prefixes.
+    name_term = normalize_search_text(term)
+    cc_term = normalize_search_cc(term)
+    if not cc_term:
+        return queryset.annotate(search_rank=Value(2, output_field=IntegerField()))
+
+    against = ""
+    if cc_term.isdigit():
+        condition = Q(search_cc__startswith=cc_term)
+    else:
+        condition, against = _name_search_filter(name_term.split())
+        if any(char.isdigit() for char in cc_term):
+            condition |= Q(search_cc__startswith=cc_term)
+    if against:
+        queryset = queryset.annotate(
+            search_name_match=RawSQL("MATCH(search_name) AGAINST (%s IN BOOLEAN MODE)", (against,))
+        )
+    return queryset.filter(condition).annotate(
+        search_rank=Case(
+            When(search_cc=cc_term, then=Value(0)),
+            When(Q(search_cc__startswith=cc_term) | Q(search_name__startswith=name_term), then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        )
+    )
+
+
+def search_attendee_results(event, term, limit=SEARCH_RESULTS_LIMIT):
+    attendees = search_attendees(
+        Attendee.objects.filter(event=event).select_related("category"),
+        term,
+    ).order_by("search_rank", "search_name", "pk")[:limit]
+    return [
+        {
+            "id": attendee.pk,
+            "name": attendee.name,
+            "cc": attendee.cc,
+            "category": attendee.category.name,
+            "checked_in": attendee.has_checked_in,
+            "qr_code": attendee.qr_code,
+        }
+        for attendee in attendees
+    ]
+
+
+def get_attendee_list_version(event):
+    # Every attendee write stamps updated_at, the counters row covers deletes, and the email column shown in the
+    # list follows its TicketEmail rows.
+    last_change = Attendee.objects.filter(event=event).aggregate(last=Max("updated_at"))["last"]
+    last_email = TicketEmail.objects.filter(attendee__event=event).aggregate(last=Max("updated_at"))["last"]
+    total = get_event_counters(event.pk).attendees
+    return f"{total}-{_manifest_version(last_change)}-{_manifest_version(last_email)}"
+
+
+def _dump_list_cursor(**state):
+    return signing.dumps(state, salt=LIST_CURSOR_SALT, compress=True)
+
+
+def _load_list_cursor(cursor):
+    if not cursor:
+        return {}
+    try:
+        state = signing.loads(cursor, salt=LIST_CURSOR_SALT)
+    except signing.BadSignature:
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def paginate_attendees(queryset, *, cursor="", per_page=10, count_total=None, version=None):
+    # Keyset pages over (-created_at, -id). The cursor carries the page offset and the total, so paging
+    # deeper never runs OFFSET scans and the total is only counted once per listing version.
+    state = _load_list_cursor(cursor)
+    direction = state.get("d", "")
+    total = state.get("t") if state.get("v") == version else None
+    if total is None and count_total is not None:
+        total = count_total()
+    newest_first = queryset.order_by("-created_at", "-id")
+    oldest_first = queryset.order_by("created_at", "id")
+    anchor = parse_datetime(state.get("c") or "") if direction in {"next", "prev"} else None
+
+    if direction == "last":
+        # The tail is read from the oldest end, sized by the current total, so new rows never shift it.
+        size = (total % per_page or per_page) if total else per_page
+        rows = list(oldest_first[: size + 1])
+        has_previous = len(rows) > size
+        rows = rows[:size][::-1]
+        has_next = False
+        start = max((total or 0) - len(rows), 0)
+    elif anchor and direction == "prev":
+        rows = list(
+            oldest_first.filter(Q(created_at__gt=anchor) | Q(created_at=anchor, id__gt=state.get("i")))[
+                : per_page + 1
+            ]
+        )
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = True
+        start = max(state.get("s", 0), 0) if has_previous else 0
+    elif anchor:
+        rows = list(
+            newest_first.filter(Q(created_at__lt=anchor) | Q(created_at=anchor, id__lt=state.get("i")))[
+                : per_page + 1
+            ]
+        )
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = True
+        start = max(state.get("s", 0), 0)
+    else:
+        rows = list(newest_first[: per_page + 1])
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = False
+        start = 0
+
+    next_cursor = prev_cursor = last_cursor = ""
+    if rows and has_next:
+        last = rows[-1]
+        next_cursor = _dump_list_cursor(
+            d="next",
+            c=last.created_at.isoformat(),
+            i=last.pk,
+            s=start + len(rows),
+            t=total,
+            v=version,
+        )
+        last_cursor = _dump_list_cursor(d="last", t=total, v=version)
+    if rows and has_previous:
+        first = rows[0]
+        prev_cursor = _dump_list_cursor(
+            d="prev",
+            c=first.created_at.isoformat(),
+            i=first.pk,
+            s=max(start - per_page, 0),
+            t=total,
+            v=version,
+        )
+    return {
+        "rows": rows,
+        "total": total,
+        "start": start + 1 if rows else 0,
+        "end": start + len(rows),
+        "has_next": has_next,
+        "has_previous": has_previous,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+        "last_cursor": last_cursor,
+    }
+
+
+def iter_attendee_export_rows(attendees):
+    # Shared by the Excel and CSV exports; reads plain tuples in chunks so memory stays flat.
+    tz = timezone.get_current_timezone()
+    rows = attendees.order_by("-created_at", "-id").values_list(
+        "name",
+        "cc",
+        "phone",
+        "email",
+        "category__name",
+        "paid_amount",
+        "included_balance",
+        "has_checked_in",
+        "created_at",
+        "checked_in_at",
+        "checked_in_by__username",
+    )
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        name, cc, phone, email, category, paid, balance, checked_in, created_at, checked_in_at, verifier = row
+        yield (
+            name,
+            cc,
+            phone or "",
+            email or "",
+            category,
+            float(paid or 0),
+            balance,
+            "INGRESO" if checked_in else "PENDIENTE",
+            created_at.astimezone(tz).strftime(EXPORT_DATETIME_FORMAT),
+            checked_in_at.astimezone(tz).strftime(EXPORT_DATETIME_FORMAT) if checked_in_at else "",
+            verifier or "",
+        )
+
+
+def _import_header(cells):
+    columns = [IMPORT_COLUMNS.get(normalize_search_text(cell)) for cell in cells]
+    missing = [label for field, label in IMPORT_REQUIRED_COLUMNS.items() if field not in columns]
+    if missing:
+        raise ValueError(f"Faltan columnas en el archivo: {', '.join(missing)}.")
+    return columns
+
+
+def _iter_sheet_rows(file_obj, filename):
+    if filename.lower().endswith(".xlsx"):
+        try:
+            workbook = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
+        except (InvalidFileException, zipfile.BadZipFile, KeyError) as exc:
+            raise ValueError("No se pudo leer el archivo de Excel.") from exc
+        try:
+            yield from workbook.worksheets[0].iter_rows(values_only=True)
+        finally:
+            workbook.close()
+        return
+    if not filename.lower().endswith(".csv"):
+        raise ValueError("El archivo debe ser .xlsx o .csv.")
+    text = io.TextIOWrapper(file_obj, encoding="utf-8-sig", newline="")
+    try:
+        sample = text.read(4096)
+        text.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(text, dialect)
+    except UnicodeDecodeError as exc:
+        raise ValueError("El CSV debe estar guardado en UTF-8.") from exc
+    finally:
+        text.detach()
+
+
+def iter_import_rows(file_obj, filename):
+    # Yields (row number, {field: value}) one row at a time; neither reader loads the whole file.
+    rows = _iter_sheet_rows(file_obj, filename)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("El archivo esta vacio.")
+    columns = _import_header(header)
+    for number, cells in enumerate(rows, start=2):
+        values = {field: cell for field, cell in zip(columns, cells) if field and cell not in (None, "")}
+        if values:
+            yield number, values
+
+
+def _import_text(value):
+    if isinstance(value, float) and value.is_integer():
+        # Excel keeps cedulas and phones typed as numbers as floats.
+        value = int(value)
+    return str(value if value is not None else "").strip()
+
+
+def _parse_import_amount(value):
+    if isinstance(value, (int, float, Decimal)):
+        return Decimal(str(value))
+    text = str(value).replace("$", "").replace(" ", "")
+    if LOCAL_AMOUNT_RE.match(text):
+        text = text.replace(".", "").replace(",", ".")
+    return Decimal(text.replace(",", "."))
+
+
+def _build_import_attendee(branch, event, user, categories, values):
+    name = _import_text(values.get("name"))
+    cc = _import_text(values.get("cc"))
+    phone = _import_text(values.get("phone"))
+    email = _import_text(values.get("email"))
+    errors = []
+    if not name or len(name) > Attendee._meta.get_field("name").max_length:
+        errors.append("Nombre vacio o demasiado largo.")
+    if not cc or len(cc) > Attendee._meta.get_field("cc").max_length:
+        errors.append("Cedula vacia o demasiado larga.")
+    if not phone or len(phone) > Attendee._meta.get_field("phone").max_length:
+        errors.append("Telefono vacio o demasiado largo.")
+    try:
+        validate_email(email)
+    except ValidationError:
+        errors.append("Correo invalido." if email else "Falta el correo.")
+    category = categories.get(normalize_search_text(values.get("category")))
+    if category is None:
+        errors.append(f"La categoria {values.get('category', '')} no existe o esta inactiva.")
+    paid_amount = category.price if category else Decimal("0")
+    if values.get("paid_amount") is not None:
+        try:
+            paid_amount = _parse_import_amount(values["paid_amount"])
+        except InvalidOperation:
+            paid_amount = None
+        if paid_amount is None or not paid_amount.is_finite() or not 0 <= paid_amount < IMPORT_MAX_AMOUNT:
+            errors.append("Precio pagado invalido.")
+    if errors:
+        return cc, None, errors
+
+    attendee = Attendee(
+        branch=branch,
+        event=event,
+        category=category,
+        name=name,
+        cc=cc,
+        phone=phone,
+        email=email,
+        paid_amount=paid_amount,
+        included_balance=category.included_consumptions,
+        created_by=user,
+    )
+    attendee.refresh_search_fields()
+    attendee.qr_code = attendee.build_qr_code()
+    return cc, attendee, []
+
+
+def _store_import_chunk(event, attendees, send_emails):
+    # bulk_create skips Attendee.save: counters are locked (and seeded) before the insert and bumped per category
+    # after it, signed codes are issued once the primary keys exist, and QR images are rendered on first use.
+    with transaction.atomic():
+        lock_event_counters(event.pk)
+        Attendee.objects.bulk_create(attendees)
+        ids = dict(
+            Attendee.objects.filter(event=event, cc__in=[attendee.cc for attendee in attendees]).values_list("cc", "pk")
+        )
+        for attendee in attendees:
+            attendee.pk = ids[attendee.cc]
+        if event.qr_signed_codes:
+            for attendee in attendees:
+                attendee.qr_code = attendee.build_qr_code()
+            Attendee.objects.bulk_update(attendees, ["qr_code"])
+        if send_emails:
+            TicketEmail.objects.bulk_create([TicketEmail(attendee_id=attendee.pk) for attendee in attendees])
+        deltas = {}
+        for attendee in attendees:
+            totals = deltas.setdefault(attendee.category_id, Counter())
+            totals.update(attendee_counter_deltas(attendee.counter_source()))
+        for category_id, totals in deltas.items():
+            bump_event_counters(event.pk, category_id, **totals)
+
+
+def _flush_import_chunk(event, chunk, send_emails, report):
+    try:
+        _store_import_chunk(event, [attendee for _number, attendee in chunk], send_emails)
+        report["created"] += len(chunk)
+        return
+    except IntegrityError:
+        pass
+    # Someone registered one of these cedulas meanwhile: store row by row so only that row fails.
+    for number, attendee in chunk:
+        try:
+            _store_import_chunk(event, [attendee], send_emails)
+            report["created"] += 1
+        except IntegrityError:
+            _report_import_error(report, number, attendee.cc, [IMPORT_DUPLICATE_MESSAGE])
+
+
+def _report_import_error(report, number, cc, errors):
+    report["failed"] += 1
+    if len(report["errors"]) < IMPORT_MAX_REPORTED_ERRORS:
+        report["errors"].append({"row": number, "cc": cc, "errors": errors})
+
+
+def import_attendees(branch, event, user, rows, *, send_emails=True, dry_run=False):
+    categories = {
+        normalize_search_text(category.name): category
+        for category in Category.objects.filter(branch=branch, is_active=True)
+    }
+    # One query for the event's cedulas; rows of the same file are added as they are accepted.
+    seen_ccs = set(Attendee.objects.filter(event=event).values_list("cc", flat=True).iterator())
+    report = {"created": 0, "failed": 0, "errors": []}
+    chunk = []
+    for number, values in rows:
+        cc, attendee, errors = _build_import_attendee(branch, event, user, categories, values)
+        if not errors and cc in seen_ccs:
+            errors = [IMPORT_DUPLICATE_MESSAGE]
+        if errors:
+            _report_import_error(report, number, cc, errors)
+            continue
+        seen_ccs.add(cc)
+        if dry_run:
+            report["created"] += 1
+            continue
+        chunk.append((number, attendee))
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            _flush_import_chunk(event, chunk, send_emails, report)
+            chunk = []
+    if chunk:
+        _flush_import_chunk(event, chunk, send_emails, report)
+    return report
+
+
+def get_offline_manifest_salt(event):
+    return salted_hmac("attendees.offline_manifest", str(event.pk)).hexdigest()[:16]
+
+
+def hash_offline_code(salt, value):
+    return hashlib.sha256(f"{salt}:{value}".encode("utf-8")).hexdigest()[:OFFLINE_MANIFEST_HASH_LENGTH]
+
+
+def _manifest_version(value):
+    return (value - MANIFEST_EPOCH) // timedelta(microseconds=1) if value else 0
+
+
+def _manifest_datetime(version):
+    try:
+        return MANIFEST_EPOCH + timedelta(microseconds=version)
+    except OverflowError as exc:
+        raise ValueError("Version invalida.") from exc
+
+
+def build_offline_manifest(event, since=None):
+    since_at = _manifest_datetime(since) if since else None
+    attendees = Attendee.objects.filter(event=event)
+    totals = attendees.aggregate(latest=Max("updated_at"), count=Count("pk"))
+    salt = get_offline_manifest_salt(event)
+    rows = attendees.order_by("pk").values_list(
+        "pk",
+        "qr_code",
+        "cc",
+        "category_id",
+        "included_balance",
+        "has_checked_in",
+    )
+    if since_at:
+        rows = rows.filter(updated_at__gt=since_at - OFFLINE_MANIFEST_OVERLAP)
+
+    return {
+        "version": _manifest_version(totals["latest"]),
+        "full": not since,
+        "count": totals["count"],
+        "salt": salt,
+        "fields": OFFLINE_MANIFEST_FIELDS,
+        "categories": list(Category.objects.filter(branch_id=event.branch_id).values_list("pk", "name")),
+        "attendees": [
+            [pk, hash_offline_code(salt, qr_code), hash_offline_code(salt, cc), category_id, balance, int(checked_in)]
+            for pk, qr_code, cc, category_id, balance, checked_in in rows
+        ],
+    }
+
+
+def _parse_scanned_at(value, now, earliest):
+    # Device clocks are untrusted: future times are clamped to now, and missing or unreadable times and times
+    # before the window (an old clock) fall back to now and come back flagged, so they never win "first scan wins".
+    try:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            scanned_at = MANIFEST_EPOCH + timedelta(milliseconds=value)
+        else:
+            scanned_at = parse_datetime(str(value or ""))
+    except (OverflowError, ValueError):
+        scanned_at = None
+    if scanned_at is None:
+        return now, False
+    if timezone.is_naive(scanned_at):
+        scanned_at = timezone.make_aware(scanned_at)
+    if scanned_at < earliest:
+        return now, False
+    return min(scanned_at, now), True
+
+
+def _claim_offline_check_ins(event, user, claims, now):
+    # claims maps attendee id to (category_id, scanned_at, in_window). A single UPDATE checks in every row still
+    # pending, each at its own scan time; rows already in only move when an in-window scan is earlier.
+    won = {}
+    with transaction.atomic():
+        lock_event_counters(event.pk)
+        current = {
+            row["pk"]: row
+            for row in Attendee.objects.filter(pk__in=claims)
+            .select_for_update()
+            .values("pk", "has_checked_in", "checked_in_at", "checked_in_by")
+        }
+        pending_ids = [pk for pk, row in current.items() if not row["has_checked_in"]]
+        if pending_ids:
+            Attendee.objects.filter(pk__in=pending_ids).update(
+                has_checked_in=True,
+                checked_in_at=Case(*(When(pk=pk, then=Value(claims[pk][1])) for pk in pending_ids)),
+                checked_in_by=user,
+                updated_at=now,
+            )
+            won.update((pk, claims[pk][1]) for pk in pending_ids)
+            for category_id, checked_in in Counter(claims[pk][0] for pk in pending_ids).items():
+                bump_event_counters(event.pk, category_id, checked_in=checked_in)
+        operator_days = Counter(timezone.localdate(claims[pk][1]) for pk in pending_ids)
+        for pk, row in current.items():
+            _category_id, scanned_at, in_window = claims[pk]
+            if not row["has_checked_in"] or not in_window or not row["checked_in_at"]:
+                continue
+            if scanned_at >= row["checked_in_at"]:
+                continue
+            # First scan wins: an earlier offline scan replaces an entry that happened to sync first.
+            Attendee.objects.filter(pk=pk).update(checked_in_at=scanned_at, checked_in_by=user, updated_at=now)
+            bump_operator_check_ins(event.pk, row["checked_in_by"], timezone.localdate(row["checked_in_at"]), -1)
+            operator_days[timezone.localdate(scanned_at)] += 1
+            won[pk] = scanned_at
+        for day, checked_in in operator_days.items():
+            bump_operator_check_ins(event.pk, user.pk, day, checked_in)
+    return won, current
+
+
+def sync_offline_check_ins(branch, event, user, scans):
+    now = timezone.now()
+    earliest = max(event.starts_at - OFFLINE_SCAN_EARLY_GRACE, now - OFFLINE_SCAN_MAX_AGE)
+    parsed = []
+    for scan in scans:
+        if not isinstance(scan, dict):
+            parsed.append(("", now, False))
+            continue
+        code = str(scan.get("code") or scan.get("codigo") or "").strip()
+        parsed.append((code, *_parse_scanned_at(scan.get("scanned_at"), now, earliest)))
+    resolved = _resolve_attendee_codes(branch, event, [code for code, _, _ in parsed])
+
+    # Out-of-window scans already fell back to now, so the earliest scan of each attendee is the one that counts.
+    claims = {}
+    claim_index = {}
+    for index, ((_, attendee), (_, scanned_at, in_window)) in enumerate(zip(resolved, parsed)):
+        if attendee is not None and (attendee.pk not in claims or scanned_at < claims[attendee.pk][1]):
+            claims[attendee.pk] = (attendee.category_id, scanned_at, in_window)
+            claim_index[attendee.pk] = index
+    won, current = _claim_offline_check_ins(event, user, claims, now) if claims else ({}, {})
+
+    results = []
+    for index, ((code, attendee), (_, _, in_window)) in enumerate(zip(resolved, parsed)):
+        if attendee is None or attendee.pk not in current:
+            results.append({"code": code, "status": "not_found"})
+            continue
+        created = claim_index[attendee.pk] == index and attendee.pk in won
+        checked_in_at = won.get(attendee.pk) or current[attendee.pk]["checked_in_at"]
+        results.append(
+            {
+                "code": code,
+                "id": attendee.pk,
+                "status": "checked_in" if created else "duplicate",
+                "checked_in_at": checked_in_at.isoformat() if checked_in_at else "",
+                "clock_skew": not in_window,
+            }
+        )
+    return results
+
+
+def reissue_attendee_qr_codes(event):
+    # Old images encode the old codes, so they are dropped and rendered again on first use.
+    attendees = Attendee.objects.filter(event=event).select_related("branch", "event").order_by("pk")
+    now = timezone.now()
+    reissued = 0
+    batch = []
+    for attendee in attendees.iterator(chunk_size=QR_REISSUE_BATCH_SIZE):
+        if attendee.qr_image:
+            attendee.qr_image.storage.delete(attendee.qr_image.name)
+        attendee.qr_code = attendee.build_qr_code()
+        attendee.qr_image = ""
+        attendee.updated_at = now
+        batch.append(attendee)
+        if len(batch) >= QR_REISSUE_BATCH_SIZE:
+            reissued += _store_reissued_codes(batch)
+            batch = []
+    if batch:
+        reissued += _store_reissued_codes(batch)
+    return reissued
+
+
+@transaction.atomic
+def _store_reissued_codes(attendees):
+    Attendee.objects.bulk_update(attendees, ["qr_code", "qr_image", "updated_at"])
+    bulk_delete_assets(Attendee, "attendee_qr", [attendee.pk for attendee in attendees])
+    return len(attendees)
 
 
 @transaction.atomic
@@ -32,3 +888,80 @@ def delete_branch_category(category):
 
     category.delete()
     return "deleted"
+
+
+def enqueue_ticket_email(attendee):
+    return TicketEmail.objects.create(attendee=attendee)
+
+
+def _ticket_email_backoff(attempts):
+    seconds = TICKET_EMAIL_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, TICKET_EMAIL_MAX_BACKOFF_SECONDS))
+
+
+def claim_ticket_emails(limit=20):
+    now = timezone.now()
+    due = Q(status__in=[TicketEmail.STATUS_QUEUED, TicketEmail.STATUS_FAILED], next_attempt_at__lte=now) | Q(
+        status=TicketEmail.STATUS_SENDING,
+        locked_at__lt=now - TICKET_EMAIL_SENDING_TIMEOUT,
+    )
+    with transaction.atomic():
+        claimed_ids = list(
+            TicketEmail.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:limit]
+        )
+        TicketEmail.objects.filter(id__in=claimed_ids).update(
+            status=TicketEmail.STATUS_SENDING,
+            locked_at=now,
+            updated_at=now,
+        )
+    return list(
+        TicketEmail.objects.filter(id__in=claimed_ids)
+        .select_related("attendee__event", "attendee__branch", "attendee__category")
+        .order_by("next_attempt_at", "id")
+    )
+
+
+def deliver_ticket_email(ticket_email, sender=None):
+    try:
+        sent, message = send_attendee_ticket_email(ticket_email.attendee, sender=sender)
+    except Exception as exc:
+        sent, message = False, str(exc)
+
+    now = timezone.now()
+    ticket_email.attempts += 1
+    ticket_email.locked_at = None
+    if sent:
+        ticket_email.status = TicketEmail.STATUS_SENT
+        ticket_email.sent_at = now
+        ticket_email.last_error = ""
+    elif ticket_email.attempts >= ticket_email.max_attempts or not ticket_email.attendee.email:
+        ticket_email.status = TicketEmail.STATUS_DEAD
+        ticket_email.last_error = message
+    else:
+        ticket_email.status = TicketEmail.STATUS_FAILED
+        ticket_email.last_error = message
+        ticket_email.next_attempt_at = now + _ticket_email_backoff(ticket_email.attempts)
+    ticket_email.save(
+        update_fields=["status", "attempts", "locked_at", "sent_at", "last_error", "next_attempt_at", "updated_at"]
+    )
+    return ticket_email
+
+
+def process_ticket_email_outbox(limit=20, sender=None):
+    ticket_emails = claim_ticket_emails(limit=limit)
+    if not ticket_emails:
+        return []
+    if sender is not None:
+        return [deliver_ticket_email(ticket_email, sender=sender) for ticket_email in ticket_emails]
+    with TicketEmailSender() as sender:
+        return [deliver_ticket_email(ticket_email, sender=sender) for ticket_email in ticket_emails]
+
+
+def get_ticket_email_statuses(attendee_ids):
+    statuses = {}
+    for ticket_email in TicketEmail.objects.filter(attendee_id__in=attendee_ids).order_by("attendee_id", "-id"):
+        statuses.setdefault(ticket_email.attendee_id, ticket_email)
+    return statuses
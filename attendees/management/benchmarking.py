@@ -0,0 +1,56 @@
+import uuid
+from datetime import timedelta
+
+from django.test import Client
+from django.utils import timezone
+
+from attendees.models import Attendee
+from attendees.search import normalize_search_cc, normalize_search_text
+from events.application import rebuild_event_counters
+from events.models import Event
+
+
+SEED_BATCH_SIZE = 1000
+
+
+def seed_benchmark_event(branch, category, user, total, label):
+    # Bulk insert skips Attendee.save, so no QR images are rendered and counters are rebuilt once at the end.
+    now = timezone.now()
+    event = Event.objects.create(
+        branch=branch,
+        name=f"Benchmark {label} {uuid.uuid4().hex[:8]}",
+        starts_at=now,
+        ends_at=now + timedelta(hours=6),
+        qr_prefix="BENCH",
+    )
+    prefix = f"{branch.code_prefix}-{event.qr_prefix}"
+    Attendee.objects.bulk_create(
+        (
+            Attendee(
+                branch=branch,
+                event=event,
+                category=category,
+                name=f"Benchmark {index}",
+                cc=f"BENCH{index:07d}",
+                search_name=normalize_search_text(f"Benchmark {index}"),
+                search_cc=normalize_search_cc(f"BENCH{index:07d}"),
+                qr_code=f"{prefix}-{uuid.uuid4().hex[:10].upper()}",
+                included_balance=category.included_consumptions,
+                created_by=user,
+            )
+            for index in range(total)
+        ),
+        batch_size=SEED_BATCH_SIZE,
+    )
+    rebuild_event_counters(event.pk)
+    return event
+
+
+def benchmark_client(user, branch, event):
+    client = Client()
+    client.force_login(user)
+    session = client.session
+    session["current_branch_id"] = branch.pk
+    session["current_event_id"] = event.pk
+    session.save()
+    return client
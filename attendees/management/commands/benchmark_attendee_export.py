@@ -0,0 +1,116 @@
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from attendees.management.benchmarking import benchmark_client, seed_benchmark_event
+from attendees.models import Category
+from branches.models import Branch
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+EXPORT_FORMATS = {"excel": "attendees:export_excel", "csv": "attendees:export_csv"}
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux.
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea un evento temporal con N asistentes y mide tiempo y memoria de las descargas "
+        "de Excel y CSV usando las vistas reales."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--branch", type=int, required=True, help="ID de la sucursal donde se crea el evento.")
+        parser.add_argument("--username", required=True, help="Usuario con acceso a entrada en la sucursal.")
+        parser.add_argument("--attendees", type=int, default=50000, help="Asistentes sembrados y exportados.")
+        parser.add_argument("--format", choices=[*EXPORT_FORMATS, "all"], default="all", help="Formato a medir.")
+        parser.add_argument("--output", help="Archivo JSON donde se guarda el resultado.")
+        parser.add_argument("--keep", action="store_true", help="Conserva el evento de prueba al terminar.")
+
+    def handle(self, *args, **options):
+        if options["attendees"] < 1:
+            raise CommandError("--attendees debe ser mayor a cero.")
+        branch = Branch.objects.filter(pk=options["branch"]).first()
+        if branch is None:
+            raise CommandError(f"No existe una sucursal con id {options['branch']}.")
+        user = get_user_model().objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"No existe el usuario {options['username']}.")
+        category = Category.objects.filter(branch=branch, is_active=True).order_by("pk").first()
+        if category is None:
+            raise CommandError("La sucursal no tiene categorias activas.")
+
+        formats = list(EXPORT_FORMATS) if options["format"] == "all" else [options["format"]]
+        event = seed_benchmark_event(branch, category, user, options["attendees"], "exporte")
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                client = benchmark_client(user, branch, event)
+                results = {name: self._measure(client, EXPORT_FORMATS[name]) for name in formats}
+        finally:
+            if not options["keep"]:
+                event.delete()
+
+        result = {
+            "recorded_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "attendees": options["attendees"],
+            "formats": results,
+            "max_rss_mb": _max_rss_mb(),
+        }
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        for name, measured in results.items():
+            self.stdout.write(
+                f"{name}: {measured['bytes']} bytes en {measured['seconds']}s, "
+                f"pico de memoria Python {measured['peak_python_mb']} MB."
+            )
+        if result["max_rss_mb"] is not None:
+            self.stdout.write(f"RSS maximo del proceso: {result['max_rss_mb']} MB.")
+
+    def _download(self, client, url):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f"La descarga {url} respondio {response.status_code}.")
+        if not response.streaming:
+            return len(response.content)
+        size = 0
+        for chunk in response.streaming_content:
+            size += len(chunk)
+        return size
+
+    def _measure(self, client, url_name):
+        # Timing and allocation tracking run separately, since tracemalloc slows every allocation down.
+        url = reverse(url_name)
+        started = time.perf_counter()
+        size = self._download(client, url)
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+        try:
+            self._download(client, url)
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {
+            "bytes": size,
+            "seconds": round(elapsed, 3),
+            "peak_python_mb": round(peak / (1024 * 1024), 2),
+        }
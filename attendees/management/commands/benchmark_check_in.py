@@ -0,0 +1,143 @@
+import json
+import math
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from attendees.management.benchmarking import benchmark_client, seed_benchmark_event
+from attendees.models import Attendee, Category
+from branches.models import Branch
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea un evento temporal con N asistentes y mide la entrada con K scanners simultaneos "
+        "usando las vistas reales de preview y confirmacion."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--branch", type=int, required=True, help="ID de la sucursal donde se crea el evento.")
+        parser.add_argument("--username", required=True, help="Usuario con acceso a entrada en la sucursal.")
+        parser.add_argument("--attendees", type=int, default=1000, help="Asistentes sembrados y escaneados.")
+        parser.add_argument("--scanners", type=int, default=4, help="Scanners simultaneos.")
+        parser.add_argument("--fast-lane", action="store_true", help="Registra al escanear, sin confirmacion.")
+        parser.add_argument("--output", help="Archivo JSON donde se guarda el resultado.")
+        parser.add_argument("--keep", action="store_true", help="Conserva el evento de prueba al terminar.")
+
+    def handle(self, *args, **options):
+        if options["attendees"] < 1 or options["scanners"] < 1:
+            raise CommandError("--attendees y --scanners deben ser mayores a cero.")
+        branch = Branch.objects.filter(pk=options["branch"]).first()
+        if branch is None:
+            raise CommandError(f"No existe una sucursal con id {options['branch']}.")
+        user = get_user_model().objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"No existe el usuario {options['username']}.")
+        category = Category.objects.filter(branch=branch, is_active=True).order_by("pk").first()
+        if category is None:
+            raise CommandError("La sucursal no tiene categorias activas.")
+
+        event = seed_benchmark_event(branch, category, user, options["attendees"], "entrada")
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                result = self._run(branch, event, user, options)
+        finally:
+            if not options["keep"]:
+                event.delete()
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        latency = result["latency_ms"]
+        self.stdout.write(
+            f"Escaneos: {result['scans']} en {result['elapsed_seconds']}s ({result['scans_per_second']} por segundo). "
+            f"p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms. "
+            f"{result['queries_per_scan']} consultas por escaneo, {result['errors']} errores."
+        )
+
+    def _run(self, branch, event, user, options):
+        scanners = options["scanners"]
+        fast_lane = options["fast_lane"]
+        preview_url = reverse("attendees:check_in_preview")
+        confirm_url = reverse("attendees:confirm_check_in")
+        codes = list(Attendee.objects.filter(event=event).order_by("pk").values_list("qr_code", flat=True))
+        latencies = []
+        query_counts = []
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(scanners + 1)
+
+        def scan(code, client):
+            preview = client.post(
+                preview_url,
+                data={"codigo": code, "fast_lane": fast_lane},
+                content_type="application/json",
+            )
+            payload = preview.json()
+            if fast_lane or not payload.get("success"):
+                return bool(payload.get("checked_in"))
+            confirm = client.post(
+                confirm_url,
+                data={"codigo": code, "token": payload.get("token", "")},
+                content_type="application/json",
+            )
+            return bool(confirm.json().get("success"))
+
+        def scanner(chunk):
+            client = benchmark_client(user, branch, event)
+            own_latencies, own_queries, own_errors = [], [], 0
+            try:
+                barrier.wait()
+                for code in chunk:
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        ok = scan(code, client)
+                        own_latencies.append(time.perf_counter() - started)
+                    own_queries.append(len(captured))
+                    own_errors += not ok
+            finally:
+                connection.close()
+                with lock:
+                    latencies.extend(own_latencies)
+                    query_counts.extend(own_queries)
+                    errors.append(own_errors)
+
+        threads = [threading.Thread(target=scanner, args=(codes[index::scanners],)) for index in range(scanners)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        return {
+            "recorded_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "mode": "fast_lane" if fast_lane else "preview_confirm",
+            "attendees": len(codes),
+            "scanners": scanners,
+            "scans": len(latencies),
+            "errors": sum(errors),
+            "elapsed_seconds": round(elapsed, 3),
+            "scans_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": {
+                label: round(_percentile(latencies, percent) * 1000, 2)
+                for label, percent in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+            },
+            "queries_per_scan": round(sum(query_counts) / len(query_counts), 2) if query_counts else 0.0,
+        }
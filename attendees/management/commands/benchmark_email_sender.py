@@ -0,0 +1,109 @@
+import socketserver
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendees.models import Attendee
+from events.models import Event
+from ticketing.application import TicketEmailSender, build_attendee_ticket_email
+
+
+SMTP_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+
+
+class _SMTPSinkHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+    def handle(self):
+        self.reply("220 localhost SMTP sink")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 localhost")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                self.server.received += 1
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+class _SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPSinkHandler)
+        self.received = 0
+
+
+class Command(BaseCommand):
+    help = "Mide correos por segundo enviando la entrada de un asistente con y sin reutilizar la conexion SMTP."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", type=int, help="ID del evento del que se toma el asistente.")
+        parser.add_argument("--messages", type=int, default=50, help="Correos enviados en cada modo.")
+        parser.add_argument("--max-per-connection", type=int, default=100)
+        parser.add_argument("--host", help="Servidor SMTP de prueba. Por defecto se levanta uno local.")
+        parser.add_argument("--port", type=int, default=1025)
+
+    def handle(self, *args, **options):
+        if options["messages"] < 1 or options["max_per_connection"] < 1:
+            raise CommandError("--messages y --max-per-connection deben ser mayores a cero.")
+
+        attendees = Attendee.objects.select_related("branch", "event").exclude(email="")
+        if options["event"]:
+            if not Event.objects.filter(pk=options["event"]).exists():
+                raise CommandError("El evento no existe.")
+            attendees = attendees.filter(event_id=options["event"])
+        attendee = attendees.first()
+        if attendee is None:
+            raise CommandError("No hay asistentes con correo para la prueba.")
+
+        email_message = build_attendee_ticket_email(attendee)
+        sink = None
+        host, port = options["host"], options["port"]
+        if not host:
+            sink = _SMTPSink()
+            host, port = sink.server_address
+            threading.Thread(target=sink.serve_forever, daemon=True).start()
+
+        connection_kwargs = {
+            "backend": SMTP_BACKEND,
+            "host": host,
+            "port": port,
+            "username": "",
+            "password": "",
+            "use_tls": False,
+            "use_ssl": False,
+        }
+        try:
+            for label, max_per_connection in (
+                ("Conexion por correo", 1),
+                ("Conexion persistente", options["max_per_connection"]),
+            ):
+                with TicketEmailSender(max_messages_per_connection=max_per_connection, **connection_kwargs) as sender:
+                    started = time.perf_counter()
+                    for _ in range(options["messages"]):
+                        sender.send(email_message)
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label}: {options['messages'] / elapsed:.1f} correos/s "
+                    f"({sender.connections_opened} conexiones, {elapsed:.2f}s)."
+                )
+        finally:
+            if sink is not None:
+                sink.shutdown()
+                sink.server_close()
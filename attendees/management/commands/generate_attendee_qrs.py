@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from attendees.models import Attendee
+from events.models import Event
+from ticketing.application import generate_attendee_qrs
+
+
+class Command(BaseCommand):
+    help = "Genera en paralelo las imagenes QR de los asistentes. Omite las entradas vendidas en puerta."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", type=int, help="ID del evento a procesar. Por defecto todos.")
+        parser.add_argument("--workers", type=int, default=None, help="Procesos para renderizar. Por defecto, uno por CPU.")
+        parser.add_argument(
+            "--only-missing",
+            action="store_true",
+            help="Solo genera los QR que no tienen imagen o cuyo archivo no existe.",
+        )
+
+    def handle(self, *args, **options):
+        attendees = Attendee.objects.exclude(origin=Attendee.ORIGIN_EVENT_DAY)
+        event_id = options["event"]
+        if event_id:
+            if not Event.objects.filter(pk=event_id).exists():
+                raise CommandError(f"No existe un evento con id {event_id}.")
+            attendees = attendees.filter(event_id=event_id)
+
+        workers = options["workers"]
+        if workers is not None and workers < 1:
+            raise CommandError("--workers debe ser mayor a cero.")
+
+        generated = generate_attendee_qrs(
+            attendees,
+            workers=workers,
+            only_missing=options["only_missing"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"QR generados: {generated}."))
@@ -0,0 +1,59 @@
+import csv
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from attendees.application import IMPORT_MAX_REPORTED_ERRORS, import_attendees, iter_import_rows
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa asistentes desde un Excel (.xlsx) o CSV con columnas NOMBRE, CEDULA, TELEFONO, CORREO, "
+        "CATEGORIA y PRECIO PAGADO (opcional)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Archivo .xlsx o .csv a importar.")
+        parser.add_argument("--event", type=int, required=True, help="ID del evento destino.")
+        parser.add_argument("--username", required=True, help="Usuario que queda como creador de los registros.")
+        parser.add_argument("--no-email", action="store_true", help="No encola el correo con el QR.")
+        parser.add_argument("--dry-run", action="store_true", help="Solo valida el archivo, sin guardar.")
+        parser.add_argument("--errors-output", help="CSV donde se guardan las filas con error.")
+
+    def handle(self, *args, **options):
+        event = Event.objects.select_related("branch").filter(pk=options["event"]).first()
+        if event is None:
+            raise CommandError(f"No existe un evento con id {options['event']}.")
+        user = get_user_model().objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"No existe el usuario {options['username']}.")
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"No existe el archivo {path}.")
+
+        try:
+            with path.open("rb") as handle:
+                report = import_attendees(
+                    event.branch,
+                    event,
+                    user,
+                    iter_import_rows(handle, path.name),
+                    send_emails=not options["no_email"],
+                    dry_run=options["dry_run"],
+                )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        if options["errors_output"]:
+            with open(options["errors_output"], "w", encoding="utf-8-sig", newline="") as output:
+                writer = csv.writer(output)
+                writer.writerow(["FILA", "CEDULA", "ERRORES"])
+                for error in report["errors"]:
+                    writer.writerow([error["row"], error["cc"], " ".join(error["errors"])])
+
+        label = "Validos" if options["dry_run"] else "Importados"
+        self.stdout.write(self.style.SUCCESS(f"{label}: {report['created']}. Filas con errores: {report['failed']}."))
+        if report["failed"] > len(report["errors"]):
+            self.stdout.write(f"Solo se reportan las primeras {IMPORT_MAX_REPORTED_ERRORS} filas con error.")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from attendees.application import reissue_attendee_qr_codes
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = "Reemite los codigos QR de un evento. Los QR enviados antes dejan de ser validos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", type=int, required=True, help="ID del evento a reemitir.")
+        parser.add_argument(
+            "--signed",
+            action="store_true",
+            help="Activa los codigos firmados en el evento antes de reemitir.",
+        )
+
+    def handle(self, *args, **options):
+        event = Event.objects.filter(pk=options["event"]).first()
+        if event is None:
+            raise CommandError(f"No existe un evento con id {options['event']}.")
+
+        if options["signed"] and not event.qr_signed_codes:
+            event.qr_signed_codes = True
+            event.save(update_fields=["qr_signed_codes", "updated_at"])
+
+        reissued = reissue_attendee_qr_codes(event)
+        mode = "firmados" if event.qr_signed_codes else "sin firma"
+        self.stdout.write(self.style.SUCCESS(f"Codigos reemitidos ({mode}): {reissued}."))
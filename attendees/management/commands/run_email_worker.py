@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendees.application import process_ticket_email_outbox
+from attendees.models import TicketEmail
+from ticketing.application import TicketEmailSender
+
+
+class Command(BaseCommand):
+    help = "Envia los correos de entrada pendientes en la cola."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Procesa lo pendiente una sola vez y termina.")
+        parser.add_argument("--batch-size", type=int, default=20, help="Correos reclamados por ciclo.")
+        parser.add_argument("--sleep", type=float, default=5.0, help="Segundos de espera cuando la cola esta vacia.")
+        parser.add_argument(
+            "--max-per-connection",
+            type=int,
+            default=None,
+            help="Correos enviados por cada conexion SMTP antes de reconectar.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size debe ser mayor a cero.")
+        max_per_connection = options["max_per_connection"]
+        if max_per_connection is not None and max_per_connection < 1:
+            raise CommandError("--max-per-connection debe ser mayor a cero.")
+
+        with TicketEmailSender(max_messages_per_connection=max_per_connection) as sender:
+            self._run(sender, batch_size, options)
+
+    def _run(self, sender, batch_size, options):
+        while True:
+            processed = process_ticket_email_outbox(limit=batch_size, sender=sender)
+            for ticket_email in processed:
+                if ticket_email.status == TicketEmail.STATUS_SENT:
+                    self.stdout.write(f"Enviado a {ticket_email.attendee.email}.")
+                else:
+                    self.stderr.write(
+                        f"{ticket_email.get_status_display()} ({ticket_email.attempts}/{ticket_email.max_attempts}) "
+                        f"{ticket_email.attendee.email}: {ticket_email.last_error}"
+                    )
+            if options["once"]:
+                if len(processed) < batch_size:
+                    break
+                continue
+            if not processed:
+                sender.close()
+                time.sleep(options["sleep"])
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:41
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendees', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'En cola'), ('sending', 'Enviando'), ('sent', 'Enviado'), ('failed', 'Reintentando'), ('dead', 'Fallido')], default='queued', max_length=12)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('attendee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_emails', to='attendees.attendee')),
+            ],
+            options={
+                'verbose_name': 'Correo de entrada',
+                'verbose_name_plural': 'Correos de entrada',
+                'ordering': ['next_attempt_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='attendees_ticketemail_due_idx')],
+            },
+        ),
+    ]
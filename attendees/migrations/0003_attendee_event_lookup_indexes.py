@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendees', '0002_ticketemail'),
+        ('branches', '0001_initial'),
+        ('events', '0002_qr_render_mode'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendee',
+            index=models.Index(fields=['event', 'qr_code'], name='attendees_event_qr_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendees', '0003_attendee_event_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendee',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='attendee',
+            index=models.Index(fields=['event', 'updated_at'], name='attendees_event_updated_idx'),
+        ),
+    ]
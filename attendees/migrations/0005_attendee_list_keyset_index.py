@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendees', '0004_attendee_updated_at'),
+        ('branches', '0001_initial'),
+        ('events', '0005_event_money_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendee',
+            index=models.Index(fields=['event', '-created_at', '-id'], name='attendees_event_created_idx'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+from attendees.search import normalize_search_cc, normalize_search_text
+
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def fill_search_fields(apps, schema_editor):
+    Attendee = apps.get_model("attendees", "Attendee")
+    batch = []
+    for attendee in Attendee.objects.only("pk", "name", "cc").iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        attendee.search_name = normalize_search_text(attendee.name)
+        attendee.search_cc = normalize_search_cc(attendee.cc)
+        batch.append(attendee)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            Attendee.objects.bulk_update(batch, ["search_name", "search_cc"])
+            batch = []
+    if batch:
+        Attendee.objects.bulk_update(batch, ["search_name", "search_cc"])
+
+
+def create_text_index(apps, schema_editor):
+    # Word search on names: FULLTEXT on MySQL, trigram GIN on PostgreSQL. Other backends keep the btree index only.
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        schema_editor.execute("CREATE FULLTEXT INDEX attendees_search_name_ft ON attendees_attendee (search_name)")
+    elif vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            "CREATE INDEX attendees_search_name_trgm ON attendees_attendee USING gin (search_name gin_trgm_ops)"
+        )
+
+
+def drop_text_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        schema_editor.execute("DROP INDEX attendees_search_name_ft ON attendees_attendee")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS attendees_search_name_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendees', '0005_attendee_list_keyset_index'),
+        ('branches', '0001_initial'),
+        ('events', '0005_event_money_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendee',
+            name='search_cc',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='attendee',
+            name='search_name',
+            field=models.CharField(blank=True, editable=False, max_length=120),
+        ),
+        migrations.AddIndex(
+            model_name='attendee',
+            index=models.Index(fields=['event', 'search_cc'], name='attendees_event_search_cc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendee',
+            index=models.Index(fields=['event', 'search_name'], name='attendees_event_search_idx'),
+        ),
+        migrations.RunPython(fill_search_fields, migrations.RunPython.noop),
+        migrations.RunPython(create_text_index, drop_text_index),
+    ]
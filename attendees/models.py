@@ -1,9 +1,13 @@
 import uuid
+from decimal import Decimal
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
-from ticketing.application import generate_attendee_qr
+from attendees.search import normalize_search_cc, normalize_search_text
+from events.application import bump_event_counters, bump_operator_check_ins, lock_event_counters
+from ticketing.qr_signing import build_signed_qr_code
 
 
 class Category(models.Model):
@@ -26,6 +30,46 @@ class Category(models.Model):
         return f"{self.branch.name} - {self.name}"
 
 
+COUNTER_SOURCE_FIELDS = (
+    "event_id",
+    "category_id",
+    "origin",
+    "paid_amount",
+    "has_checked_in",
+    "included_balance",
+    "checked_in_by_id",
+    "checked_in_at",
+)
+COUNTER_TRACKED_FIELDS = {
+    "event",
+    "category",
+    "origin",
+    "paid_amount",
+    "has_checked_in",
+    "included_balance",
+    "checked_in_by",
+    "checked_in_at",
+}
+
+
+def attendee_counter_deltas(source, sign=1):
+    paid_amount = Decimal(source["paid_amount"] or 0)
+    return {
+        "attendees": sign,
+        "checked_in": sign * int(source["has_checked_in"]),
+        "paid_amount": sign * paid_amount,
+        "manual_income": sign * paid_amount if source["origin"] == Attendee.ORIGIN_MANUAL else 0,
+        "included_balance": sign * source["included_balance"],
+    }
+
+
+def _bump_operator_counters(source, sign=1):
+    # Check-ins are credited to the operator on the local day they happened, as "my verifications" shows them.
+    if source["has_checked_in"] and source["checked_in_by_id"] and source["checked_in_at"]:
+        day = timezone.localdate(source["checked_in_at"])
+        bump_operator_check_ins(source["event_id"], source["checked_in_by_id"], day, sign)
+
+
 class Attendee(models.Model):
     ORIGIN_MANUAL = "manual"
     ORIGIN_EVENT_DAY = "event_day"
@@ -56,6 +100,7 @@ class Attendee(models.Model):
     )
     included_balance = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -63,25 +108,138 @@ class Attendee(models.Model):
         blank=True,
         related_name="created_attendees_v2",
     )
+    search_name = models.CharField(max_length=120, blank=True, editable=False)
+    search_cc = models.CharField(max_length=32, blank=True, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
         constraints = [
             models.UniqueConstraint(fields=["event", "cc"], name="attendees_attendee_event_cc_uniq"),
         ]
+        indexes = [
+            models.Index(fields=["event", "qr_code"], name="attendees_event_qr_idx"),
+            models.Index(fields=["event", "updated_at"], name="attendees_event_updated_idx"),
+            models.Index(fields=["event", "-created_at", "-id"], name="attendees_event_created_idx"),
+            models.Index(fields=["event", "search_cc"], name="attendees_event_search_cc_idx"),
+            models.Index(fields=["event", "search_name"], name="attendees_event_search_idx"),
+        ]
         verbose_name = "Asistente"
         verbose_name_plural = "Asistentes"
 
+    def build_qr_code(self):
+        prefix = f"{self.branch.code_prefix}-{self.event.qr_prefix}"
+        if self.pk and self.event.qr_signed_codes:
+            return build_signed_qr_code(prefix, self.event_id, self.pk)
+        return f"{prefix}-{uuid.uuid4().hex[:10].upper()}"
+
+    def refresh_search_fields(self):
+        self.search_name = normalize_search_text(self.name)
+        self.search_cc = normalize_search_cc(self.cc)
+
     def save(self, *args, **kwargs):
         creating = self._state.adding
-        if not self.qr_code:
-            token = uuid.uuid4().hex[:10].upper()
-            self.qr_code = f"{self.branch.code_prefix}-{self.event.qr_prefix}-{token}"
+        self.refresh_search_fields()
+        if kwargs.get("update_fields") is not None and {"name", "cc"} & set(kwargs["update_fields"]):
+            kwargs["update_fields"] = {*kwargs["update_fields"], "search_name", "search_cc"}
+        generated_code = not self.qr_code
+        if generated_code:
+            self.qr_code = self.build_qr_code()
         if creating and not self.included_balance:
             self.included_balance = self.category.included_consumptions
-        super().save(*args, **kwargs)
-        if not self.qr_image:
-            generate_attendee_qr(self)
+        update_fields = kwargs.get("update_fields")
+        tracked = creating or update_fields is None or bool(COUNTER_TRACKED_FIELDS & set(update_fields))
+
+        with transaction.atomic():
+            previous = None
+            if tracked:
+                lock_event_counters(self.event_id)
+            if tracked and not creating:
+                previous = (
+                    Attendee.objects.select_for_update().filter(pk=self.pk).values(*COUNTER_SOURCE_FIELDS).first()
+                )
+                if previous and previous["event_id"] != self.event_id:
+                    lock_event_counters(previous["event_id"])
+            super().save(*args, **kwargs)
+            if creating and generated_code and self.event.qr_signed_codes:
+                # Signed codes embed the primary key, so they can only be issued after the insert.
+                self.qr_code = self.build_qr_code()
+                Attendee.objects.filter(pk=self.pk).update(qr_code=self.qr_code)
+            if creating:
+                bump_event_counters(self.event_id, self.category_id, **attendee_counter_deltas(self.counter_source()))
+                _bump_operator_counters(self.counter_source())
+            elif previous:
+                self._bump_changed_counters(previous)
+
+    def counter_source(self):
+        return {field: getattr(self, field) for field in COUNTER_SOURCE_FIELDS}
+
+    def _bump_changed_counters(self, previous):
+        operator_fields = ("event_id", "has_checked_in", "checked_in_by_id", "checked_in_at")
+        if any(previous[field] != getattr(self, field) for field in operator_fields):
+            _bump_operator_counters(previous, sign=-1)
+            _bump_operator_counters(self.counter_source())
+        current = attendee_counter_deltas(self.counter_source())
+        if (previous["event_id"], previous["category_id"]) == (self.event_id, self.category_id):
+            before = attendee_counter_deltas(previous)
+            bump_event_counters(
+                self.event_id,
+                self.category_id,
+                **{field: value - before[field] for field, value in current.items()},
+            )
+            return
+        bump_event_counters(previous["event_id"], previous["category_id"], **attendee_counter_deltas(previous, sign=-1))
+        bump_event_counters(self.event_id, self.category_id, **current)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            lock_event_counters(self.event_id)
+            deleted = super().delete(*args, **kwargs)
+            deltas = attendee_counter_deltas(self.counter_source(), sign=-1)
+            bump_event_counters(self.event_id, self.category_id, **deltas)
+            _bump_operator_counters(self.counter_source(), sign=-1)
+        return deleted
 
     def __str__(self):
         return f"{self.name} - {self.event.name}"
+
+
+class TicketEmail(models.Model):
+    STATUS_QUEUED = "queued"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_DEAD = "dead"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "En cola"),
+        (STATUS_SENDING, "Enviando"),
+        (STATUS_SENT, "Enviado"),
+        (STATUS_FAILED, "Reintentando"),
+        (STATUS_DEAD, "Fallido"),
+    ]
+    PENDING_STATUSES = {STATUS_QUEUED, STATUS_SENDING, STATUS_FAILED}
+
+    attendee = models.ForeignKey(Attendee, on_delete=models.CASCADE, related_name="ticket_emails")
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["next_attempt_at", "id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="attendees_ticketemail_due_idx"),
+        ]
+        verbose_name = "Correo de entrada"
+        verbose_name_plural = "Correos de entrada"
+
+    @property
+    def is_pending(self):
+        return self.status in self.PENDING_STATUSES
+
+    def __str__(self):
+        return f"{self.attendee.name} - {self.get_status_display()}"
@@ -0,0 +1,20 @@
+import re
+import unicodedata
+
+
+NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+
+
+def _fold(value):
+    decomposed = unicodedata.normalize("NFKD", str(value or ""))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def normalize_search_text(value):
+    # "José  Pérez-Ñañez" -> "jose perez nanez"
+    return " ".join(NON_ALNUM_RE.split(_fold(value))).strip()
+
+
+def normalize_search_cc(value):
+    # "1.234.567-8" -> "12345678"
+    return NON_ALNUM_RE.sub("", _fold(value))
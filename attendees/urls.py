@@ -6,7 +6,9 @@ app_name = "attendees"
 
 urlpatterns = [
     path("", views.attendee_list, name="list"),
+    path("rows/", views.attendee_list_data, name="list_data"),
     path("new/", views.attendee_create, name="create"),
+    path("import/", views.attendee_import, name="import"),
     path("event-day/new/", views.attendee_event_day_create, name="event_day_create"),
     path("expenses/new/", views.attendee_expense_create, name="expense_create"),
     path("expenses/<int:movement_id>/update/", views.attendee_expense_update, name="expense_update"),
@@ -20,10 +22,19 @@ urlpatterns = [
     path("check-in/", views.attendee_check_in, name="check_in"),
     path("check-in/preview/", views.attendee_check_in_preview, name="check_in_preview"),
     path("check-in/confirm/", views.attendee_confirm_check_in, name="confirm_check_in"),
+    path("check-in/batch/", views.attendee_batch_check_in, name="batch_check_in"),
+    path("check-in/manifest/", views.attendee_offline_manifest, name="offline_manifest"),
+    path("check-in/sync/", views.attendee_offline_sync, name="offline_sync"),
+    path("live/", views.attendee_live_counters, name="live_counters"),
+    path("search/", views.attendee_search, name="search"),
     path("mark-checked-in/", views.attendee_mark_checked_in, name="mark_checked_in"),
     path("delete/", views.attendee_delete, name="delete"),
+    path("email-status/", views.attendee_email_status, name="email_status"),
     path("export/excel/", views.attendee_export_excel, name="export_excel"),
+    path("export/csv/", views.attendee_export_csv, name="export_csv"),
+    path("qr/<str:qr_code>.svg", views.attendee_qr_svg, name="qr_svg"),
     path("share/<str:qr_code>/", views.attendee_whatsapp_share, name="whatsapp_share"),
+    path("share/<str:qr_code>/payload/", views.attendee_share_payload, name="share_payload"),
     path("share/<str:qr_code>/card.png", views.attendee_whatsapp_card, name="whatsapp_card"),
     path("share/<str:qr_code>/qr.png", views.attendee_whatsapp_qr_file, name="whatsapp_qr_file"),
     path("share/<str:qr_code>/flyer.webp", views.attendee_whatsapp_flyer_file, name="whatsapp_flyer_file"),
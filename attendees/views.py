@@ -1,4 +1,9 @@
+import csv
+import hashlib
+import itertools
 import json
+import tempfile
+import time
 from decimal import Decimal
 from urllib.parse import quote
 
@@ -6,17 +11,47 @@ import openpyxl
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
-from django.db.models import Count, Q, Sum
-from django.http import HttpResponse, JsonResponse
+from django.db.models import Count, Sum
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.safestring import mark_safe
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.gzip import gzip_page
 from django.views.decorators.http import require_GET, require_POST
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Font, PatternFill
-from attendees.application import check_in_attendee, delete_branch_category, get_attendee_for_branch
+from attendees.application import (
+    CHECK_IN_BATCH_MAX_CODES,
+    EXPORT_HEADERS,
+    LIVE_COUNTERS_POLL_SECONDS,
+    OFFLINE_SYNC_MAX_SCANS,
+    build_offline_manifest,
+    check_in_attendee,
+    check_in_attendees_batch,
+    delete_branch_category,
+    enqueue_ticket_email,
+    get_attendee_for_branch,
+    get_attendee_list_version,
+    get_live_counters,
+    get_live_counters_version,
+    get_ticket_email_statuses,
+    import_attendees,
+    issue_check_in_token,
+    iter_attendee_export_rows,
+    iter_import_rows,
+    paginate_attendees,
+    redeem_check_in_token,
+    search_attendee_results,
+    search_attendees,
+    sync_offline_check_ins,
+)
 from attendees.forms import AttendeeForm, BranchCategoryForm
-from attendees.models import Attendee, Category
+from attendees.models import Attendee, Category, TicketEmail
+from events.application import get_category_counters, get_event_counters, get_operator_check_ins
+from events.models import Event
 from identity.application import user_can_access_attendees, user_can_manage_categories, user_can_manage_events
 from sales.application import (
     create_cash_movement,
@@ -31,15 +66,43 @@ from sales.models import CashMovement, CashMovementPayment
 from ticketing.application import (
     build_event_share_text,
     build_qr_png_bytes,
-    build_whatsapp_share_card_png,
-    send_attendee_ticket_email,
+    build_qr_svg,
+    ensure_attendee_qr,
+    get_png_derivative,
+    get_whatsapp_share_card_asset,
 )
-from media_assets.application import resolve_field_file
+from media_assets.application import get_media_asset, resolve_field_file
+from media_assets.responses import stored_file_response
 
 
 ATTENDEES_CONTENT_TABS = {"scanner", "lista", "crear"}
 ATTENDEES_MODAL_TABS = {"categorias", "evento-dia", "gastos", "vaciar-caja"}
 ATTENDEES_RETURN_TABS = ATTENDEES_CONTENT_TABS | ATTENDEES_MODAL_TABS
+WHATSAPP_CARD_MAX_AGE = 300
+EXPORT_COLUMN_WIDTHS = (28, 18, 16, 28, 18, 14, 12, 12, 20, 20, 18)
+LIST_DATA_FIELDS = (
+    "id",
+    "name",
+    "cc",
+    "phone",
+    "email",
+    "paid_amount",
+    "has_checked_in",
+    "qr_code",
+    "created_at",
+    "category__name",
+    "checked_in_by__username",
+)
+LIST_DATA_PAGE_KEYS = (
+    "total",
+    "start",
+    "end",
+    "has_next",
+    "has_previous",
+    "next_cursor",
+    "prev_cursor",
+    "last_cursor",
+)
 
 
 def _sanitize_attendees_content_tab(value, default="scanner"):
@@ -198,10 +261,9 @@ def _build_media_url(request, field_file):
     return request.build_absolute_uri(relative_url)
 
 
-def _build_whatsapp_url(request, attendee):
+def _build_whatsapp_url(attendee, share_text):
     phone = _normalize_whatsapp_phone(attendee.phone)
-    qr_url = _build_whatsapp_file_url(request, "attendees:whatsapp_qr_file", attendee.qr_code)
-    text = quote(build_event_share_text(attendee.event, attendee, qr_url=qr_url))
+    text = quote(share_text)
 
     if phone:
         return f"https://web.whatsapp.com/send?phone={phone}&text={text}"
@@ -227,28 +289,40 @@ def _build_whatsapp_file_url(request, name, qr_code):
     return _build_public_absolute_url(request, reverse(name, args=[qr_code]))
 
 
+def _build_whatsapp_share_payload(request, attendee):
+    qr_file_url = _build_whatsapp_file_url(request, "attendees:whatsapp_qr_file", attendee.qr_code)
+    share_text = build_event_share_text(attendee.event, attendee, qr_url=qr_file_url)
+    return {
+        "whatsapp_url": _build_whatsapp_url(attendee, share_text),
+        "whatsapp_share_text": share_text,
+        "whatsapp_public_qr_url": qr_file_url,
+        "whatsapp_card_url": _build_whatsapp_file_url(request, "attendees:whatsapp_card", attendee.qr_code),
+        "whatsapp_qr_file_url": qr_file_url,
+        "whatsapp_flyer_file_url": _build_whatsapp_file_url(request, "attendees:whatsapp_flyer_file", attendee.qr_code),
+    }
+
+
 def _build_flyer_share_payload(attendee):
-    flyer_field = resolve_field_file(attendee.event, "flyer", "event_flyer") or getattr(attendee.event, "flyer", None)
+    flyer_field = resolve_field_file(attendee.event, "flyer", "event_flyer")
     if not flyer_field:
         return None
-    try:
-        flyer_field.open("rb")
-        content = flyer_field.read()
-        flyer_field.close()
-        name = str(getattr(flyer_field, "name", "") or "")
-        lower_name = name.lower()
-        if lower_name.endswith(".webp"):
-            mimetype = "image/webp"
-        elif lower_name.endswith((".jpg", ".jpeg")):
-            mimetype = "image/jpeg"
-        elif lower_name.endswith(".png"):
-            mimetype = "image/png"
-        else:
-            mimetype = "application/octet-stream"
-        filename = name.rsplit("/", 1)[-1] if name else f"{attendee.event.slug or attendee.event.pk}-flyer.webp"
-        return {"content": content, "mimetype": mimetype, "filename": filename}
-    except (FileNotFoundError, ValueError):
-        return None
+    name = str(flyer_field.name)
+    lower_name = name.lower()
+    if lower_name.endswith(".webp"):
+        mimetype = "image/webp"
+    elif lower_name.endswith((".jpg", ".jpeg")):
+        mimetype = "image/jpeg"
+    elif lower_name.endswith(".png"):
+        mimetype = "image/png"
+    else:
+        mimetype = "application/octet-stream"
+    flyer_asset = get_media_asset(attendee.event, "event_flyer")
+    return {
+        "name": name,
+        "mimetype": mimetype,
+        "filename": name.rsplit("/", 1)[-1],
+        "etag": flyer_asset.checksum if flyer_asset and flyer_asset.file.name == name else "",
+    }
 
 
 def _build_post_create_notice(request, branch, event):
@@ -272,51 +346,37 @@ def _build_post_create_notice(request, branch, event):
         "body": body,
         "attendee_name": attendee.name,
         "phone": _format_whatsapp_phone_display(attendee.phone),
-        "whatsapp_url": _build_whatsapp_url(request, attendee),
-        "whatsapp_share_text": build_event_share_text(
-            attendee.event,
-            attendee,
-            qr_url=_build_whatsapp_file_url(request, "attendees:whatsapp_qr_file", attendee.qr_code),
-        ),
-        "whatsapp_public_qr_url": _build_whatsapp_file_url(request, "attendees:whatsapp_qr_file", attendee.qr_code),
-        "whatsapp_card_url": _build_whatsapp_file_url(request, "attendees:whatsapp_card", attendee.qr_code),
-        "whatsapp_qr_file_url": _build_whatsapp_file_url(request, "attendees:whatsapp_qr_file", attendee.qr_code),
-        "whatsapp_flyer_file_url": _build_whatsapp_file_url(request, "attendees:whatsapp_flyer_file", attendee.qr_code),
+        **_build_whatsapp_share_payload(request, attendee),
     }
 
 
 def _category_summary(branch, event):
-    categories = Category.objects.filter(branch=branch, is_active=True).annotate(
-        total=Count("attendees", filter=Q(attendees__branch=branch, attendees__event=event)),
-        ingresados=Count(
-            "attendees",
-            filter=Q(attendees__branch=branch, attendees__event=event, attendees__has_checked_in=True),
-        ),
-        subtotal=Sum("attendees__paid_amount", filter=Q(attendees__branch=branch, attendees__event=event)),
-        balance=Sum("attendees__included_balance", filter=Q(attendees__branch=branch, attendees__event=event)),
-    )
+    counters = get_category_counters(event.pk)
     summary = []
-    for category in categories:
-        category.pendientes = (category.total or 0) - (category.ingresados or 0)
-        category.subtotal = category.subtotal or Decimal("0")
-        category.balance = category.balance or 0
-        category.progress = int(((category.ingresados or 0) / category.total) * 100) if category.total else 0
+    for category in Category.objects.filter(branch=branch, is_active=True):
+        row = counters.get(category.pk)
+        category.total = row.attendees if row else 0
+        category.ingresados = row.checked_in if row else 0
+        category.subtotal = row.paid_amount if row else Decimal("0")
+        category.balance = row.included_balance if row else 0
+        category.pendientes = category.total - category.ingresados
+        category.progress = int((category.ingresados / category.total) * 100) if category.total else 0
         summary.append(category)
     return summary
 
 
-def _list_context(request, branch, event):
-    attendees = _attendee_queryset(branch, event)
-    search = request.GET.get("buscar", request.GET.get("q", "")).strip()
-    status = request.GET.get("estado", "").strip()
-
-    if search:
-        attendees = attendees.filter(Q(name__icontains=search) | Q(cc__icontains=search))
+def _list_total(event, status):
+    counters = get_event_counters(event.pk)
     if status == "ingresados":
-        attendees = attendees.filter(has_checked_in=True)
-    elif status == "pendientes":
-        attendees = attendees.filter(has_checked_in=False)
+        return counters.checked_in
+    if status == "pendientes":
+        return counters.attendees - counters.checked_in
+    return counters.attendees
+
 
+def _list_filters(request):
+    search = request.GET.get("buscar", request.GET.get("q", "")).strip()
+    status = request.GET.get("estado", "").strip()
     items_per_page = request.GET.get("items", "10")
     try:
         items_per_page = int(items_per_page)
@@ -324,38 +384,45 @@ def _list_context(request, branch, event):
         items_per_page = 10
     if items_per_page not in {10, 25, 50, 100}:
         items_per_page = 10
+    return search, status, items_per_page
 
-    paginator = Paginator(attendees, items_per_page)
-    page = request.GET.get("page", 1)
 
-    try:
-        page_obj = paginator.page(page)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
-
-    for attendee in page_obj.object_list:
-        attendee.whatsapp_url = _build_whatsapp_url(request, attendee)
-        attendee.whatsapp_share_text = build_event_share_text(
-            attendee.event,
-            attendee,
-            qr_url=_build_whatsapp_file_url(request, "attendees:whatsapp_qr_file", attendee.qr_code),
-        )
-        attendee.whatsapp_card_url = _build_whatsapp_file_url(request, "attendees:whatsapp_card", attendee.qr_code)
-        attendee.whatsapp_qr_file_url = _build_whatsapp_file_url(request, "attendees:whatsapp_qr_file", attendee.qr_code)
-        attendee.whatsapp_flyer_file_url = _build_whatsapp_file_url(request, "attendees:whatsapp_flyer_file", attendee.qr_code)
+def _paginate_list(request, attendees, event, version=None):
+    search, status, items_per_page = _list_filters(request)
+    if search:
+        attendees = search_attendees(attendees, search)
+    if status == "ingresados":
+        attendees = attendees.filter(has_checked_in=True)
+    elif status == "pendientes":
+        attendees = attendees.filter(has_checked_in=False)
+
+    list_page = paginate_attendees(
+        attendees,
+        cursor=request.GET.get("cursor", ""),
+        per_page=items_per_page,
+        count_total=attendees.count if search else lambda: _list_total(event, status),
+        version=version or get_attendee_list_version(event),
+    )
+    return list_page, search, status, items_per_page
+
+
+def _list_context(request, branch, event):
+    list_page, search, status, items_per_page = _paginate_list(request, _attendee_queryset(branch, event), event)
+
+    email_statuses = get_ticket_email_statuses([attendee.pk for attendee in list_page["rows"]])
+    # WhatsApp text and links are fetched per row from attendees:share_payload when the button is used.
+    for attendee in list_page["rows"]:
+        attendee.ticket_email = email_statuses.get(attendee.pk)
 
     return {
-        "attendees": page_obj,
-        "page_obj": page_obj,
-        "paginator": paginator,
+        "attendees": list_page["rows"],
+        "list_page": list_page,
         "search": search,
         "status_filter": status,
         "items_per_page": items_per_page,
-        "total": paginator.count,
-        "showing_start": page_obj.start_index() if paginator.count else 0,
-        "showing_end": page_obj.end_index() if paginator.count else 0,
+        "total": list_page["total"],
+        "showing_start": list_page["start"],
+        "showing_end": list_page["end"],
     }
 
 
@@ -388,14 +455,15 @@ def _dashboard_context(
         .select_related("created_by")
         .prefetch_related("payments")
     )[:10]
-    manual_paid = attendees.filter(origin=Attendee.ORIGIN_MANUAL).aggregate(total=Sum("paid_amount")).get("total") or Decimal("0")
-    total_balance = attendees.aggregate(total=Sum("included_balance")).get("total") or 0
-    total_attendees = attendees.count()
-    checked_in = attendees.filter(has_checked_in=True).count()
-    pending = attendees.filter(has_checked_in=False).count()
-    expense_total = cash_movements.filter(movement_type=CashMovement.TYPE_EXPENSE).aggregate(total=Sum("total_amount")).get("total") or Decimal("0")
-    event_day_total = cash_movements.filter(movement_type=CashMovement.TYPE_EVENT_DAY).aggregate(total=Sum("total_amount")).get("total") or Decimal("0")
-    cash_drop_total = cash_movements.filter(movement_type=CashMovement.TYPE_CASH_DROP).aggregate(total=Sum("total_amount")).get("total") or Decimal("0")
+    counters = get_event_counters(event.pk)
+    manual_paid = counters.manual_income
+    total_balance = counters.included_balance
+    total_attendees = counters.attendees
+    checked_in = counters.checked_in
+    pending = total_attendees - checked_in
+    expense_total = counters.entrance_expenses + counters.bar_expenses
+    event_day_total = counters.event_day_income
+    cash_drop_total = counters.entrance_cash_drops + counters.bar_cash_drops
     total_paid = manual_paid + event_day_total
     net_total = total_paid - expense_total
 
@@ -440,7 +508,7 @@ def _dashboard_context(
         "total_asistentes": total_attendees,
         "asistentes_ingresados": checked_in,
         "pendientes": pending,
-        "mis_verificaciones": attendees.filter(checked_in_by=request.user, checked_in_at__date=today).count(),
+        "mis_verificaciones": get_operator_check_ins(event.pk, request.user.pk, today),
         "balance_total": total_balance,
         "total_recaudado": total_paid,
         "total_gastos": expense_total,
@@ -470,9 +538,10 @@ def _dashboard_context(
         "payment_total": payment_total,
         "total_recaudado": total_paid,
         "total_balance": total_balance,
-        "registros": attendees.count(),
+        "registros": total_attendees,
         "initial_tab": initial_tab,
         "open_modal": open_modal,
+        "live_counters_sse": settings.LIVE_COUNTERS_SSE,
         "editing_expense": editing_expense,
         "editing_cash_drop": editing_cash_drop,
         "expense_movements": entrance_expense_movements,
@@ -531,8 +600,6 @@ def attendee_list(request):
         editing_expense=editing_expense,
         editing_cash_drop=editing_cash_drop,
     )
-    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-        return render(request, "attendees/_table.html", context)
     return render(request, "attendees/list.html", context)
 
 
@@ -555,23 +622,17 @@ def attendee_create(request):
             if not attendee.paid_amount:
                 attendee.paid_amount = attendee.category.price
             attendee.save()
-            email_sent = False
-            email_error = None
-            try:
-                email_sent, email_error = send_attendee_ticket_email(attendee)
-            except Exception as exc:
-                email_error = str(exc)
-
-            if email_sent:
+            if attendee.email:
+                enqueue_ticket_email(attendee)
                 messages.success(
                     request,
                     f"Asistente {attendee.name} registrado correctamente.",
                 )
-                email_status = "accepted"
+                email_status = "queued"
             else:
                 messages.warning(
                     request,
-                    f"Asistente {attendee.name} registrado, pero no se pudo enviar el correo. {email_error or ''}".strip(),
+                    f"Asistente {attendee.name} registrado, pero no se pudo enviar el correo. El asistente no tiene correo.",
                 )
                 email_status = "failed"
             return redirect(
@@ -585,6 +646,37 @@ def attendee_create(request):
     return redirect(f"{reverse('attendees:list')}?tab=crear")
 
 
+@require_POST
+@login_required
+def attendee_import(request):
+    branch, event = _get_branch_and_event(request)
+    if not branch or not event:
+        return JsonResponse({"success": False, "message": "Selecciona sucursal y evento."}, status=400)
+    if not user_can_access_attendees(request.user, branch, event):
+        return JsonResponse({"success": False, "message": "Sin permisos para entrada."}, status=403)
+
+    upload = request.FILES.get("archivo")
+    if not upload:
+        return JsonResponse({"success": False, "message": "Selecciona un archivo .xlsx o .csv."}, status=400)
+    try:
+        report = import_attendees(
+            branch,
+            event,
+            request.user,
+            iter_import_rows(upload, upload.name),
+            send_emails=request.POST.get("enviar_correos") == "on",
+        )
+    except ValueError as exc:
+        return JsonResponse({"success": False, "message": str(exc)}, status=400)
+    return JsonResponse(
+        {
+            "success": True,
+            "message": f"Importados {report['created']} asistentes. Filas con errores: {report['failed']}.",
+            **report,
+        }
+    )
+
+
 @login_required
 def attendee_category_create(request):
     branch, event = _get_branch_and_event(request)
@@ -1026,7 +1118,11 @@ def attendee_check_in_preview(request):
     if not attendee:
         return JsonResponse({"success": False, "message": "Codigo QR invalido o asistente no encontrado."}, status=404)
 
-    if attendee.has_checked_in:
+    created = False
+    if payload.get("fast_lane") is True:
+        attendee, created = check_in_attendee(attendee, request.user)
+
+    if attendee.has_checked_in and not created:
         checked_in_at = timezone.localtime(attendee.checked_in_at).strftime("%d/%m/%Y %H:%M") if attendee.checked_in_at else ""
         verified_by = attendee.checked_in_by.username if attendee.checked_in_by else "N/A"
         return JsonResponse(
@@ -1037,18 +1133,71 @@ def attendee_check_in_preview(request):
             }
         )
 
+    attendee_data = {
+        "name": attendee.name,
+        "cc": attendee.cc,
+        "phone": attendee.phone,
+        "email": attendee.email,
+        "category": attendee.category.name,
+        "balance": attendee.included_balance,
+        "paid_amount": str(attendee.paid_amount),
+        "created_at": timezone.localtime(attendee.created_at).strftime("%d/%m/%Y"),
+    }
+    if created:
+        checked_in_at = timezone.localtime(attendee.checked_in_at)
+        attendee_data.update(time=checked_in_at.strftime("%H:%M:%S"), date=checked_in_at.strftime("%d/%m/%Y"))
+        return JsonResponse({"success": True, "checked_in": True, "attendee": attendee_data})
+    return JsonResponse({"success": True, "token": issue_check_in_token(attendee), "attendee": attendee_data})
+
+
+@require_POST
+@login_required
+def attendee_confirm_check_in(request):
+    branch, event = _get_branch_and_event(request)
+    if not branch or not event:
+        return JsonResponse({"success": False, "message": "Selecciona sucursal y evento."}, status=400)
+    if not user_can_access_attendees(request.user, branch, event):
+        return JsonResponse({"success": False, "message": "Sin permisos para entrada."}, status=403)
+
+    payload = _parse_json_request(request)
+    if payload is None:
+        return JsonResponse({"success": False, "message": "Datos invalidos."}, status=400)
+
+    ticket = redeem_check_in_token(event, request.user, str(payload.get("token") or ""))
+    if ticket is not None:
+        if ticket["status"] == "not_found":
+            return JsonResponse({"success": False, "message": "Asistente no encontrado."}, status=404)
+        if not ticket["created"]:
+            return JsonResponse({"success": False, "message": "El asistente ya habia ingresado."}, status=400)
+        attendee_data = {key: ticket[key] for key in ("name", "cc", "category", "balance")}
+        checked_in_at = timezone.localtime(ticket["checked_in_at"])
+    else:
+        code = str(payload.get("codigo") or payload.get("code") or "").strip()
+        if not code:
+            return JsonResponse({"success": False, "message": "Codigo QR vacio."}, status=400)
+
+        attendee = get_attendee_for_branch(branch, event, code)
+        if not attendee:
+            return JsonResponse({"success": False, "message": "Asistente no encontrado."}, status=404)
+
+        attendee, created = check_in_attendee(attendee, request.user)
+        if not created:
+            return JsonResponse({"success": False, "message": "El asistente ya habia ingresado."}, status=400)
+        attendee_data = {
+            "name": attendee.name,
+            "cc": attendee.cc,
+            "category": attendee.category.name,
+            "balance": attendee.included_balance,
+        }
+        checked_in_at = timezone.localtime(attendee.checked_in_at)
+
     return JsonResponse(
         {
             "success": True,
             "attendee": {
-                "name": attendee.name,
-                "cc": attendee.cc,
-                "phone": attendee.phone,
-                "email": attendee.email,
-                "category": attendee.category.name,
-                "balance": attendee.included_balance,
-                "paid_amount": str(attendee.paid_amount),
-                "created_at": timezone.localtime(attendee.created_at).strftime("%d/%m/%Y"),
+                **attendee_data,
+                "time": checked_in_at.strftime("%H:%M:%S"),
+                "date": checked_in_at.strftime("%d/%m/%Y"),
             },
         }
     )
@@ -1056,7 +1205,7 @@ def attendee_check_in_preview(request):
 
 @require_POST
 @login_required
-def attendee_confirm_check_in(request):
+def attendee_batch_check_in(request):
     branch, event = _get_branch_and_event(request)
     if not branch or not event:
         return JsonResponse({"success": False, "message": "Selecciona sucursal y evento."}, status=400)
@@ -1064,37 +1213,200 @@ def attendee_confirm_check_in(request):
         return JsonResponse({"success": False, "message": "Sin permisos para entrada."}, status=403)
 
     payload = _parse_json_request(request)
-    if payload is None:
+    codes = payload.get("codes") if isinstance(payload, dict) else None
+    if not isinstance(codes, list):
         return JsonResponse({"success": False, "message": "Datos invalidos."}, status=400)
+    if len(codes) > CHECK_IN_BATCH_MAX_CODES:
+        return JsonResponse(
+            {"success": False, "message": f"Maximo {CHECK_IN_BATCH_MAX_CODES} codigos por solicitud."},
+            status=400,
+        )
 
-    code = str(payload.get("codigo") or payload.get("code") or "").strip()
-    if not code:
-        return JsonResponse({"success": False, "message": "Codigo QR vacio."}, status=400)
+    results = []
+    for result in check_in_attendees_batch(branch, event, request.user, codes):
+        attendee = result["attendee"]
+        item = {"code": result["code"], "status": result["status"]}
+        if attendee is not None:
+            item.update(
+                {
+                    "name": attendee.name,
+                    "cc": attendee.cc,
+                    "category": attendee.category.name,
+                    "checked_in_at": (
+                        timezone.localtime(attendee.checked_in_at).strftime("%d/%m/%Y %H:%M")
+                        if attendee.checked_in_at
+                        else ""
+                    ),
+                    "checked_in_by": attendee.checked_in_by.username if attendee.checked_in_by else "",
+                }
+            )
+        results.append(item)
+    return JsonResponse(
+        {
+            "success": True,
+            "checked_in": sum(1 for item in results if item["status"] == "checked_in"),
+            "results": results,
+        }
+    )
 
-    attendee = get_attendee_for_branch(branch, event, code)
-    if not attendee:
-        return JsonResponse({"success": False, "message": "Asistente no encontrado."}, status=404)
 
-    attendee, created = check_in_attendee(attendee, request.user)
-    if not created:
-        return JsonResponse({"success": False, "message": "El asistente ya habia ingresado."}, status=400)
+@require_GET
+@login_required
+@gzip_page
+def attendee_offline_manifest(request):
+    branch, event = _get_branch_and_event(request)
+    if not branch or not event:
+        return JsonResponse({"success": False, "message": "Selecciona sucursal y evento."}, status=400)
+    if not user_can_access_attendees(request.user, branch, event):
+        return JsonResponse({"success": False, "message": "Sin permisos para entrada."}, status=403)
+
+    try:
+        since = int(request.GET.get("since") or 0)
+        manifest = build_offline_manifest(event, since=max(since, 0))
+    except ValueError:
+        return JsonResponse({"success": False, "message": "Version invalida."}, status=400)
+
+    response = JsonResponse({"success": True, **manifest}, json_dumps_params={"separators": (",", ":")})
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@require_POST
+@login_required
+def attendee_offline_sync(request):
+    branch, event = _get_branch_and_event(request)
+    if not branch or not event:
+        return JsonResponse({"success": False, "message": "Selecciona sucursal y evento."}, status=400)
+    if not user_can_access_attendees(request.user, branch, event):
+        return JsonResponse({"success": False, "message": "Sin permisos para entrada."}, status=403)
 
-    checked_in_at = timezone.localtime(attendee.checked_in_at)
+    payload = _parse_json_request(request)
+    scans = payload.get("scans") if isinstance(payload, dict) else None
+    if not isinstance(scans, list):
+        return JsonResponse({"success": False, "message": "Datos invalidos."}, status=400)
+    if len(scans) > OFFLINE_SYNC_MAX_SCANS:
+        return JsonResponse(
+            {"success": False, "message": f"Maximo {OFFLINE_SYNC_MAX_SCANS} ingresos por sincronizacion."},
+            status=400,
+        )
+
+    results = sync_offline_check_ins(branch, event, request.user, scans)
     return JsonResponse(
         {
             "success": True,
-            "attendee": {
-                "name": attendee.name,
-                "cc": attendee.cc,
-                "category": attendee.category.name,
-                "balance": attendee.included_balance,
-                "time": checked_in_at.strftime("%H:%M:%S"),
-                "date": checked_in_at.strftime("%d/%m/%Y"),
-            },
+            "checked_in": sum(1 for result in results if result["status"] == "checked_in"),
+            "results": results,
         }
     )
 
 
+def _live_counters_events(event, user):
+    # One short-lived stream per connection; a frame goes out only when the counters version moves.
+    yield f"retry: {LIVE_COUNTERS_POLL_SECONDS * 1000}\n\n"
+    deadline = time.monotonic() + settings.LIVE_COUNTERS_STREAM_SECONDS
+    version = None
+    while True:
+        counters = get_live_counters(event, user)
+        if counters["version"] != version:
+            version = counters["version"]
+            yield f"id: {version}\ndata: {json.dumps(counters, separators=(',', ':'))}\n\n"
+        else:
+            yield ": ping\n\n"
+        if time.monotonic() >= deadline:
+            return
+        time.sleep(LIVE_COUNTERS_POLL_SECONDS)
+
+
+def _live_counters_etag(version):
+    # "my_verifications" starts over at midnight even when no counter moved.
+    return quote_etag(f"{version}-{timezone.localdate():%Y%m%d}")
+
+
+@require_GET
+@login_required
+def attendee_live_counters(request):
+    branch, event = _get_branch_and_event(request)
+    if not branch or not event:
+        return JsonResponse({"success": False, "message": "Selecciona sucursal y evento."}, status=400)
+    if not user_can_access_attendees(request.user, branch, event):
+        return JsonResponse({"success": False, "message": "Sin permisos para entrada."}, status=403)
+
+    if settings.LIVE_COUNTERS_SSE and (
+        "text/event-stream" in request.headers.get("Accept", "") or request.GET.get("stream") == "1"
+    ):
+        response = StreamingHttpResponse(
+            _live_counters_events(event, request.user),
+            content_type="text/event-stream",
+        )
+        response["X-Accel-Buffering"] = "no"
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    # Long-poll: a client sending its current ETag waits here for the next change, then gets 304 or a new snapshot.
+    etag = _live_counters_etag(get_live_counters_version(event))
+    response = get_conditional_response(request, etag=etag)
+    deadline = time.monotonic() + settings.LIVE_COUNTERS_WAIT_SECONDS
+    while response is not None and time.monotonic() < deadline:
+        time.sleep(LIVE_COUNTERS_POLL_SECONDS)
+        etag = _live_counters_etag(get_live_counters_version(event))
+        response = get_conditional_response(request, etag=etag)
+    if response is None:
+        counters = get_live_counters(event, request.user)
+        etag = _live_counters_etag(counters["version"])
+        response = JsonResponse({"success": True, **counters})
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@require_GET
+@login_required
+def attendee_list_data(request):
+    branch, event = _get_branch_and_event(request)
+    if not branch or not event:
+        return JsonResponse({"success": False, "message": "Selecciona sucursal y evento."}, status=400)
+    if not user_can_access_attendees(request.user, branch, event):
+        return JsonResponse({"success": False, "message": "Sin permisos para entrada."}, status=403)
+
+    can_delete_checked_in = user_can_manage_events(request.user, branch, event)
+    version = get_attendee_list_version(event)
+    etag = quote_etag(
+        hashlib.sha1(f"{version}|{can_delete_checked_in}|{request.GET.urlencode()}".encode()).hexdigest()
+    )
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        attendees = _attendee_queryset(branch, event).only(*LIST_DATA_FIELDS)
+        list_page, _search, _status, items_per_page = _paginate_list(request, attendees, event, version)
+        email_statuses = get_ticket_email_statuses([attendee.pk for attendee in list_page["rows"]])
+        response = JsonResponse(
+            {
+                "success": True,
+                "version": version,
+                "rows": [
+                    _serialize_list_row(attendee, email_statuses.get(attendee.pk)) for attendee in list_page["rows"]
+                ],
+                "can_delete_checked_in": can_delete_checked_in,
+                "items_per_page": items_per_page,
+                **{key: list_page[key] for key in LIST_DATA_PAGE_KEYS},
+            }
+        )
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+def attendee_search(request):
+    branch, event = _get_branch_and_event(request)
+    if not branch or not event:
+        return JsonResponse({"success": False, "message": "Selecciona sucursal y evento."}, status=400)
+    if not user_can_access_attendees(request.user, branch, event):
+        return JsonResponse({"success": False, "message": "Sin permisos para entrada."}, status=403)
+
+    term = request.GET.get("q", "").strip()
+    return JsonResponse({"success": True, "results": search_attendee_results(event, term) if term else []})
+
+
 @require_POST
 @login_required
 def attendee_mark_checked_in(request):
@@ -1145,6 +1457,57 @@ def attendee_delete(request):
     return JsonResponse({"success": True, "message": f"{name} eliminado exitosamente."})
 
 
+def _serialize_list_row(attendee, ticket_email):
+    return {
+        "id": attendee.pk,
+        "name": attendee.name,
+        "cc": attendee.cc,
+        "category": attendee.category.name,
+        "phone": attendee.phone,
+        "email": attendee.email,
+        "paid_amount": attendee.paid_amount,
+        "checked_in": attendee.has_checked_in,
+        "checked_in_by": attendee.checked_in_by.username if attendee.checked_in_by else "",
+        "qr_code": attendee.qr_code,
+        "ticket_email": _serialize_ticket_email(ticket_email) if ticket_email else None,
+    }
+
+
+def _serialize_ticket_email(ticket_email):
+    return {
+        "status": ticket_email.status,
+        "label": ticket_email.get_status_display(),
+        "attempts": ticket_email.attempts,
+        "pending": ticket_email.is_pending,
+        "error": ticket_email.last_error if ticket_email.status == TicketEmail.STATUS_DEAD else "",
+    }
+
+
+@require_GET
+@login_required
+def attendee_email_status(request):
+    branch, event = _get_branch_and_event(request)
+    if not branch or not event:
+        return JsonResponse({"success": False, "message": "Selecciona sucursal y evento."}, status=400)
+    if not user_can_access_attendees(request.user, branch, event):
+        return JsonResponse({"success": False, "message": "Sin permisos para entrada."}, status=403)
+
+    requested_ids = [value for value in request.GET.get("ids", "").split(",") if value.strip().isdigit()][:100]
+    attendee_ids = list(
+        Attendee.objects.filter(branch=branch, event=event, pk__in=requested_ids).values_list("pk", flat=True)
+    )
+    statuses = get_ticket_email_statuses(attendee_ids)
+    return JsonResponse(
+        {
+            "success": True,
+            "statuses": {
+                str(attendee_id): _serialize_ticket_email(ticket_email)
+                for attendee_id, ticket_email in statuses.items()
+            },
+        }
+    )
+
+
 @require_GET
 @login_required
 def attendee_qr_detail(request, cc):
@@ -1155,10 +1518,15 @@ def attendee_qr_detail(request, cc):
         return JsonResponse({"success": False, "message": "Sin permisos para entrada."}, status=403)
 
     attendee = get_object_or_404(_attendee_queryset(branch, event), cc=cc)
+    if event.qr_render_mode == Event.QR_MODE_VECTOR:
+        qr_url = reverse("attendees:qr_svg", args=[attendee.qr_code])
+    else:
+        ensure_attendee_qr(attendee)
+        qr_url = attendee.qr_image.url if attendee.qr_image else ""
     return JsonResponse(
         {
             "success": True,
-            "qr_url": attendee.qr_image.url if attendee.qr_image else "",
+            "qr_url": qr_url,
             "attendee": {
                 "name": attendee.name,
                 "cc": attendee.cc,
@@ -1170,6 +1538,21 @@ def attendee_qr_detail(request, cc):
     )
 
 
+@require_GET
+@login_required
+def attendee_qr_svg(request, qr_code):
+    branch, event = _get_branch_and_event(request)
+    if not branch or not event:
+        return redirect("shared_ui:dashboard")
+    if not _ensure_attendee_access(request, branch, event):
+        return redirect("shared_ui:dashboard")
+
+    attendee = get_object_or_404(_attendee_queryset(branch, event), qr_code=qr_code)
+    response = HttpResponse(build_qr_svg(attendee.qr_code, event, branch), content_type="image/svg+xml")
+    response["Content-Disposition"] = f'inline; filename="{attendee.qr_code}.svg"'
+    return response
+
+
 @require_GET
 def attendee_whatsapp_share(request, qr_code):
     attendee = get_object_or_404(
@@ -1182,18 +1565,44 @@ def attendee_whatsapp_share(request, qr_code):
         "share_title": f"{attendee.event.name} - {attendee.name}",
         "share_description": "Acceso del evento con QR y datos del asistente.",
         "card_url": card_url,
+        "qr_svg": "",
     }
+    if attendee.event.qr_render_mode == Event.QR_MODE_VECTOR:
+        # The SVG only carries escaped colors and a base64 badge, so it can be inlined as is.
+        context["qr_svg"] = mark_safe(build_qr_svg(attendee.qr_code, attendee.event, attendee.branch))
     return render(request, "attendees/whatsapp_share.html", context)
 
 
+@require_GET
+@login_required
+def attendee_share_payload(request, qr_code):
+    branch, event = _get_branch_and_event(request)
+    if not branch or not event:
+        return JsonResponse({"success": False, "message": "Selecciona sucursal y evento."}, status=400)
+    if not user_can_access_attendees(request.user, branch, event):
+        return JsonResponse({"success": False, "message": "Sin permisos para entrada."}, status=403)
+
+    attendee = _attendee_queryset(branch, event).select_related("event").filter(qr_code=qr_code).first()
+    if not attendee:
+        return JsonResponse({"success": False, "message": "Asistente no encontrado."}, status=404)
+    return JsonResponse({"success": True, **_build_whatsapp_share_payload(request, attendee)})
+
+
 @require_GET
 def attendee_whatsapp_card(request, qr_code):
     attendee = get_object_or_404(
         Attendee.objects.select_related("branch", "event", "category"),
         qr_code=qr_code,
     )
-    image_bytes = build_whatsapp_share_card_png(attendee)
-    return HttpResponse(image_bytes, content_type="image/png")
+    card_asset = get_whatsapp_share_card_asset(attendee)
+    response = stored_file_response(
+        request,
+        card_asset.file.name,
+        content_type="image/png",
+        etag=card_asset.checksum,
+    )
+    patch_cache_control(response, public=True, max_age=WHATSAPP_CARD_MAX_AGE)
+    return response
 
 
 @require_GET
@@ -1206,6 +1615,17 @@ def attendee_whatsapp_qr_file(request, qr_code):
         return redirect("shared_ui:dashboard")
 
     attendee = get_object_or_404(_attendee_queryset(branch, event), qr_code=qr_code)
+    ensure_attendee_qr(attendee)
+    png_name, qr_asset = get_png_derivative(attendee, "qr_image", "attendee_qr")
+    if png_name:
+        return stored_file_response(
+            request,
+            png_name,
+            content_type="image/png",
+            filename=f"{attendee.qr_code}.png",
+            etag=qr_asset.checksum,
+        )
+
     image_bytes = build_qr_png_bytes(attendee.qr_code, attendee.event, attendee.branch)
     response = HttpResponse(image_bytes, content_type="image/png")
     response["Content-Disposition"] = f'inline; filename="{attendee.qr_code}.png"'
@@ -1226,9 +1646,13 @@ def attendee_whatsapp_flyer_file(request, qr_code):
     if not payload:
         return JsonResponse({"success": False, "message": "El evento no tiene flyer configurado."}, status=404)
 
-    response = HttpResponse(payload["content"], content_type=payload["mimetype"])
-    response["Content-Disposition"] = f'inline; filename="{payload["filename"]}"'
-    return response
+    return stored_file_response(
+        request,
+        payload["name"],
+        content_type=payload["mimetype"],
+        filename=payload["filename"],
+        etag=payload["etag"],
+    )
 
 
 @require_GET
@@ -1240,58 +1664,55 @@ def attendee_export_excel(request):
     if not _ensure_attendee_access(request, branch, event):
         return redirect("shared_ui:dashboard")
 
-    attendees = _attendee_queryset(branch, event)
-
-    workbook = openpyxl.Workbook()
-    sheet = workbook.active
-    sheet.title = f"Entrada {event.name[:18]}"
+    # Write-only mode spools rows to a temp file instead of keeping every cell in memory.
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(f"Entrada {event.name[:18]}")
+    for index, width in enumerate(EXPORT_COLUMN_WIDTHS, start=1):
+        sheet.column_dimensions[openpyxl.utils.get_column_letter(index)].width = width
 
     header_font = Font(bold=True, color="FFFFFF")
     header_fill = PatternFill(start_color="0F5132", end_color="0F5132", fill_type="solid")
     center = Alignment(horizontal="center", vertical="center")
-
-    headers = [
-        "NOMBRE",
-        "CEDULA",
-        "TELEFONO",
-        "CORREO",
-        "CATEGORIA",
-        "PRECIO PAGADO",
-        "BALANCE",
-        "ESTADO",
-        "FECHA REGISTRO",
-        "FECHA INGRESO",
-        "VERIFICADO POR",
-    ]
-
-    for index, value in enumerate(headers, start=1):
-        cell = sheet.cell(row=1, column=index, value=value)
+    headers = []
+    for value in EXPORT_HEADERS:
+        cell = WriteOnlyCell(sheet, value=value)
         cell.font = header_font
         cell.fill = header_fill
         cell.alignment = center
+        headers.append(cell)
+    sheet.append(headers)
+    for row in iter_attendee_export_rows(Attendee.objects.filter(branch=branch, event=event)):
+        sheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f"entrada_{branch.slug}_{event.slug}.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
 
-    for row_index, attendee in enumerate(attendees, start=2):
-        checked_in_at = timezone.localtime(attendee.checked_in_at) if attendee.checked_in_at else None
-        sheet.cell(row=row_index, column=1, value=attendee.name)
-        sheet.cell(row=row_index, column=2, value=attendee.cc)
-        sheet.cell(row=row_index, column=3, value=attendee.phone or "")
-        sheet.cell(row=row_index, column=4, value=attendee.email or "")
-        sheet.cell(row=row_index, column=5, value=attendee.category.name)
-        sheet.cell(row=row_index, column=6, value=float(attendee.paid_amount or 0))
-        sheet.cell(row=row_index, column=7, value=attendee.included_balance)
-        sheet.cell(row=row_index, column=8, value="INGRESO" if attendee.has_checked_in else "PENDIENTE")
-        sheet.cell(row=row_index, column=9, value=timezone.localtime(attendee.created_at).strftime("%d/%m/%Y %H:%M"))
-        sheet.cell(row=row_index, column=10, value=checked_in_at.strftime("%d/%m/%Y %H:%M") if checked_in_at else "")
-        sheet.cell(row=row_index, column=11, value=attendee.checked_in_by.username if attendee.checked_in_by else "")
-
-    widths = [28, 18, 16, 28, 18, 14, 12, 12, 20, 20, 18]
-    for index, width in enumerate(widths, start=1):
-        sheet.column_dimensions[openpyxl.utils.get_column_letter(index)].width = width
 
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    filename = f"entrada_{branch.slug}_{event.slug}.xlsx"
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    workbook.save(response)
+class _CsvLine:
+    def write(self, value):
+        return value
+
+
+@require_GET
+@login_required
+def attendee_export_csv(request):
+    branch, event = _get_branch_and_event(request)
+    if not branch or not event:
+        return redirect("shared_ui:dashboard")
+    if not _ensure_attendee_access(request, branch, event):
+        return redirect("shared_ui:dashboard")
+
+    writer = csv.writer(_CsvLine())
+    rows = iter_attendee_export_rows(Attendee.objects.filter(branch=branch, event=event))
+    # The BOM lets Excel open the accents in the file as UTF-8.
+    content = itertools.chain(["\ufeff", writer.writerow(EXPORT_HEADERS)], (writer.writerow(row) for row in rows))
+    response = StreamingHttpResponse(content, content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="entrada_{branch.slug}_{event.slug}.csv"'
     return response
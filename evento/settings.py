@@ -157,6 +157,18 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# "x-accel-redirect" (nginx) or "x-sendfile" (apache) hands stored file downloads to the front proxy.
+MEDIA_FILE_OFFLOAD = os.environ.get("MEDIA_FILE_OFFLOAD", "").strip().lower()
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get("MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+
+# Live counters are a JSON snapshot; a request carrying the last ETag waits up to this many seconds for a change
+# before answering 304. Each waiting request holds a worker, so keep it short on sync workers.
+LIVE_COUNTERS_WAIT_SECONDS = int(os.environ.get("LIVE_COUNTERS_WAIT_SECONDS", "5"))
+# Server-sent events keep a worker busy per open dashboard for LIVE_COUNTERS_STREAM_SECONDS. Enable them only when
+# the app runs on async (ASGI) or gevent workers; sync workers would be starved by the open streams.
+LIVE_COUNTERS_SSE = os.environ.get("LIVE_COUNTERS_SSE", "False").strip().lower() in {"1", "true", "yes", "on"}
+LIVE_COUNTERS_STREAM_SECONDS = int(os.environ.get("LIVE_COUNTERS_STREAM_SECONDS", "25"))
+
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -210,6 +222,10 @@ DEFAULT_FROM_EMAIL = os.environ.get(
     "EVENT <zamamotas@gmail.com>",
 )
 
+EMAIL_MAX_MESSAGES_PER_CONNECTION = int(os.environ.get("EMAIL_MAX_MESSAGES_PER_CONNECTION", "100"))
+
+EMAIL_FLYER_MAX_WIDTH = int(os.environ.get("EMAIL_FLYER_MAX_WIDTH", "1200"))
+
 EMAIL_MEDIA_BASE_URL = os.environ.get("EMAIL_MEDIA_BASE_URL", "")
 
 WHATSAPP_MEDIA_BASE_URL = os.environ.get(
@@ -1,7 +1,187 @@
-from events.models import Event
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from events.models import Event, EventCategoryCounters, EventCounters, EventOperatorCounters
 
 
 def get_event_choices(branch):
     if not branch:
         return Event.objects.none()
     return Event.objects.filter(branch=branch).order_by("-starts_at")
+
+
+CATEGORY_COUNTER_FIELDS = ("attendees", "checked_in", "paid_amount", "manual_income", "included_balance")
+COUNTER_FIELDS = CATEGORY_COUNTER_FIELDS + (
+    "event_day_income",
+    "entrance_expenses",
+    "entrance_cash_drops",
+    "bar_expenses",
+    "bar_cash_drops",
+    "bar_revenue",
+    "bar_units",
+    "bar_sales",
+)
+
+
+def _count_event_sources(event_id):
+    from attendees.models import Attendee
+    from sales.application import get_cash_movement_counter_field
+    from sales.models import BarSale, CashMovement
+
+    # Annotation names cannot shadow Attendee fields, hence the total_ prefix.
+    rows = [
+        {"category_id": row.pop("category_id"), **{field[6:]: value for field, value in row.items()}}
+        for row in Attendee.objects.filter(event_id=event_id)
+        .order_by()
+        .values("category_id")
+        .annotate(
+            total_attendees=Count("pk"),
+            total_checked_in=Count("pk", filter=Q(has_checked_in=True)),
+            total_paid_amount=Coalesce(Sum("paid_amount"), Decimal("0")),
+            total_manual_income=Coalesce(Sum("paid_amount", filter=Q(origin=Attendee.ORIGIN_MANUAL)), Decimal("0")),
+            total_included_balance=Coalesce(Sum("included_balance"), 0),
+        )
+    ]
+    totals = {field: sum(row[field] for row in rows) for field in CATEGORY_COUNTER_FIELDS}
+    movements = (
+        CashMovement.objects.filter(event_id=event_id)
+        .order_by()
+        .values("module", "movement_type")
+        .annotate(total=Sum("total_amount"))
+    )
+    for movement in movements:
+        field = get_cash_movement_counter_field(movement["module"], movement["movement_type"])
+        totals[field] = totals.get(field, Decimal("0")) + movement["total"]
+    sales = BarSale.objects.filter(event_id=event_id).aggregate(
+        bar_revenue=Coalesce(Sum("total"), Decimal("0")),
+        bar_units=Coalesce(Sum("quantity"), 0),
+        bar_sales=Count("sale_group", distinct=True),
+    )
+    return dict.fromkeys(COUNTER_FIELDS, 0) | totals | sales, rows
+
+
+def _count_operator_check_ins(event_id):
+    from attendees.models import Attendee
+
+    # TruncDate uses the active time zone, the same local day check-ins are credited to.
+    return [
+        EventOperatorCounters(event_id=event_id, user_id=row["checked_in_by"], day=row["day"], checked_in=row["total"])
+        for row in Attendee.objects.filter(
+            event_id=event_id,
+            has_checked_in=True,
+            checked_in_by__isnull=False,
+            checked_in_at__isnull=False,
+        )
+        .order_by()
+        .values("checked_in_by", day=TruncDate("checked_in_at"))
+        .annotate(total=Count("pk"))
+    ]
+
+
+def _store_operator_counters(event_id):
+    EventOperatorCounters.objects.filter(event_id=event_id).delete()
+    EventOperatorCounters.objects.bulk_create(_count_operator_check_ins(event_id))
+
+
+def _seed_event_counters(event_id):
+    totals, rows = _count_event_sources(event_id)
+    try:
+        with transaction.atomic():
+            counters = EventCounters.objects.create(event_id=event_id, **totals)
+            EventCategoryCounters.objects.filter(event_id=event_id).delete()
+            EventCategoryCounters.objects.bulk_create(EventCategoryCounters(event_id=event_id, **row) for row in rows)
+            _store_operator_counters(event_id)
+    except IntegrityError:
+        # Another writer seeded it first, from source rows that already held its own change. The read has to lock:
+        # a plain one would use this transaction's snapshot on MySQL, taken before that row was committed.
+        _touch_event_counters(event_id)
+        counters = EventCounters.objects.select_for_update().get(event_id=event_id)
+    return counters
+
+
+def _touch_event_counters(event_id):
+    # A no-op UPDATE takes the row lock on every backend, SQLite included, which ignores FOR UPDATE, and leaves
+    # updated_at alone so the live counters version only moves on real changes.
+    return EventCounters.objects.filter(event_id=event_id).update(updated_at=F("updated_at"))
+
+
+@transaction.atomic
+def rebuild_event_counters(event_id):
+    if not _touch_event_counters(event_id):
+        return _seed_event_counters(event_id)
+    totals, rows = _count_event_sources(event_id)
+    counters, _ = EventCounters.objects.update_or_create(event_id=event_id, defaults=totals)
+    for row in rows:
+        EventCategoryCounters.objects.update_or_create(
+            event_id=event_id,
+            category_id=row["category_id"],
+            defaults={field: row[field] for field in CATEGORY_COUNTER_FIELDS},
+        )
+    EventCategoryCounters.objects.filter(event_id=event_id).exclude(
+        category_id__in=[row["category_id"] for row in rows]
+    ).delete()
+    _store_operator_counters(event_id)
+    return counters
+
+
+def lock_event_counters(*event_ids):
+    # Call inside the writer's transaction before touching any counted row: seeding afterwards would count the
+    # change twice, once from the source rows and once more from the bump.
+    for event_id in sorted({event_id for event_id in event_ids if event_id}):
+        if not _touch_event_counters(event_id):
+            _seed_event_counters(event_id)
+
+
+def bump_event_counters(event_id, category_id=None, **deltas):
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    with transaction.atomic(savepoint=False):
+        increments = {field: F(field) + value for field, value in deltas.items()}
+        if not EventCounters.objects.filter(event_id=event_id).update(updated_at=timezone.now(), **increments):
+            raise RuntimeError(f"Los contadores del evento {event_id} no se bloquearon antes de escribir.")
+        category_deltas = {field: value for field, value in deltas.items() if field in CATEGORY_COUNTER_FIELDS}
+        if not category_id or not category_deltas:
+            return
+        _bump_or_create(EventCategoryCounters, {"event_id": event_id, "category_id": category_id}, category_deltas)
+
+
+def bump_operator_check_ins(event_id, user_id, day, delta):
+    # Same rule as bump_event_counters: the caller already holds lock_event_counters(event_id).
+    if user_id and delta:
+        _bump_or_create(
+            EventOperatorCounters,
+            {"event_id": event_id, "user_id": user_id, "day": day},
+            {"checked_in": delta},
+        )
+
+
+def _bump_or_create(model, lookup, deltas):
+    rows = model.objects.filter(**lookup)
+    increments = {field: F(field) + value for field, value in deltas.items()}
+    if not rows.update(**increments):
+        # get_or_create inserts in a savepoint, so a racing insert never aborts the caller's transaction.
+        _, created = model.objects.get_or_create(**lookup, defaults=deltas)
+        if not created:
+            rows.update(**increments)
+
+
+def get_event_counters(event_id):
+    counters = EventCounters.objects.filter(event_id=event_id).first()
+    if counters is None:
+        with transaction.atomic():
+            counters = _seed_event_counters(event_id)
+    return counters
+
+
+def get_operator_check_ins(event_id, user_id, day):
+    rows = EventOperatorCounters.objects.filter(event_id=event_id, user_id=user_id, day=day)
+    return rows.values_list("checked_in", flat=True).first() or 0
+
+
+def get_category_counters(event_id):
+    return {row.category_id: row for row in EventCategoryCounters.objects.filter(event_id=event_id)}
@@ -38,6 +38,7 @@ class EventForm(forms.ModelForm):
         self.fields["ends_at"].required = False
         self.fields["status"].widget = forms.HiddenInput()
         self.fields["status"].required = False
+        self.fields["qr_render_mode"].required = False
 
         if self.instance.pk:
             self.initial["starts_at"] = self._format_datetime_local(self.instance.starts_at)
@@ -67,6 +68,9 @@ class EventForm(forms.ModelForm):
         cleaned_data = super().clean()
         cleaned_data["ends_at"] = cleaned_data.get("ends_at") or cleaned_data.get("starts_at")
         cleaned_data["status"] = cleaned_data.get("status") or Event.STATUS_ACTIVE
+        cleaned_data["qr_render_mode"] = (
+            cleaned_data.get("qr_render_mode") or self.instance.qr_render_mode or Event.QR_MODE_RASTER
+        )
         return cleaned_data
 
     def clean_logo(self):
@@ -91,6 +95,8 @@ class EventForm(forms.ModelForm):
             "qr_background_color",
             "qr_logo_background_color",
             "qr_logo_scale",
+            "qr_render_mode",
+            "qr_signed_codes",
             "access_policy",
             "email_subject",
             "email_preheader",
@@ -298,6 +304,11 @@ class EventForm(forms.ModelForm):
             "email_footer": "Mensaje corto al final del correo.",
             "logo": "Solo PNG. Este logo se usa en el evento y tambien en el QR.",
             "qr_logo_scale": "4 es el tamano recomendado: ocupa aprox. una cuarta parte del QR.",
+            "qr_render_mode": "Vector es mas liviano y nitido en el panel, la pagina para compartir e impresion. El correo siempre usa PNG.",
+            "qr_signed_codes": (
+                "Los nuevos QR incluyen una firma que la entrada valida sin consultar la base. "
+                "Los codigos ya emitidos siguen funcionando; usa reissue_attendee_qr_codes para reemplazarlos."
+            ),
         }
 
         labels = {
@@ -314,6 +325,8 @@ class EventForm(forms.ModelForm):
             "qr_background_color": "Color de fondo del QR",
             "qr_logo_background_color": "Color del circulo del logo",
             "qr_logo_scale": "Tamano del logo",
+            "qr_render_mode": "Formato del QR en pantalla",
+            "qr_signed_codes": "Firmar codigos QR",
             "access_policy": "Politica de acceso",
             "email_subject": "Asunto del correo",
             "email_preheader": "Texto corto del encabezado",
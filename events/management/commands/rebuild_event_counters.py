@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events.application import COUNTER_FIELDS, rebuild_event_counters
+from events.models import Event, EventCounters
+
+
+class Command(BaseCommand):
+    help = "Recalcula los contadores de eventos desde asistentes, ventas y movimientos de caja."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", type=int, help="ID del evento. Sin este valor se recalculan todos.")
+
+    def handle(self, *args, **options):
+        events = Event.objects.order_by("pk")
+        if options["event"]:
+            events = events.filter(pk=options["event"])
+            if not events.exists():
+                raise CommandError(f"No existe un evento con id {options['event']}.")
+
+        rebuilt = drifted = 0
+        for event_id in events.values_list("pk", flat=True):
+            before = EventCounters.objects.filter(event_id=event_id).values(*COUNTER_FIELDS).first()
+            counters = rebuild_event_counters(event_id)
+            if before is not None and before != {field: getattr(counters, field) for field in COUNTER_FIELDS}:
+                drifted += 1
+                self.stdout.write(f"Evento {event_id}: contadores corregidos.")
+            rebuilt += 1
+        self.stdout.write(self.style.SUCCESS(f"Contadores recalculados: {rebuilt} eventos, {drifted} con diferencias."))
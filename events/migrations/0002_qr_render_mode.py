@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='qr_render_mode',
+            field=models.CharField(choices=[('raster', 'Imagen (PNG)'), ('vector', 'Vector (SVG)')], default='raster', max_length=8),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_qr_render_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='qr_signed_codes',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendees', '0004_attendee_updated_at'),
+        ('events', '0003_qr_signed_codes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventCounters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attendees', models.IntegerField(default=0)),
+                ('checked_in', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='counters', to='events.event')),
+            ],
+            options={
+                'verbose_name': 'Contadores del evento',
+                'verbose_name_plural': 'Contadores de eventos',
+            },
+        ),
+        migrations.CreateModel(
+            name='EventCategoryCounters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attendees', models.IntegerField(default=0)),
+                ('checked_in', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_counters', to='attendees.category')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_counters', to='events.event')),
+            ],
+            options={
+                'verbose_name': 'Contadores por categoria',
+                'verbose_name_plural': 'Contadores por categoria',
+                'constraints': [models.UniqueConstraint(fields=('event', 'category'), name='events_category_counters_uniq')],
+            },
+        ),
+    ]
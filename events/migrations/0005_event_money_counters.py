@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:39
+
+from django.db import migrations, models
+
+
+def reset_counters(apps, schema_editor):
+    # Rows seeded before the money columns existed are dropped and rebuilt on first use.
+    apps.get_model("events", "EventCategoryCounters").objects.all().delete()
+    apps.get_model("events", "EventCounters").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventcategorycounters',
+            name='included_balance',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='eventcategorycounters',
+            name='manual_income',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='eventcategorycounters',
+            name='paid_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='eventcounters',
+            name='bar_cash_drops',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='eventcounters',
+            name='bar_expenses',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='eventcounters',
+            name='bar_revenue',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='eventcounters',
+            name='bar_sales',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='eventcounters',
+            name='bar_units',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='eventcounters',
+            name='entrance_cash_drops',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='eventcounters',
+            name='entrance_expenses',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='eventcounters',
+            name='event_day_income',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='eventcounters',
+            name='included_balance',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='eventcounters',
+            name='manual_income',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='eventcounters',
+            name='paid_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.RunPython(reset_counters, migrations.RunPython.noop),
+    ]
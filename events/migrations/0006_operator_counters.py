@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def reset_counters(apps, schema_editor):
+    # Seeding is what fills the operator rows, so existing counters are dropped and rebuilt on first use.
+    apps.get_model("events", "EventCategoryCounters").objects.all().delete()
+    apps.get_model("events", "EventCounters").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_money_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventOperatorCounters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('checked_in', models.IntegerField(default=0)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='operator_counters', to='events.event')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Contadores por operador',
+                'verbose_name_plural': 'Contadores por operador',
+                'constraints': [models.UniqueConstraint(fields=('event', 'user', 'day'), name='events_operator_counters_uniq')],
+            },
+        ),
+        migrations.RunPython(reset_counters, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,12 @@
+from django.conf import settings
 from django.db import models
 from django.utils.text import slugify
 from django.core.validators import MaxValueValidator, MinValueValidator
 
 
 class Event(models.Model):
+    QR_BADGE_FIELDS = ("logo", "qr_fill_color", "qr_logo_background_color", "qr_logo_scale")
+
     STATUS_DRAFT = "draft"
     STATUS_ACTIVE = "active"
     STATUS_ARCHIVED = "archived"
@@ -12,6 +15,12 @@ class Event(models.Model):
         (STATUS_ACTIVE, "Activo"),
         (STATUS_ARCHIVED, "Archivado"),
     ]
+    QR_MODE_RASTER = "raster"
+    QR_MODE_VECTOR = "vector"
+    QR_MODE_CHOICES = [
+        (QR_MODE_RASTER, "Imagen (PNG)"),
+        (QR_MODE_VECTOR, "Vector (SVG)"),
+    ]
 
     branch = models.ForeignKey("branches.Branch", on_delete=models.CASCADE, related_name="events")
     name = models.CharField(max_length=150)
@@ -31,6 +40,8 @@ class Event(models.Model):
         default=4,
         validators=[MinValueValidator(2), MaxValueValidator(6)],
     )
+    qr_render_mode = models.CharField(max_length=8, choices=QR_MODE_CHOICES, default=QR_MODE_RASTER)
+    qr_signed_codes = models.BooleanField(default=False)
     access_policy = models.TextField(blank=True)
     email_subject = models.CharField(max_length=180, default="Tu acceso esta listo: {event_name}")
     email_preheader = models.CharField(
@@ -95,9 +106,20 @@ class Event(models.Model):
         verbose_name = "Evento"
         verbose_name_plural = "Eventos"
 
+    def _qr_badge_state(self):
+        return tuple(
+            getattr(getattr(self, field_name), "name", getattr(self, field_name))
+            for field_name in self.QR_BADGE_FIELDS
+        )
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+        previous_badge_state = None
+        if self.pk:
+            previous_badge_state = (
+                Event.objects.filter(pk=self.pk).values_list(*self.QR_BADGE_FIELDS).first()
+            )
         super().save(*args, **kwargs)
 
         from media_assets.application import field_file_exists, persist_image_asset, restore_field_from_asset
@@ -113,5 +135,72 @@ class Event(models.Model):
             if field_file:
                 persist_image_asset(self, field_name, kind)
 
+        if previous_badge_state is not None and tuple(previous_badge_state) != self._qr_badge_state():
+            from ticketing.application import invalidate_qr_badge_cache
+
+            invalidate_qr_badge_cache(self.pk)
+
     def __str__(self):
         return f"{self.branch.name} - {self.name}"
+
+
+class EventCounters(models.Model):
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, related_name="counters")
+    attendees = models.IntegerField(default=0)
+    checked_in = models.IntegerField(default=0)
+    paid_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    manual_income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    included_balance = models.IntegerField(default=0)
+    event_day_income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    entrance_expenses = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    entrance_cash_drops = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    bar_expenses = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    bar_cash_drops = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    bar_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    bar_units = models.IntegerField(default=0)
+    bar_sales = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Contadores del evento"
+        verbose_name_plural = "Contadores de eventos"
+
+    def __str__(self):
+        return f"Contadores - {self.event_id}"
+
+
+class EventCategoryCounters(models.Model):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="category_counters")
+    category = models.ForeignKey("attendees.Category", on_delete=models.CASCADE, related_name="event_counters")
+    attendees = models.IntegerField(default=0)
+    checked_in = models.IntegerField(default=0)
+    paid_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    manual_income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    included_balance = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["event", "category"], name="events_category_counters_uniq"),
+        ]
+        verbose_name = "Contadores por categoria"
+        verbose_name_plural = "Contadores por categoria"
+
+    def __str__(self):
+        return f"Contadores - {self.event_id}/{self.category_id}"
+
+
+class EventOperatorCounters(models.Model):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="operator_counters")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="event_counters")
+    day = models.DateField()
+    checked_in = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["event", "user", "day"], name="events_operator_counters_uniq"),
+        ]
+        verbose_name = "Contadores por operador"
+        verbose_name_plural = "Contadores por operador"
+
+    def __str__(self):
+        return f"Contadores - {self.event_id}/{self.user_id}/{self.day}"
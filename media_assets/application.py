@@ -1,15 +1,21 @@
 import hashlib
 import os
+import uuid
 from io import BytesIO
 
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
+from django.utils import timezone
 from PIL import Image
 
 from media_assets.models import MediaAsset
 
 
+PNG_DERIVATIVE_DIR = "png_cache"
+
+
 def _normalized_name(original_name, extension):
     base_name = os.path.splitext(os.path.basename(original_name))[0]
     return f"{base_name}.{extension.lower()}"
@@ -85,6 +91,42 @@ def resolve_field_file(instance, field_name, kind):
     return restore_field_from_asset(instance, field_name, kind)
 
 
+def png_derivative_widths():
+    # The full image plus the email flyer width, the only sizes derivatives are built at.
+    return {0, getattr(settings, "EMAIL_FLYER_MAX_WIDTH", 0)}
+
+
+def png_derivative_name(checksum, max_width=0):
+    return f"{PNG_DERIVATIVE_DIR}/{checksum}-{max_width or 'full'}.png"
+
+
+def store_png_derivative(name, content):
+    # Readers treat an existing name as complete, so the bytes land under a temp name and are renamed into place.
+    temp_name = default_storage.save(f"{PNG_DERIVATIVE_DIR}/.{uuid.uuid4().hex}.tmp", ContentFile(content))
+    try:
+        os.replace(default_storage.path(temp_name), default_storage.path(name))
+    except NotImplementedError:
+        default_storage.delete(temp_name)
+        if not default_storage.exists(name):
+            stored_name = default_storage.save(name, ContentFile(content))
+            # A concurrent writer got there first; keep its copy instead of a suffixed duplicate.
+            if stored_name != name:
+                default_storage.delete(stored_name)
+    return name
+
+
+def delete_png_derivatives(checksums):
+    checksums = {checksum for checksum in checksums if checksum}
+    if not checksums:
+        return
+    # Identical content shares derivatives, so only checksums no asset points at anymore are dropped.
+    checksums -= set(MediaAsset.objects.filter(checksum__in=checksums).values_list("checksum", flat=True))
+    # Names are deterministic, so each known width is deleted by name instead of listing png_cache.
+    for checksum in checksums:
+        for max_width in png_derivative_widths():
+            default_storage.delete(png_derivative_name(checksum, max_width))
+
+
 def persist_image_asset(instance, field_name, kind):
     field_file = getattr(instance, field_name, None)
     if not field_file or not field_file_exists(field_file):
@@ -106,7 +148,7 @@ def persist_image_asset(instance, field_name, kind):
         instance.__class__.objects.filter(pk=instance.pk).update(**{field_name: field_file.name})
 
     content_type = ContentType.objects.get_for_model(instance.__class__)
-    MediaAsset.objects.update_or_create(
+    asset, _ = MediaAsset.objects.update_or_create(
         content_type=content_type,
         object_id=instance.pk,
         kind=kind,
@@ -118,3 +160,84 @@ def persist_image_asset(instance, field_name, kind):
             "size_bytes": normalized["size_bytes"],
         },
     )
+    if existing_asset and existing_asset.checksum != asset.checksum:
+        delete_png_derivatives([existing_asset.checksum])
+    return asset
+
+
+def persist_derived_asset(instance, kind, name, content, *, width=0, height=0):
+    # Derived assets are rendered from other assets, so the stored name is expected to encode
+    # whatever inputs it was built from and the previous file is dropped once replaced.
+    previous_asset = get_media_asset(instance, kind)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    stored_name = default_storage.save(name, ContentFile(content))
+    content_type = ContentType.objects.get_for_model(instance.__class__)
+    asset, _ = MediaAsset.objects.update_or_create(
+        content_type=content_type,
+        object_id=instance.pk,
+        kind=kind,
+        defaults={
+            "file": stored_name,
+            "checksum": hashlib.sha256(content).hexdigest(),
+            "width": width,
+            "height": height,
+            "size_bytes": len(content),
+        },
+    )
+    previous_name = getattr(previous_asset.file, "name", "") if previous_asset else ""
+    if previous_name and previous_name != stored_name and default_storage.exists(previous_name):
+        default_storage.delete(previous_name)
+    if previous_asset and previous_asset.checksum != asset.checksum:
+        delete_png_derivatives([previous_asset.checksum])
+    return asset
+
+
+def bulk_persist_generated_assets(model, kind, rows, batch_size=500):
+    # Rows come from already normalized content, so no image needs to be re-read here.
+    if not rows:
+        return
+    content_type = ContentType.objects.get_for_model(model)
+    existing_assets = {
+        asset.object_id: asset
+        for asset in MediaAsset.objects.filter(
+            content_type=content_type,
+            kind=kind,
+            object_id__in=[row["object_id"] for row in rows],
+        )
+    }
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    replaced_checksums = set()
+    for row in rows:
+        asset = existing_assets.get(row["object_id"])
+        if asset is None:
+            to_create.append(MediaAsset(content_type=content_type, kind=kind, **row))
+            continue
+        if asset.checksum != row["checksum"]:
+            replaced_checksums.add(asset.checksum)
+        for field_name in ("file", "checksum", "width", "height", "size_bytes"):
+            setattr(asset, field_name, row[field_name])
+        asset.updated_at = now
+        to_update.append(asset)
+
+    MediaAsset.objects.bulk_create(to_create, batch_size=batch_size)
+    MediaAsset.objects.bulk_update(
+        to_update,
+        ["file", "checksum", "width", "height", "size_bytes", "updated_at"],
+        batch_size=batch_size,
+    )
+    delete_png_derivatives(replaced_checksums)
+
+
+def bulk_delete_assets(model, kind, object_ids):
+    content_type = ContentType.objects.get_for_model(model)
+    assets = MediaAsset.objects.filter(content_type=content_type, kind=kind, object_id__in=list(object_ids))
+    checksums = set()
+    for name, checksum in assets.values_list("file", "checksum"):
+        if name:
+            default_storage.delete(name)
+        checksums.add(checksum)
+    assets.delete()
+    delete_png_derivatives(checksums)
@@ -9,7 +9,7 @@ from branches.models import Branch
 from catalog.models import Product
 from events.models import Event
 from media_assets.application import field_file_exists, persist_image_asset
-from ticketing.application import generate_attendee_qr
+from ticketing.application import generate_attendee_qrs
 
 
 def build_placeholder_image():
@@ -48,10 +48,11 @@ class Command(BaseCommand):
                 product.save(update_fields=["image"])
             persist_image_asset(product, "image", "product_image")
 
-        for attendee in Attendee.objects.all():
-            if not attendee.qr_image or not field_file_exists(attendee.qr_image):
-                generate_attendee_qr(attendee)
-            else:
+        # Images already on disk only need their asset row; the bulk render then writes the missing ones
+        # together with their assets, so nothing it just produced is normalized a second time.
+        for attendee in Attendee.objects.exclude(qr_image=""):
+            if field_file_exists(attendee.qr_image):
                 persist_image_asset(attendee, "qr_image", "attendee_qr")
+        generate_attendee_qrs(Attendee.objects.exclude(origin=Attendee.ORIGIN_EVENT_DAY), only_missing=True)
 
         self.stdout.write(self.style.SUCCESS("Backfill de media completado."))
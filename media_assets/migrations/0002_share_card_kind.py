@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_assets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediaasset',
+            name='kind',
+            field=models.CharField(choices=[('branch_logo', 'Logo de sucursal'), ('event_logo', 'Logo de evento'), ('event_qr_logo', 'Logo de QR del evento'), ('event_flyer', 'Flyer de evento'), ('product_image', 'Imagen de producto'), ('attendee_qr', 'QR de asistente'), ('attendee_share_card', 'Tarjeta para compartir')], max_length=20),
+        ),
+    ]
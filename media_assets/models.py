@@ -9,6 +9,7 @@ class MediaAsset(models.Model):
         ("event_flyer", "Flyer de evento"),
         ("product_image", "Imagen de producto"),
         ("attendee_qr", "QR de asistente"),
+        ("attendee_share_card", "Tarjeta para compartir"),
     ]
 
     content_type = models.ForeignKey("contenttypes.ContentType", on_delete=models.CASCADE)
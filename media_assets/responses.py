@@ -0,0 +1,103 @@
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+BYTE_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_byte_range(header, size):
+    # Only single ranges are served partially; anything else falls back to the full file.
+    match = BYTE_RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = min(int(last), size)
+        return (size - length, size - 1) if length else False
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _iter_file_range(file_obj, start, length):
+    try:
+        file_obj.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = file_obj.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file_obj.close()
+
+
+def _offloaded_response(name, content_type):
+    offload = getattr(settings, "MEDIA_FILE_OFFLOAD", "")
+    if offload == "x-accel-redirect":
+        response = HttpResponse(content_type=content_type)
+        prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/").rstrip("/")
+        response["X-Accel-Redirect"] = f"{prefix}/{quote(name)}"
+        return response
+    if offload == "x-sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = default_storage.path(name)
+        return response
+    return None
+
+
+def _streamed_response(request, name, size, content_type, validators):
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if "Range" in request.headers and (not if_range or if_range in validators):
+        byte_range = _parse_byte_range(request.headers["Range"], size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+    if byte_range is None:
+        response = FileResponse(default_storage.open(name, "rb"), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _iter_file_range(default_storage.open(name, "rb"), start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def stored_file_response(request, name, *, content_type, filename="", etag=""):
+    size = default_storage.size(name)
+    last_modified = int(default_storage.get_modified_time(name).timestamp())
+    etag = quote_etag(etag) if etag else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _offloaded_response(name, content_type) or _streamed_response(
+            request,
+            name,
+            size,
+            content_type,
+            {etag, http_date(last_modified)},
+        )
+    if etag:
+        response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    if filename:
+        response["Content-Disposition"] = f'inline; filename="{filename}"'
+    return response
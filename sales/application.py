@@ -8,6 +8,7 @@ from django.utils import timezone
 
 from attendees.models import Attendee
 from catalog.models import Product
+from events.application import bump_event_counters, lock_event_counters
 from sales.models import BarSale, BarSalePayment, CashMovement, CashMovementPayment, EventProduct
 
 
@@ -72,6 +73,7 @@ def process_sale(
     elif not payments:
         raise ValueError("Debes registrar al menos una forma de pago.")
 
+    lock_event_counters(event.pk)
     sale = BarSale.objects.create(
         branch=branch,
         event=event,
@@ -100,8 +102,9 @@ def process_sale(
 
     if attendee and use_included_balance:
         attendee.included_balance -= quantity
-        attendee.save(update_fields=["included_balance"])
+        attendee.save(update_fields=["included_balance", "updated_at"])
 
+    bump_event_counters(event.pk, bar_revenue=total, bar_units=quantity, bar_sales=1)
     return sale
 
 
@@ -186,6 +189,7 @@ def process_sale_cart(*, branch, event, user, items, payments=None):
     if len(event_products) != len(ordered_ids):
         raise ValueError("Uno o varios productos ya no estan disponibles para este evento.")
 
+    lock_event_counters(event.pk)
     sales = []
     line_remaining = {}
     invoice_total = Decimal("0.00")
@@ -244,6 +248,12 @@ def process_sale_cart(*, branch, event, user, items, payments=None):
     if any(remaining != 0 for remaining in line_remaining.values()):
         raise ValueError("La factura no pudo cerrarse correctamente.")
 
+    bump_event_counters(
+        event.pk,
+        bar_revenue=invoice_total,
+        bar_units=sum(sale.quantity for sale in sales),
+        bar_sales=1,
+    )
     return sales
 
 
@@ -251,15 +261,6 @@ def get_bar_sales_queryset(*, branch, event):
     return BarSale.objects.filter(branch=branch, event=event)
 
 
-def build_bar_sales_stats(*, branch, event):
-    sales_queryset = get_bar_sales_queryset(branch=branch, event=event)
-    return sales_queryset.aggregate(
-        total_amount=Sum("total"),
-        total_units=Sum("quantity"),
-        total_sales=Count("sale_group", distinct=True),
-    )
-
-
 def build_bar_product_rows(*, branch, event):
     sales_queryset = get_bar_sales_queryset(branch=branch, event=event)
     return list(
@@ -313,6 +314,7 @@ def build_grouped_sales(*, branch, event):
 
 @transaction.atomic
 def delete_sale(*, branch, event, sale_id):
+    lock_event_counters(event.pk)
     sale = BarSale.objects.select_related("product").get(pk=sale_id, branch=branch, event=event)
     group_sales = list(
         BarSale.objects.select_related("product").filter(
@@ -331,6 +333,12 @@ def delete_sale(*, branch, event, sale_id):
         event=event,
         sale_group=sale.sale_group,
     ).delete()
+    bump_event_counters(
+        event.pk,
+        bar_revenue=-deleted_summary["total"],
+        bar_units=-sum(item.quantity for item in group_sales),
+        bar_sales=-1,
+    )
     return deleted_summary
 
 
@@ -569,6 +577,14 @@ def summarize_payment_methods(*, branch, event):
     ]
 
 
+def get_cash_movement_counter_field(module, movement_type):
+    if movement_type == CashMovement.TYPE_EVENT_DAY:
+        return "event_day_income"
+    prefix = "bar" if module == CashMovement.MODULE_BAR else "entrance"
+    suffix = "cash_drops" if movement_type == CashMovement.TYPE_CASH_DROP else "expenses"
+    return f"{prefix}_{suffix}"
+
+
 @transaction.atomic
 def create_cash_movement(
     *,
@@ -597,6 +613,7 @@ def create_cash_movement(
 
     created_role = get_effective_role(user, branch, event) or ""
 
+    lock_event_counters(event.pk)
     movement = CashMovement.objects.create(
         branch=branch,
         event=event,
@@ -617,6 +634,7 @@ def create_cash_movement(
             reference=payment.get("reference", ""),
             transfer_proof=payment.get("transfer_proof"),
         )
+    bump_event_counters(event.pk, **{get_cash_movement_counter_field(module, movement_type): total_amount})
     return movement
 
 
@@ -632,6 +650,7 @@ def update_cash_movement(
     if total_amount <= 0:
         raise ValueError("El valor debe ser mayor a cero.")
 
+    lock_event_counters(movement.event_id)
     current_payment_total = movement.payments.aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
     payments = payments if payments is not None else None
 
@@ -653,15 +672,21 @@ def update_cash_movement(
             "Si cambias el valor del gasto, debes volver a registrar las formas de pago.",
         )
 
+    previous_total = CashMovement.objects.values_list("total_amount", flat=True).get(pk=movement.pk)
     movement.total_amount = total_amount
     movement.description = description
     movement.save(update_fields=["total_amount", "description"])
+    field = get_cash_movement_counter_field(movement.module, movement.movement_type)
+    bump_event_counters(movement.event_id, **{field: total_amount - previous_total})
     return movement
 
 
 @transaction.atomic
 def delete_cash_movement(*, movement):
+    lock_event_counters(movement.event_id)
     movement.delete()
+    field = get_cash_movement_counter_field(movement.module, movement.movement_type)
+    bump_event_counters(movement.event_id, **{field: -movement.total_amount})
 
 
 def _build_event_day_identity(event, count_index):
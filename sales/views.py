@@ -3,18 +3,17 @@ from decimal import Decimal
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.db.models import Count, Sum
 from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.decorators.http import require_POST
 
 from catalog.models import Product
+from events.application import get_event_counters
 from identity.application import user_can_access_sales, user_can_manage_events
 from sales.application import (
     build_event_product_rows,
     build_grouped_sales,
-    build_bar_sales_stats,
     calculate_sale_cart_total,
     create_cash_movement,
     delete_cash_movement,
@@ -102,22 +101,10 @@ def _expense_payment_inputs_present(request, *, prefix):
 
 
 def _build_cash_snapshot(branch, event):
-    movement_queryset = CashMovement.objects.filter(
-        branch=branch,
-        event=event,
-        module=CashMovement.MODULE_BAR,
-    )
-
-    sales_stats = build_bar_sales_stats(branch=branch, event=event)
-    expense_total = (
-        movement_queryset.filter(movement_type=CashMovement.TYPE_EXPENSE).aggregate(total=Sum("total_amount"))["total"]
-        or Decimal("0.00")
-    )
-    cash_drop_total = (
-        movement_queryset.filter(movement_type=CashMovement.TYPE_CASH_DROP).aggregate(total=Sum("total_amount"))["total"]
-        or Decimal("0.00")
-    )
-    sales_total = sales_stats["total_amount"] or Decimal("0.00")
+    counters = get_event_counters(event.pk)
+    sales_total = counters.bar_revenue
+    expense_total = counters.bar_expenses
+    cash_drop_total = counters.bar_cash_drops
 
     enabled_products = EventProduct.objects.filter(
         branch=branch,
@@ -129,8 +116,8 @@ def _build_cash_snapshot(branch, event):
 
     return {
         "sales_total": sales_total,
-        "units_sold": sales_stats["total_units"] or 0,
-        "sales_count": sales_stats["total_sales"] or 0,
+        "units_sold": counters.bar_units,
+        "sales_count": counters.bar_sales,
         "expense_total": expense_total,
         "cash_drop_total": cash_drop_total,
         "cash_balance": sales_total - expense_total - cash_drop_total,
@@ -2,21 +2,18 @@ import json
 import math
 from decimal import Decimal
 
-from django.db.models import Count, Q, Sum
+from django.db.models import Count, Sum
 
-from attendees.models import Attendee, Category
+from attendees.models import Category
 from catalog.models import Product
-from sales.application import build_bar_product_rows, build_bar_sales_stats
+from events.application import get_category_counters, get_event_counters
+from sales.application import build_bar_product_rows
 from sales.models import BarSalePayment, CashMovement, CashMovementPayment
 
 
 PIE_COLORS = ["#39ff14", "#59f4ad", "#8aff64", "#00e676", "#b6ff7a", "#45ffb0", "#d2ff92"]
 
 
-def _sum_or_zero(queryset, field):
-    return queryset.aggregate(total=Sum(field)).get("total") or Decimal("0")
-
-
 def _polar_to_cartesian(radius, angle_degrees):
     angle_radians = math.radians(angle_degrees - 90)
     return (
@@ -159,25 +156,15 @@ def build_empty_dashboard_analytics():
 
 
 def _build_entry_category_summary(branch, event):
-    categories = list(
-        Category.objects.filter(branch=branch, is_active=True)
-        .annotate(
-            total=Count("attendees", filter=Q(attendees__branch=branch, attendees__event=event)),
-            checked_in=Count(
-                "attendees",
-                filter=Q(attendees__branch=branch, attendees__event=event, attendees__has_checked_in=True),
-            ),
-            subtotal=Sum(
-                "attendees__paid_amount",
-                filter=Q(attendees__branch=branch, attendees__event=event, attendees__origin=Attendee.ORIGIN_MANUAL),
-            ),
-        )
-        .order_by("name")
-    )
+    counters = get_category_counters(event.pk)
+    categories = list(Category.objects.filter(branch=branch, is_active=True).order_by("name"))
     for category in categories:
-        category.pending = (category.total or 0) - (category.checked_in or 0)
-        category.subtotal = category.subtotal or Decimal("0")
-        category.progress = int(((category.checked_in or 0) / category.total) * 100) if category.total else 0
+        row = counters.get(category.pk)
+        category.total = row.attendees if row else 0
+        category.checked_in = row.checked_in if row else 0
+        category.subtotal = row.manual_income if row else Decimal("0")
+        category.pending = category.total - category.checked_in
+        category.progress = int((category.checked_in / category.total) * 100) if category.total else 0
     return categories
 
 
@@ -213,16 +200,15 @@ def _build_payment_method_segments(rows, labels, detail_body):
 
 
 def build_entrance_analytics(branch, event):
-    attendees = Attendee.objects.filter(branch=branch, event=event)
-    entry_movements = CashMovement.objects.filter(branch=branch, event=event, module=CashMovement.MODULE_ENTRANCE)
-    total_attendees = attendees.count()
-    checked_in = attendees.filter(has_checked_in=True).count()
-    pending = attendees.filter(has_checked_in=False).count()
-    manual_income = _sum_or_zero(attendees.filter(origin=Attendee.ORIGIN_MANUAL), "paid_amount")
-    event_day_income = _sum_or_zero(entry_movements.filter(movement_type=CashMovement.TYPE_EVENT_DAY), "total_amount")
+    counters = get_event_counters(event.pk)
+    total_attendees = counters.attendees
+    checked_in = counters.checked_in
+    pending = total_attendees - checked_in
+    manual_income = counters.manual_income
+    event_day_income = counters.event_day_income
     income_total = manual_income + event_day_income
-    expense_total = _sum_or_zero(entry_movements.filter(movement_type=CashMovement.TYPE_EXPENSE), "total_amount")
-    cash_drop_total = _sum_or_zero(entry_movements.filter(movement_type=CashMovement.TYPE_CASH_DROP), "total_amount")
+    expense_total = counters.entrance_expenses
+    cash_drop_total = counters.entrance_cash_drops
     net_operating = income_total - expense_total
     cash_balance = income_total - expense_total - cash_drop_total
 
@@ -329,12 +315,11 @@ def build_entrance_analytics(branch, event):
 
 
 def build_bar_analytics(branch, event):
-    bar_movements = CashMovement.objects.filter(branch=branch, event=event, module=CashMovement.MODULE_BAR)
-    sales_stats = build_bar_sales_stats(branch=branch, event=event)
-    income_total = sales_stats["total_amount"] or Decimal("0")
-    units_sold = sales_stats["total_units"] or 0
-    expense_total = _sum_or_zero(bar_movements.filter(movement_type=CashMovement.TYPE_EXPENSE), "total_amount")
-    cash_drop_total = _sum_or_zero(bar_movements.filter(movement_type=CashMovement.TYPE_CASH_DROP), "total_amount")
+    counters = get_event_counters(event.pk)
+    income_total = counters.bar_revenue
+    units_sold = counters.bar_units
+    expense_total = counters.bar_expenses
+    cash_drop_total = counters.bar_cash_drops
     net_operating = income_total - expense_total
     cash_balance = income_total - expense_total - cash_drop_total
     total_products = Product.objects.filter(is_active=True).count()
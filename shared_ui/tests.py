@@ -1,29 +1,56 @@
+from datetime import timedelta
 from decimal import Decimal
-from io import BytesIO
+from io import BytesIO, StringIO
 from pathlib import Path
 import email.policy
+import json
 import smtplib
+import threading
 from unittest.mock import MagicMock, patch
 
 from django.conf import settings
 from django.contrib.auth.models import Group, User
 from django.core import mail
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
 from django.urls import reverse
+from django.utils import timezone
+import openpyxl
 from PIL import Image
 
-from attendees.models import Attendee, Category
+from attendees.application import (
+    check_in_attendee,
+    check_in_attendees_batch,
+    enqueue_ticket_email,
+    get_attendee_for_branch,
+    hash_offline_code,
+    import_attendees,
+    iter_import_rows,
+    sync_offline_check_ins,
+)
+from attendees.models import Attendee, Category, TicketEmail
 from branches.models import Branch
 from events.forms import EventForm
 from catalog.models import Product
-from events.models import Event
+from events.models import Event, EventCategoryCounters, EventCounters, EventOperatorCounters
 from identity.models import UserBranchMembership, UserEventAssignment
 from media_assets.models import MediaAsset
-from sales.application import create_cash_movement, process_sale, process_sale_cart
+from sales.application import create_cash_movement, delete_sale, process_sale, process_sale_cart, update_cash_movement
 from sales.models import BarSale, CashMovement, EventProduct
-from ticketing.application import build_event_share_text, send_attendee_ticket_email
-from django.test.utils import override_settings
+from shared_ui.application import build_dashboard_analytics
+from ticketing.application import (
+    TicketEmailSender,
+    build_event_email_payload,
+    build_event_share_text,
+    ensure_attendee_qr,
+    get_compiled_event_email,
+    send_attendee_ticket_email,
+)
+from ticketing.qr_signing import build_signed_qr_code, verify_signed_qr_code
+from django.test.utils import CaptureQueriesContext, override_settings
 
 
 def make_test_image(name="image.png", color="#c44536"):
@@ -193,6 +220,7 @@ class ModularArchitectureTests(TestCase):
             cc="777",
             email="qr-logo@test.com",
         )
+        ensure_attendee_qr(attendee)
 
         attendee.qr_image.open("rb")
         with Image.open(attendee.qr_image) as qr_image:
@@ -200,6 +228,104 @@ class ModularArchitectureTests(TestCase):
 
         self.assertGreater(center_pixel[0], 180)
 
+    def test_attendee_qr_reuses_cached_event_logo_badge(self):
+        from ticketing import application as ticketing_application
+
+        self.event.logo = make_test_image("event-logo-cache.png", color="#00ff00")
+        self.event.save()
+
+        with patch.object(
+            ticketing_application,
+            "_render_qr_badge",
+            wraps=ticketing_application._render_qr_badge,
+        ) as render_mock:
+            for index in range(3):
+                attendee = Attendee.objects.create(
+                    branch=self.branch,
+                    event=self.event,
+                    category=self.category,
+                    name=f"Badge {index}",
+                    cc=f"88{index}",
+                )
+                ensure_attendee_qr(attendee)
+            self.assertEqual(render_mock.call_count, 1)
+
+            self.event.qr_logo_background_color = "#000000"
+            self.event.save()
+            self.assertFalse(
+                any(key[0] == self.event.pk for key in ticketing_application._qr_badge_cache)
+            )
+            attendee = Attendee.objects.create(
+                branch=self.branch,
+                event=self.event,
+                category=self.category,
+                name="Badge nuevo",
+                cc="889",
+            )
+            ensure_attendee_qr(attendee)
+            self.assertEqual(render_mock.call_count, 2)
+
+    def test_generate_attendee_qrs_command_renders_missing_qrs_in_bulk(self):
+        self.event.logo = make_test_image("event-logo-bulk.png", color="#ff0000")
+        self.event.save()
+        missing = Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Sin QR",
+            cc="990",
+        )
+        door_entry = Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Puerta",
+            cc="991",
+            origin=Attendee.ORIGIN_EVENT_DAY,
+        )
+        ensure_attendee_qr(self.attendee)
+        untouched_name = self.attendee.qr_image.name
+
+        output = StringIO()
+        call_command("generate_attendee_qrs", "--event", str(self.event.pk), "--workers", "2", "--only-missing", stdout=output)
+
+        missing.refresh_from_db()
+        self.assertIn("QR generados: 1.", output.getvalue())
+        self.assertTrue(missing.qr_image.name.endswith(".webp"))
+        self.assertEqual(Attendee.objects.get(pk=self.attendee.pk).qr_image.name, untouched_name)
+        door_entry.refresh_from_db()
+        self.assertFalse(door_entry.qr_image)
+        asset = MediaAsset.objects.get(kind="attendee_qr", object_id=missing.pk)
+        self.assertEqual(asset.file.name, missing.qr_image.name)
+        missing.qr_image.open("rb")
+        with Image.open(missing.qr_image) as qr_image:
+            self.assertEqual((asset.width, asset.height), qr_image.size)
+            center_pixel = qr_image.convert("RGB").getpixel((qr_image.width // 2, qr_image.height // 2))
+        self.assertGreater(center_pixel[0], 180)
+
+    def test_backfill_media_does_not_persist_qr_images_it_just_rendered(self):
+        from media_assets.application import persist_image_asset
+
+        ensure_attendee_qr(self.attendee)
+        missing = Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Backfill",
+            cc="992",
+        )
+
+        with patch(
+            "media_assets.management.commands.backfill_modular_media.persist_image_asset",
+            wraps=persist_image_asset,
+        ) as persist_mock:
+            call_command("backfill_modular_media", stdout=StringIO())
+
+        persisted_qrs = [call.args[0].pk for call in persist_mock.call_args_list if call.args[2] == "attendee_qr"]
+        self.assertIn(self.attendee.pk, persisted_qrs)
+        self.assertNotIn(missing.pk, persisted_qrs)
+        self.assertTrue(MediaAsset.objects.filter(kind="attendee_qr", object_id=missing.pk).exists())
+
     def test_whatsapp_share_page_and_card_are_available(self):
         share_response = self.client.get(reverse("attendees:whatsapp_share", args=[self.attendee.qr_code]))
         self.assertEqual(share_response.status_code, 200)
@@ -222,6 +348,102 @@ class ModularArchitectureTests(TestCase):
         flyer_response = self.client.get(reverse("attendees:whatsapp_flyer_file", args=[self.attendee.qr_code]))
         self.assertIn(flyer_response.status_code, {200, 404})
 
+    def test_whatsapp_card_is_cached_as_asset_and_honors_etag(self):
+        from ticketing import application as ticketing_application
+
+        card_url = reverse("attendees:whatsapp_card", args=[self.attendee.qr_code])
+        with patch.object(
+            ticketing_application,
+            "build_whatsapp_share_card_png",
+            wraps=ticketing_application.build_whatsapp_share_card_png,
+        ) as build_mock:
+            first_response = self.client.get(card_url)
+            second_response = self.client.get(card_url)
+            not_modified_response = self.client.get(card_url, HTTP_IF_NONE_MATCH=first_response["ETag"])
+            self.assertEqual(build_mock.call_count, 1)
+
+            self.attendee.name = "Motaz Renombrado"
+            self.attendee.save()
+            changed_response = self.client.get(card_url, HTTP_IF_NONE_MATCH=first_response["ETag"])
+            self.assertEqual(build_mock.call_count, 2)
+
+        card_asset = MediaAsset.objects.get(object_id=self.attendee.pk, kind="attendee_share_card")
+        self.assertEqual(first_response.status_code, 200)
+        self.assertIn("Last-Modified", first_response)
+        self.assertEqual(second_response["ETag"], first_response["ETag"])
+        self.assertEqual(not_modified_response.status_code, 304)
+        self.assertEqual(not_modified_response["ETag"], first_response["ETag"])
+        self.assertEqual(changed_response.status_code, 200)
+        self.assertEqual(changed_response["ETag"], f'"{card_asset.checksum}"')
+        self.assertNotEqual(changed_response["ETag"], first_response["ETag"])
+        self.assertTrue(card_asset.file.name.startswith("assets/share_cards/"))
+        self.assertEqual(MediaAsset.objects.filter(kind="attendee_share_card").count(), 1)
+
+    def test_vector_qr_mode_serves_svg_for_modal_and_share_page(self):
+        self.event.logo = make_test_image("event-logo-svg.png", color="#ff0000")
+        self.event.qr_render_mode = Event.QR_MODE_VECTOR
+        self.event.save()
+        self.assertTrue(self.client.login(username="operador", password="12345678"))
+        session = self.client.session
+        session["current_branch_id"] = self.branch.id
+        session["current_event_id"] = self.event.id
+        session.save()
+
+        detail_response = self.client.get(reverse("attendees:qr_detail", args=[self.attendee.cc]))
+        svg_url = reverse("attendees:qr_svg", args=[self.attendee.qr_code])
+        svg_response = self.client.get(svg_url)
+        share_response = self.client.get(reverse("attendees:whatsapp_share", args=[self.attendee.qr_code]))
+
+        self.assertEqual(detail_response.json()["qr_url"], svg_url)
+        self.assertEqual(svg_response["Content-Type"], "image/svg+xml")
+        svg = svg_response.content.decode()
+        self.assertTrue(svg.startswith("<svg "))
+        self.assertIn(f'stroke="{self.event.qr_fill_color}"', svg)
+        self.assertIn('<image href="data:image/png;base64,', svg)
+        self.assertContains(share_response, '<div class="qr"><svg ')
+
+        self.event.qr_render_mode = Event.QR_MODE_RASTER
+        self.event.save()
+        detail_response = self.client.get(reverse("attendees:qr_detail", args=[self.attendee.cc]))
+        self.attendee.refresh_from_db()
+        self.assertEqual(detail_response.json()["qr_url"], self.attendee.qr_image.url)
+
+    def test_attendee_qr_image_is_materialized_once_on_first_request(self):
+        from ticketing import application as ticketing_application
+
+        attendee = Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="QR diferido",
+            cc="555",
+        )
+        self.assertFalse(attendee.qr_image)
+        self.assertFalse(MediaAsset.objects.filter(kind="attendee_qr", object_id=attendee.pk).exists())
+
+        self.client.login(username="operador", password="12345678")
+        session = self.client.session
+        session["current_branch_id"] = self.branch.id
+        session["current_event_id"] = self.event.id
+        session.save()
+
+        stale_copy = Attendee.objects.get(pk=attendee.pk)
+        with patch.object(
+            ticketing_application,
+            "generate_attendee_qr",
+            wraps=ticketing_application.generate_attendee_qr,
+        ) as generate_mock:
+            first_response = self.client.get(reverse("attendees:qr_detail", args=[attendee.cc]))
+            second_response = self.client.get(reverse("attendees:qr_detail", args=[attendee.cc]))
+            self.assertFalse(ensure_attendee_qr(stale_copy))
+
+        attendee.refresh_from_db()
+        self.assertEqual(generate_mock.call_count, 1)
+        self.assertTrue(attendee.qr_image.name.endswith(".webp"))
+        self.assertEqual(first_response.json()["qr_url"], attendee.qr_image.url)
+        self.assertEqual(second_response.json()["qr_url"], attendee.qr_image.url)
+        self.assertEqual(stale_copy.qr_image.name, attendee.qr_image.name)
+
     def test_whatsapp_flyer_file_uses_webp_response_when_flyer_exists(self):
         self.event.flyer = make_test_image("flyer-share.png", color="#00aa55")
         self.event.save()
@@ -237,6 +459,43 @@ class ModularArchitectureTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response["Content-Type"], "image/webp")
 
+    def test_whatsapp_share_files_stream_with_ranges_and_conditional_requests(self):
+        self.event.flyer = make_test_image("flyer-range.png", color="#aa5500")
+        self.event.save()
+        self.assertTrue(self.client.login(username="operador", password="12345678"))
+        session = self.client.session
+        session["current_branch_id"] = self.branch.id
+        session["current_event_id"] = self.event.id
+        session.save()
+        flyer_url = reverse("attendees:whatsapp_flyer_file", args=[self.attendee.qr_code])
+        qr_url = reverse("attendees:whatsapp_qr_file", args=[self.attendee.qr_code])
+
+        full_response = self.client.get(flyer_url)
+        full_content = b"".join(full_response.streaming_content)
+        range_response = self.client.get(flyer_url, HTTP_RANGE="bytes=0-9")
+        not_modified_response = self.client.get(flyer_url, HTTP_IF_NONE_MATCH=full_response["ETag"])
+        invalid_range_response = self.client.get(flyer_url, HTTP_RANGE=f"bytes={len(full_content)}-")
+        with patch("attendees.views.build_qr_png_bytes") as render_mock:
+            qr_response = self.client.get(qr_url)
+            qr_content = b"".join(qr_response.streaming_content)
+        with override_settings(MEDIA_FILE_OFFLOAD="x-accel-redirect"):
+            offloaded_response = self.client.get(flyer_url)
+
+        self.assertEqual(full_response.status_code, 200)
+        self.assertEqual(full_response["Accept-Ranges"], "bytes")
+        self.assertEqual(range_response.status_code, 206)
+        self.assertEqual(range_response["Content-Range"], f"bytes 0-9/{len(full_content)}")
+        self.assertEqual(b"".join(range_response.streaming_content), full_content[:10])
+        self.assertEqual(not_modified_response.status_code, 304)
+        self.assertEqual(invalid_range_response.status_code, 416)
+        render_mock.assert_not_called()
+        self.assertEqual(qr_response["Content-Type"], "image/png")
+        self.assertEqual(qr_response["Content-Disposition"], f'inline; filename="{self.attendee.qr_code}.png"')
+        with Image.open(BytesIO(qr_content)) as qr_image:
+            self.assertEqual(qr_image.format, "PNG")
+        self.assertEqual(offloaded_response["X-Accel-Redirect"], f"/protected-media/{self.event.flyer.name}")
+        self.assertEqual(offloaded_response.content, b"")
+
     def test_process_sale_uses_event_price_without_touching_product_inventory(self):
         product = Product.objects.create(
             branch=self.branch,
@@ -1064,6 +1323,151 @@ class ModularArchitectureTests(TestCase):
         self.assertContains(response, "data-whatsapp-share")
         self.assertContains(response, "fa-whatsapp")
         self.assertContains(response, "aria-label=\"Enviar por WhatsApp\"")
+        payload_url = reverse("attendees:share_payload", args=[self.attendee.qr_code])
+        self.assertContains(response, f'data-share-payload-url="{payload_url}"')
+        self.assertNotContains(response, "data-share-text=")
+
+        payload = client.get(payload_url).json()
+        self.assertTrue(payload["success"])
+        self.assertIn(self.attendee.qr_code, payload["whatsapp_share_text"])
+        self.assertTrue(payload["whatsapp_url"].startswith("https://web.whatsapp.com/send?"))
+        self.assertEqual(client.get(reverse("attendees:share_payload", args=["NO-EXISTE"])).status_code, 404)
+
+    def test_attendee_excel_and_csv_exports_share_rows(self):
+        Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Ñandu Pérez",
+            cc="555",
+            paid_amount=Decimal("1500"),
+        )
+        self.client.login(username="operador", password="12345678")
+        session = self.client.session
+        session["current_branch_id"] = self.branch.id
+        session["current_event_id"] = self.event.id
+        session.save()
+
+        excel = self.client.get(reverse("attendees:export_excel"))
+        workbook = openpyxl.load_workbook(BytesIO(b"".join(excel.streaming_content)), read_only=True)
+        excel_rows = [list(row) for row in workbook.active.iter_rows(values_only=True)]
+        csv_response = self.client.get(reverse("attendees:export_csv"))
+        csv_text = b"".join(csv_response.streaming_content).decode("utf-8-sig")
+
+        self.assertEqual(excel_rows[0][:2], ["NOMBRE", "CEDULA"])
+        self.assertEqual(excel_rows[1][:2], ["Ñandu Pérez", "555"])
+        self.assertEqual(excel_rows[1][5], 1500)
+        self.assertEqual(excel_rows[2][7], "INGRESO")
+        csv_lines = csv_text.splitlines()
+        self.assertEqual(len(csv_lines), len(excel_rows))
+        self.assertTrue(csv_lines[1].startswith("Ñandu Pérez,555,"))
+        self.assertIn('filename="entrada_', csv_response["Content-Disposition"])
+
+    def test_attendee_import_view_creates_valid_rows_and_reports_the_rest(self):
+        self.client.login(username="operador", password="12345678")
+        session = self.client.session
+        session["current_branch_id"] = self.branch.id
+        session["current_event_id"] = self.event.id
+        session.save()
+        content = "\n".join(
+            [
+                "Nombre;Cédula;Teléfono;Correo;Categoría;Precio pagado",
+                "José Núñez;1.001;3001;jose@test.com;vip;15.000",
+                f"Repetido;{self.attendee.cc};3002;rep@test.com;VIP;",
+                "Otra Vez;1.001;3003;otra@test.com;VIP;",
+                "Sin Correo;1002;3004;no-es-correo;VIP;",
+                "Sin Categoria;1003;3005;cat@test.com;Palco;",
+                "Ana Mora;1004;3006;ana@test.com;VIP;",
+            ]
+        )
+        upload = SimpleUploadedFile("preventa.csv", content.encode("utf-8"), content_type="text/csv")
+
+        payload = self.client.post(reverse("attendees:import"), {"archivo": upload, "enviar_correos": "on"}).json()
+
+        self.assertEqual((payload["created"], payload["failed"]), (2, 4))
+        self.assertEqual([error["row"] for error in payload["errors"]], [3, 4, 5, 6])
+        jose = Attendee.objects.get(event=self.event, cc="1.001")
+        self.assertEqual((jose.paid_amount, jose.search_name, jose.search_cc), (Decimal("15000"), "jose nunez", "1001"))
+        self.assertFalse(jose.qr_image)
+        self.assertTrue(TicketEmail.objects.filter(attendee=jose, status=TicketEmail.STATUS_QUEUED).exists())
+        ana = Attendee.objects.get(event=self.event, cc="1004")
+        self.assertEqual((ana.paid_amount, ana.included_balance), (self.category.price, self.category.included_consumptions))
+        counters = EventCounters.objects.get(event=self.event)
+        self.assertEqual(counters.attendees, Attendee.objects.filter(event=self.event).count())
+
+        bad = SimpleUploadedFile("preventa.csv", b"Nombre,Telefono\nJose,3001\n", content_type="text/csv")
+        response = self.client.post(reverse("attendees:import"), {"archivo": bad})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("CEDULA", response.json()["message"])
+
+    def test_import_seeds_missing_counters_once_across_categories(self):
+        general = Category.objects.create(branch=self.branch, name="General", price=Decimal("20000"))
+        EventCounters.objects.filter(event=self.event).delete()
+        content = "\n".join(
+            [
+                "NOMBRE,CEDULA,TELEFONO,CORREO,CATEGORIA,PRECIO PAGADO",
+                "Uno,8001,3001,uno@test.com,VIP,1000",
+                "Dos,8002,3002,dos@test.com,General,",
+            ]
+        )
+
+        report = import_attendees(
+            self.branch,
+            self.event,
+            self.user,
+            iter_import_rows(BytesIO(content.encode("utf-8")), "preventa.csv"),
+            send_emails=False,
+        )
+
+        self.assertEqual(report["created"], 2)
+        counters = EventCounters.objects.get(event=self.event)
+        self.assertEqual(counters.attendees, 3)
+        self.assertEqual(
+            counters.paid_amount,
+            sum(Attendee.objects.filter(event=self.event).values_list("paid_amount", flat=True)),
+        )
+        self.assertEqual(
+            dict(EventCategoryCounters.objects.filter(event=self.event).values_list("category__name", "attendees")),
+            {"VIP": 2, "General": 1},
+        )
+        self.assertEqual(general.attendees.count(), 1)
+
+    def test_import_attendees_command_reads_excel_and_signs_codes(self):
+        self.event.qr_signed_codes = True
+        self.event.save()
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(["NOMBRE", "CEDULA", "TELEFONO", "CORREO", "CATEGORIA"])
+        for index in range(3):
+            sheet.append([f"Excel {index}", 9000 + index, 3100000000 + index, f"excel{index}@test.com", "VIP"])
+        path = Path(settings.MEDIA_ROOT) / "import-test.xlsx"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        workbook.save(path)
+        output = StringIO()
+
+        try:
+            call_command(
+                "import_attendees",
+                str(path),
+                "--event",
+                str(self.event.id),
+                "--username",
+                "operador",
+                "--no-email",
+                stdout=output,
+            )
+        finally:
+            path.unlink()
+
+        imported = list(Attendee.objects.filter(event=self.event, cc__startswith="900").order_by("cc"))
+        self.assertEqual([attendee.cc for attendee in imported], ["9000", "9001", "9002"])
+        self.assertEqual(imported[0].phone, "3100000000")
+        self.assertEqual(
+            [verify_signed_qr_code(attendee.qr_code) for attendee in imported],
+            [(self.event.id, attendee.pk) for attendee in imported],
+        )
+        self.assertFalse(TicketEmail.objects.filter(attendee__in=imported).exists())
+        self.assertIn("Importados: 3. Filas con errores: 0.", output.getvalue())
 
     def test_attendees_list_uses_email_column_instead_of_balance_and_ingreso_columns(self):
         client = Client()
@@ -1159,6 +1563,279 @@ class ModularArchitectureTests(TestCase):
         self.assertEqual(response.status_code, 404)
         self.assertFalse(response.json()["success"])
 
+    def test_attendee_lookup_resolves_qr_or_cedula_in_one_query(self):
+        legacy = Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Codigo anterior",
+            cc="556",
+            qr_code="VIEJO-EVT-0001",
+        )
+
+        for code, expected in (
+            (self.attendee.qr_code, self.attendee),
+            (self.attendee.cc, self.attendee),
+            (legacy.qr_code, legacy),
+        ):
+            with self.assertNumQueries(1):
+                self.assertEqual(get_attendee_for_branch(self.branch, self.event, code), expected)
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_attendee_for_branch(self.other_branch, self.event, self.attendee.qr_code))
+
+    def test_signed_qr_codes_are_verified_without_queries_and_can_be_reissued(self):
+        legacy = Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Legado",
+            cc="571",
+        )
+        self.event.qr_signed_codes = True
+        self.event.save()
+        signed = Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Firma",
+            cc="572",
+        )
+        ensure_attendee_qr(signed)
+
+        self.assertTrue(signed.qr_code.startswith(f"NOR-NOR-{self.event.pk}.{signed.pk}."))
+        self.assertEqual(Attendee.objects.get(pk=signed.pk).qr_code, signed.qr_code)
+        forged = signed.qr_code[:-1] + ("0" if signed.qr_code[-1] != "0" else "1")
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_attendee_for_branch(self.branch, self.event, forged))
+            foreign = build_signed_qr_code("NOR-NOR", self.other_event.pk, signed.pk)
+            self.assertIsNone(get_attendee_for_branch(self.branch, self.event, foreign))
+        with self.assertNumQueries(1):
+            self.assertEqual(get_attendee_for_branch(self.branch, self.event, signed.qr_code), signed)
+        self.assertEqual(get_attendee_for_branch(self.branch, self.event, legacy.qr_code), legacy)
+
+        old_code = signed.qr_code
+        output = StringIO()
+        call_command("reissue_attendee_qr_codes", "--event", str(self.event.pk), stdout=output)
+
+        self.assertIn("Codigos reemitidos (firmados): 3.", output.getvalue())
+        signed.refresh_from_db()
+        legacy.refresh_from_db()
+        self.assertNotEqual(signed.qr_code, old_code)
+        self.assertTrue(legacy.qr_code.startswith(f"NOR-NOR-{self.event.pk}.{legacy.pk}."))
+        self.assertFalse(signed.qr_image)
+        self.assertFalse(MediaAsset.objects.filter(kind="attendee_qr", object_id=signed.pk).exists())
+        self.assertIsNone(get_attendee_for_branch(self.branch, self.event, old_code))
+        self.assertEqual(get_attendee_for_branch(self.branch, self.event, signed.qr_code), signed)
+
+    def test_batch_check_in_resolves_codes_in_one_query_and_one_update(self):
+        group = [
+            Attendee.objects.create(
+                branch=self.branch,
+                event=self.event,
+                category=self.category,
+                name=f"Grupo {index}",
+                cc=f"60{index}",
+            )
+            for index in range(3)
+        ]
+
+        EventOperatorCounters.objects.create(event=self.event, user=self.user, day=timezone.localdate())
+        # One lookup, the locking read of the pending ids and one attendee UPDATE, plus the counters lock and the
+        # event, category and operator bumps.
+        with self.assertNumQueries(9):
+            results = check_in_attendees_batch(
+                self.branch,
+                self.event,
+                self.user,
+                [
+                    group[0].qr_code,
+                    group[1].cc,
+                    group[0].cc,
+                    self.attendee.qr_code,
+                    "NOR-NOR-NOEXISTE",
+                    group[1].cc,
+                ],
+            )
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["checked_in", "checked_in", "duplicate", "already_checked_in", "not_found", "duplicate"],
+        )
+        self.assertEqual([result["code"] for result in results][-1], group[1].cc)
+
+        self.client.login(username="operador", password="12345678")
+        session = self.client.session
+        session["current_branch_id"] = self.branch.id
+        session["current_event_id"] = self.event.id
+        session.save()
+        response = self.client.post(
+            reverse("attendees:batch_check_in"),
+            data={"codes": [group[2].qr_code, group[0].qr_code]},
+            content_type="application/json",
+        )
+
+        payload = response.json()
+        self.assertEqual(payload["checked_in"], 1)
+        self.assertEqual(payload["results"][0]["status"], "checked_in")
+        self.assertEqual(payload["results"][1]["status"], "already_checked_in")
+        self.assertEqual(payload["results"][1]["checked_in_by"], "operador")
+        self.assertEqual(Attendee.objects.filter(event=self.event, has_checked_in=False).count(), 0)
+
+    def test_batch_check_in_only_counts_rows_still_pending_under_the_lock(self):
+        from attendees import application as attendees_application
+
+        rival = User.objects.create_user(username="rival", password="12345678")
+        group = [
+            Attendee.objects.create(
+                branch=self.branch,
+                event=self.event,
+                category=self.category,
+                name=f"Carrera {index}",
+                cc=f"62{index}",
+            )
+            for index in range(2)
+        ]
+        checked_in_before = EventCounters.objects.get(event=self.event).checked_in
+        lock_event_counters = attendees_application.lock_event_counters
+
+        def rival_scans_first(*event_ids):
+            # Another scanner commits group[1] after this batch resolved it as pending.
+            Attendee.objects.filter(pk=group[1].pk).update(
+                has_checked_in=True, checked_in_at=timezone.now(), checked_in_by=rival
+            )
+            lock_event_counters(*event_ids)
+
+        with patch.object(attendees_application, "lock_event_counters", side_effect=rival_scans_first):
+            results = check_in_attendees_batch(self.branch, self.event, self.user, [group[0].qr_code, group[1].qr_code])
+
+        self.assertEqual([result["status"] for result in results], ["checked_in", "already_checked_in"])
+        self.assertEqual(results[1]["attendee"].checked_in_by, rival)
+        group[1].refresh_from_db()
+        self.assertEqual(group[1].checked_in_by, rival)
+        self.assertEqual(EventCounters.objects.get(event=self.event).checked_in, checked_in_before + 1)
+
+    def test_offline_manifest_deltas_and_batch_sync_keep_first_scan(self):
+        pending = Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Sin red",
+            cc="557",
+        )
+        Attendee.objects.filter(pk=self.attendee.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.client.login(username="operador", password="12345678")
+        session = self.client.session
+        session["current_branch_id"] = self.branch.id
+        session["current_event_id"] = self.event.id
+        session.save()
+
+        manifest = self.client.get(reverse("attendees:offline_manifest")).json()
+        self.assertTrue(manifest["full"])
+        self.assertEqual(manifest["count"], 2)
+        rows = {row[0]: row for row in manifest["attendees"]}
+        self.assertEqual(
+            rows[pending.pk],
+            [
+                pending.pk,
+                hash_offline_code(manifest["salt"], pending.qr_code),
+                hash_offline_code(manifest["salt"], pending.cc),
+                self.category.pk,
+                2,
+                0,
+            ],
+        )
+        self.assertEqual(rows[self.attendee.pk][5], 1)
+        self.assertNotIn(pending.qr_code, str(manifest))
+
+        first_scan = timezone.now() - timedelta(minutes=10)
+        sync = self.client.post(
+            reverse("attendees:offline_sync"),
+            data={
+                "scans": [
+                    {"code": pending.qr_code, "scanned_at": (first_scan + timedelta(minutes=3)).isoformat()},
+                    {"code": pending.cc, "scanned_at": first_scan.isoformat()},
+                    {"code": "NOR-NOR-NOEXISTE", "scanned_at": first_scan.isoformat()},
+                ]
+            },
+            content_type="application/json",
+        ).json()
+        self.assertEqual([result["status"] for result in sync["results"]], ["duplicate", "checked_in", "not_found"])
+        self.assertEqual(sync["checked_in"], 1)
+        pending.refresh_from_db()
+        self.assertTrue(pending.has_checked_in)
+        self.assertEqual(pending.checked_in_at, first_scan)
+        day = timezone.localdate(first_scan)
+        self.assertEqual(
+            EventOperatorCounters.objects.get(event=self.event, user=self.user, day=day).checked_in,
+            Attendee.objects.filter(event=self.event, checked_in_by=self.user, checked_in_at__date=day).count(),
+        )
+
+        repeated = self.client.post(
+            reverse("attendees:offline_sync"),
+            data={"scans": [{"code": pending.qr_code, "scanned_at": first_scan.isoformat()}]},
+            content_type="application/json",
+        ).json()
+        self.assertEqual(repeated["results"][0]["status"], "duplicate")
+        stale_clock = self.client.post(
+            reverse("attendees:offline_sync"),
+            data={"scans": [{"code": pending.qr_code, "scanned_at": (first_scan - timedelta(days=3)).isoformat()}]},
+            content_type="application/json",
+        ).json()
+        self.assertEqual(
+            (stale_clock["results"][0]["status"], stale_clock["results"][0]["clock_skew"]), ("duplicate", True)
+        )
+        garbage_clock = self.client.post(
+            reverse("attendees:offline_sync"),
+            data={"scans": [{"code": pending.qr_code, "scanned_at": "ayer"}, {"code": pending.cc}]},
+            content_type="application/json",
+        ).json()
+        self.assertEqual([result["clock_skew"] for result in garbage_clock["results"]], [True, True])
+        pending.refresh_from_db()
+        self.assertEqual(pending.checked_in_at, first_scan)
+
+        delta = self.client.get(reverse("attendees:offline_manifest"), {"since": manifest["version"]}).json()
+        self.assertFalse(delta["full"])
+        self.assertEqual([row[0] for row in delta["attendees"]], [pending.pk])
+        self.assertEqual(delta["attendees"][0][5], 1)
+        overflow = self.client.get(reverse("attendees:offline_manifest"), {"since": str(10**30)})
+        self.assertEqual(overflow.status_code, 400)
+
+    def test_offline_sync_resolves_and_checks_in_scans_in_bulk(self):
+        event = Event.objects.get(pk=self.event.pk)
+
+        def sync_new_guests(count, offset):
+            guests = [
+                Attendee.objects.create(
+                    branch=self.branch,
+                    event=self.event,
+                    category=self.category,
+                    name=f"Lote sin red {offset + index}",
+                    cc=f"66{offset + index:03d}",
+                )
+                for index in range(count)
+            ]
+            scanned_at = timezone.now() - timedelta(minutes=5)
+            scans = [
+                {"code": guest.qr_code, "scanned_at": (scanned_at + timedelta(seconds=index)).isoformat()}
+                for index, guest in enumerate(guests)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                results = sync_offline_check_ins(self.branch, event, self.user, scans)
+            return guests, scans, results, len(queries)
+
+        sync_new_guests(1, 0)
+        _, _, _, few_queries = sync_new_guests(2, 10)
+        guests, scans, results, many_queries = sync_new_guests(20, 100)
+
+        self.assertEqual(many_queries, few_queries)
+        self.assertEqual({result["status"] for result in results}, {"checked_in"})
+        for guest, scan in zip(guests, scans):
+            guest.refresh_from_db()
+            self.assertEqual(guest.checked_in_at.isoformat(), scan["scanned_at"])
+        self.assertEqual(
+            EventCounters.objects.get(event=self.event).checked_in,
+            Attendee.objects.filter(event=self.event, has_checked_in=True).count(),
+        )
+
     def test_attendee_entry_dashboard_restores_scanner_list_and_create_tabs(self):
         client = Client()
         self.assertTrue(client.login(username="operador", password="12345678"))
@@ -1693,6 +2370,382 @@ class ModularArchitectureTests(TestCase):
         pending.refresh_from_db()
         self.assertTrue(pending.has_checked_in)
 
+    def test_fast_lane_scan_and_signed_confirm_token_skip_second_lookup(self):
+        fast = Attendee.objects.create(branch=self.branch, event=self.event, category=self.category, name="Rapido", cc="561")
+        signed = Attendee.objects.create(branch=self.branch, event=self.event, category=self.category, name="Firmado", cc="562")
+        client = Client()
+        self.assertTrue(client.login(username="operador", password="12345678"))
+        session = client.session
+        session["current_branch_id"] = self.branch.id
+        session["current_event_id"] = self.event.id
+        session.save()
+
+        fast_response = client.post(
+            reverse("attendees:check_in_preview"),
+            data={"codigo": fast.qr_code, "fast_lane": True},
+            content_type="application/json",
+        ).json()
+        self.assertTrue(fast_response["checked_in"])
+        self.assertIn("time", fast_response["attendee"])
+        fast.refresh_from_db()
+        self.assertTrue(fast.has_checked_in)
+
+        preview = client.post(
+            reverse("attendees:check_in_preview"),
+            data={"codigo": signed.qr_code},
+            content_type="application/json",
+        ).json()
+        signed.refresh_from_db()
+        self.assertFalse(signed.has_checked_in)
+        with patch("attendees.views.get_attendee_for_branch") as lookup_mock:
+            confirm = client.post(
+                reverse("attendees:confirm_check_in"),
+                data={"codigo": signed.qr_code, "token": preview["token"]},
+                content_type="application/json",
+            )
+            repeated = client.post(
+                reverse("attendees:confirm_check_in"),
+                data={"token": preview["token"]},
+                content_type="application/json",
+            )
+        lookup_mock.assert_not_called()
+        self.assertEqual(confirm.json()["attendee"]["name"], "Firmado")
+        self.assertEqual(repeated.status_code, 400)
+        signed.refresh_from_db()
+        self.assertEqual(signed.checked_in_by, self.user)
+
+        forged = client.post(
+            reverse("attendees:confirm_check_in"),
+            data={"token": preview["token"][:-2] + "xx"},
+            content_type="application/json",
+        )
+        self.assertEqual(forged.status_code, 400)
+
+        removed = Attendee.objects.create(branch=self.branch, event=self.event, category=self.category, name="Borrado", cc="569")
+        removed_preview = client.post(
+            reverse("attendees:check_in_preview"),
+            data={"codigo": removed.qr_code},
+            content_type="application/json",
+        ).json()
+        removed.delete()
+        gone = client.post(
+            reverse("attendees:confirm_check_in"),
+            data={"token": removed_preview["token"]},
+            content_type="application/json",
+        )
+        self.assertEqual(gone.status_code, 404)
+
+    @override_settings(LIVE_COUNTERS_STREAM_SECONDS=0, LIVE_COUNTERS_WAIT_SECONDS=0)
+    def test_live_counters_follow_check_ins_without_recounting_attendees(self):
+        general = Category.objects.create(branch=self.branch, name="General", price=Decimal("20000"))
+        guest = Attendee.objects.create(branch=self.branch, event=self.event, category=general, name="Live", cc="571")
+        Attendee.objects.create(branch=self.branch, event=self.event, category=general, name="Espera", cc="572")
+        check_in_attendee(guest, self.user)
+        counters = EventCounters.objects.get(event=self.event)
+        self.assertEqual((counters.attendees, counters.checked_in), (3, 2))
+
+        client = Client()
+        self.assertTrue(client.login(username="operador", password="12345678"))
+        session = client.session
+        session["current_branch_id"] = self.branch.id
+        session["current_event_id"] = self.event.id
+        session.save()
+
+        with patch("events.application.rebuild_event_counters") as rebuild_mock:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(reverse("attendees:live_counters"))
+        rebuild_mock.assert_not_called()
+        self.assertFalse([query for query in queries if 'FROM "attendees_attendee"' in query["sql"]])
+        snapshot = response.json()
+        self.assertEqual((snapshot["total"], snapshot["checked_in"], snapshot["pending"]), (3, 2, 1))
+        self.assertEqual(snapshot["my_verifications"], 1)
+        self.assertEqual(
+            [(row["name"], row["checked_in"], row["total"]) for row in snapshot["categories"]],
+            [("General", 1, 2), ("VIP", 1, 1)],
+        )
+
+        unchanged = client.get(reverse("attendees:live_counters"), HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(unchanged.status_code, 304)
+        not_streamed = client.get(reverse("attendees:live_counters"), HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(not_streamed["Content-Type"], "application/json")
+
+        with override_settings(LIVE_COUNTERS_SSE=True):
+            stream = client.get(reverse("attendees:live_counters"), HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(stream["Content-Type"], "text/event-stream")
+        body = b"".join(stream.streaming_content).decode()
+        self.assertIn(f"id: {snapshot['version']}\n", body)
+        self.assertIn('"checked_in":2', body)
+
+        guest.delete()
+        counters.refresh_from_db()
+        self.assertEqual((counters.attendees, counters.checked_in), (2, 1))
+
+    def test_event_counters_track_sales_and_cash_and_rebuild_command_fixes_drift(self):
+        product = Product.objects.create(
+            branch=self.branch,
+            name="Agua contadores",
+            image=make_test_image("agua-contadores.png", color="#4aa3df"),
+            price=5000,
+            created_by=self.user,
+        )
+        event_product = EventProduct.objects.create(
+            branch=self.branch,
+            event=self.event,
+            product=product,
+            is_enabled=True,
+            event_price=5000,
+            updated_by=self.user,
+        )
+        sales = process_sale_cart(
+            branch=self.branch,
+            event=self.event,
+            user=self.user,
+            items=[{"event_product_id": str(event_product.id), "quantity": 3}],
+            payments=[{"method": "efectivo", "amount": Decimal("15000")}],
+        )
+        process_sale_cart(
+            branch=self.branch,
+            event=self.event,
+            user=self.user,
+            items=[{"event_product_id": str(event_product.id), "quantity": 1}],
+            payments=[{"method": "efectivo", "amount": Decimal("5000")}],
+        )
+        delete_sale(branch=self.branch, event=self.event, sale_id=sales[0].id)
+        expense = create_cash_movement(
+            branch=self.branch,
+            event=self.event,
+            user=self.user,
+            module=CashMovement.MODULE_BAR,
+            movement_type=CashMovement.TYPE_EXPENSE,
+            total_amount=Decimal("2000"),
+        )
+        update_cash_movement(
+            movement=expense,
+            total_amount=Decimal("3000"),
+            payments=[{"method": "efectivo", "amount": Decimal("3000")}],
+        )
+        create_cash_movement(
+            branch=self.branch,
+            event=self.event,
+            user=self.user,
+            module=CashMovement.MODULE_ENTRANCE,
+            movement_type=CashMovement.TYPE_CASH_DROP,
+            total_amount=Decimal("7000"),
+        )
+
+        counters = EventCounters.objects.get(event=self.event)
+        self.assertEqual(
+            (counters.bar_revenue, counters.bar_units, counters.bar_sales, counters.bar_expenses),
+            (Decimal("5000"), 1, 1, Decimal("3000")),
+        )
+        self.assertEqual(counters.entrance_cash_drops, Decimal("7000"))
+        with patch("shared_ui.application.build_bar_product_rows", return_value=[]):
+            with CaptureQueriesContext(connection) as queries:
+                metrics = build_dashboard_analytics(self.branch, self.event)["barra_analytics"]["metrics"]
+        self.assertFalse([query for query in queries if '"attendees_attendee"' in query["sql"]])
+        self.assertFalse([query for query in queries if 'FROM "sales_barsale"' in query["sql"]])
+        self.assertEqual((metrics["income_total"], metrics["cash_balance"]), (Decimal("5000"), Decimal("2000")))
+
+        EventCounters.objects.filter(event=self.event).update(bar_revenue=0, checked_in=0)
+        output = StringIO()
+        call_command("rebuild_event_counters", "--event", str(self.event.id), stdout=output)
+        counters.refresh_from_db()
+        self.assertEqual((counters.bar_revenue, counters.checked_in), (Decimal("5000"), 1))
+        self.assertIn("1 con diferencias", output.getvalue())
+
+    def test_first_counted_write_seeds_counters_without_double_counting(self):
+        product = Product.objects.create(
+            branch=self.branch,
+            name="Agua semilla",
+            image=make_test_image("agua-semilla.png", color="#4aa3df"),
+            price=5000,
+            created_by=self.user,
+        )
+        event_product = EventProduct.objects.create(
+            branch=self.branch,
+            event=self.event,
+            product=product,
+            is_enabled=True,
+            event_price=5000,
+            updated_by=self.user,
+        )
+        guest = Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Semilla",
+            cc="581",
+            included_balance=3,
+        )
+        EventCounters.objects.filter(event=self.event).delete()
+        process_sale(
+            branch=self.branch,
+            event=self.event,
+            event_product=event_product,
+            quantity=2,
+            user=self.user,
+            attendee=guest,
+            use_included_balance=True,
+        )
+
+        counters = EventCounters.objects.get(event=self.event)
+        self.assertEqual((counters.bar_revenue, counters.bar_units, counters.bar_sales), (Decimal("10000"), 2, 1))
+        category_counters = EventCategoryCounters.objects.get(event=self.event, category=self.category)
+        self.assertEqual(category_counters.included_balance, counters.included_balance)
+        self.assertEqual(
+            counters.included_balance,
+            sum(Attendee.objects.filter(event=self.event).values_list("included_balance", flat=True)),
+        )
+
+    def test_seed_race_loser_returns_the_winner_row_with_a_locking_read(self):
+        from django.db.models.query import QuerySet
+
+        from events import application as events_application
+
+        EventCounters.objects.filter(event=self.event).delete()
+
+        count_event_sources = events_application._count_event_sources
+
+        def lose_seed_race(event_id):
+            # The winner commits its row between this writer's count and its insert.
+            counted = count_event_sources(event_id)
+            EventCounters.objects.create(event_id=event_id, attendees=7)
+            return counted
+
+        locked_models = []
+        select_for_update = QuerySet.select_for_update
+
+        def record_lock(queryset, *args, **kwargs):
+            locked_models.append(queryset.model)
+            return select_for_update(queryset, *args, **kwargs)
+
+        with (
+            patch.object(events_application, "_count_event_sources", side_effect=lose_seed_race),
+            patch.object(QuerySet, "select_for_update", record_lock),
+        ):
+            counters = events_application.get_event_counters(self.event.pk)
+
+        self.assertEqual(counters.attendees, 7)
+        self.assertIn(EventCounters, locked_models)
+
+    def test_attendee_list_pages_by_cursor_without_recounting(self):
+        for index in range(24):
+            Attendee.objects.create(
+                branch=self.branch,
+                event=self.event,
+                category=self.category,
+                name=f"Cursor {index:02d}",
+                cc=f"70{index:02d}",
+            )
+        self.client.login(username="operador", password="12345678")
+        session = self.client.session
+        session["current_branch_id"] = self.branch.id
+        session["current_event_id"] = self.event.id
+        session.save()
+        url = reverse("attendees:list_data")
+
+        def list_page(**params):
+            return self.client.get(url, {"items": 10, **params}).json()
+
+        first = list_page()
+        self.assertEqual((first["start"], first["end"], first["total"]), (1, 10, 25))
+        with CaptureQueriesContext(connection) as queries:
+            second = list_page(cursor=first["next_cursor"])
+        self.assertFalse([query for query in queries if "COUNT(" in query["sql"] and "attendees_attendee" in query["sql"]])
+        third = list_page(cursor=second["next_cursor"])
+        self.assertEqual((third["start"], third["end"], third["has_next"]), (21, 25, False))
+        seen = [row["id"] for page in (first, second, third) for row in page["rows"]]
+        self.assertEqual(len(set(seen)), 25)
+
+        back = list_page(cursor=third["prev_cursor"])
+        self.assertEqual([row["id"] for row in back["rows"]], [row["id"] for row in second["rows"]])
+        last = list_page(cursor=first["last_cursor"])
+        self.assertEqual([row["id"] for row in last["rows"]], [row["id"] for row in third["rows"]])
+
+        Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Cursor nuevo",
+            cc="7099",
+        )
+        moved = list_page(cursor=first["last_cursor"])
+        self.assertEqual((moved["total"], moved["start"], moved["end"]), (26, 21, 26))
+        self.assertEqual([row["id"] for row in moved["rows"]][1:], [row["id"] for row in third["rows"]])
+
+        searched = list_page(buscar="Cursor 1", estado="pendientes")
+        self.assertEqual((searched["total"], len(searched["rows"])), (10, 10))
+        self.assertEqual(list_page(cursor="manipulado")["start"], 1)
+
+    def test_attendee_list_data_skips_dashboard_queries_and_honors_etag(self):
+        pending = Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Pendiente ETag",
+            cc="8800",
+        )
+        self.client.login(username="operador", password="12345678")
+        session = self.client.session
+        session["current_branch_id"] = self.branch.id
+        session["current_event_id"] = self.event.id
+        session.save()
+        url = reverse("attendees:list_data")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"estado": "pendientes"})
+        self.assertFalse([query for query in queries if "sales_" in query["sql"]])
+        payload = response.json()
+        self.assertEqual([row["cc"] for row in payload["rows"]], ["8800"])
+        self.assertEqual(payload["rows"][0]["category"], self.category.name)
+
+        not_modified = self.client.get(url, {"estado": "pendientes"}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+        enqueue_ticket_email(pending)
+        queued = self.client.get(url, {"estado": "pendientes"}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(queued.status_code, 200)
+        self.assertNotEqual(queued["ETag"], response["ETag"])
+
+        check_in_attendee(pending, self.user)
+        changed = self.client.get(url, {"estado": "pendientes"}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()["rows"], [])
+
+    def test_attendee_search_folds_accents_and_ranks_exact_cc_first(self):
+        jose = Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="José Pérez-Ñañez",
+            cc="1.234.567",
+        )
+        Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Ana Gomez",
+            cc="12345678",
+        )
+        self.assertEqual((jose.search_name, jose.search_cc), ("jose perez nanez", "1234567"))
+        self.client.login(username="operador", password="12345678")
+        session = self.client.session
+        session["current_branch_id"] = self.branch.id
+        session["current_event_id"] = self.event.id
+        session.save()
+        url = reverse("attendees:search")
+
+        results = self.client.get(url, {"q": "jose nañez"}).json()["results"]
+        self.assertEqual([row["id"] for row in results], [jose.pk])
+        results = self.client.get(url, {"q": "1234-567"}).json()["results"]
+        self.assertEqual([row["cc"] for row in results], ["1.234.567", "12345678"])
+
+        jose.name = "Josefina Perez"
+        jose.save(update_fields=["name"])
+        jose.refresh_from_db()
+        self.assertEqual(jose.search_name, "josefina perez")
+        self.assertEqual(self.client.get(url, {"q": "PEZ"}).json()["results"], [])
+
     def test_global_admin_can_delete_checked_in_attendee(self):
         client = Client()
         self.assertTrue(client.login(username="operador", password="12345678"))
@@ -2935,6 +3988,97 @@ class ModularArchitectureTests(TestCase):
         self.assertEqual(mail.outbox[0].subject, "Acceso confirmado para Motaz en Evento Norte")
         self.assertEqual(mail.outbox[0].attachments, [])
 
+    def test_event_email_template_is_compiled_once_per_event_version(self):
+        other_attendee = Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Luisa <VIP>",
+            cc="456",
+            email="luisa@test.com",
+        )
+        compiled = get_compiled_event_email(self.event)
+
+        first = build_event_email_payload(self.event, self.attendee)
+        second = build_event_email_payload(other_attendee.event, other_attendee)
+
+        self.assertIs(get_compiled_event_email(other_attendee.event), compiled)
+        self.assertEqual(first["subject"], "Acceso confirmado para Motaz en Evento Norte")
+        self.assertEqual(second["subject"], "Acceso confirmado para Luisa <VIP> en Evento Norte")
+        self.assertIn("<title>Acceso confirmado para Luisa &lt;VIP&gt; en Evento Norte</title>", second["html_content"])
+        self.assertIn("<strong>Cedula:</strong> 456", second["html_content"])
+        self.assertNotIn("\x00", second["html_content"])
+
+        self.event.email_preheader = "Preheader actualizado"
+        self.event.save()
+
+        self.assertIsNot(get_compiled_event_email(self.event), compiled)
+        self.assertIn("Preheader actualizado", build_event_email_payload(self.event, self.attendee)["html_content"])
+
+    @override_settings(EMAIL_FLYER_MAX_WIDTH=16)
+    def test_ticket_email_flyer_is_converted_once_and_cached_on_disk(self):
+        from media_assets.application import get_media_asset
+        from ticketing import application as ticketing_application
+
+        self.event.flyer = make_test_image("flyer-cache.png", color="#1f7a8c")
+        self.event.save()
+        other_attendee = Attendee.objects.create(
+            branch=self.branch,
+            event=self.event,
+            category=self.category,
+            name="Luisa",
+            cc="456",
+            email="luisa@test.com",
+        )
+        flyer_name = self.event.flyer.name
+        cache_name = f"png_cache/{get_media_asset(self.event, 'event_flyer').checksum}-16.png"
+        if default_storage.exists(cache_name):
+            default_storage.delete(cache_name)
+        ticketing_application._email_attachment_cache.clear()
+
+        with patch.object(
+            ticketing_application,
+            "_file_to_png_bytes",
+            wraps=ticketing_application._file_to_png_bytes,
+        ) as convert_mock:
+            send_attendee_ticket_email(self.attendee)
+            send_attendee_ticket_email(other_attendee)
+            ticketing_application._email_attachment_cache.clear()
+            send_attendee_ticket_email(self.attendee)
+
+        flyer_conversions = [call for call in convert_mock.call_args_list if call.args[0].name == flyer_name]
+        self.assertEqual(len(flyer_conversions), 1)
+        self.assertTrue(default_storage.exists(cache_name))
+        flyer_attachment = [
+            part for part in mail.outbox[-1].message().walk() if part.get("Content-ID") == "<event_flyer_inline>"
+        ][0]
+        with Image.open(BytesIO(flyer_attachment.get_payload(decode=True))) as flyer_image:
+            self.assertEqual(flyer_image.size, (16, 16))
+
+    @override_settings(EMAIL_FLYER_MAX_WIDTH=16)
+    def test_png_derivatives_are_written_once_and_dropped_when_the_source_changes(self):
+        from media_assets.application import PNG_DERIVATIVE_DIR, get_media_asset
+        from ticketing.application import get_png_derivative
+
+        self.event.flyer = make_test_image("flyer-derivative.png", color="#6a4c93")
+        self.event.save()
+        old_checksum = get_media_asset(self.event, "event_flyer").checksum
+
+        first_name, _ = get_png_derivative(self.event, "flyer", "event_flyer", max_width=16)
+        second_name, _ = get_png_derivative(self.event, "flyer", "event_flyer", max_width=16)
+        self.assertEqual(first_name, f"{PNG_DERIVATIVE_DIR}/{old_checksum}-16.png")
+        self.assertEqual(second_name, first_name)
+        _, file_names = default_storage.listdir(PNG_DERIVATIVE_DIR)
+        self.assertEqual([name for name in file_names if name.startswith(old_checksum)], [f"{old_checksum}-16.png"])
+        self.assertFalse([name for name in file_names if name.endswith(".tmp")])
+
+        self.event.flyer = make_test_image("flyer-derivative-new.png", color="#ff595e")
+        with patch.object(default_storage, "listdir", side_effect=AssertionError("png_cache listed")):
+            self.event.save()
+
+        self.assertNotEqual(get_media_asset(self.event, "event_flyer").checksum, old_checksum)
+        self.assertFalse(default_storage.exists(first_name))
+
     @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
     def test_attendee_ticket_email_omits_branch_reference(self):
         self.event.email_body = (
@@ -3047,6 +4191,57 @@ class ModularArchitectureTests(TestCase):
         self.assertEqual(error, "Correo enviado.")
         self.assertEqual(send_mock.call_count, 2)
 
+    def test_ticket_email_sender_reuses_connection_and_reconnects(self):
+        connections = [MagicMock(), MagicMock(), MagicMock(), MagicMock()]
+        with patch("ticketing.application.get_connection", side_effect=connections), patch(
+            "ticketing.application.RelatedEmailMultiAlternatives.send",
+            side_effect=[1, 1, 1, smtplib.SMTPServerDisconnected("Connection unexpectedly closed"), 1],
+        ) as send_mock:
+            with TicketEmailSender(max_messages_per_connection=2) as sender:
+                for _ in range(4):
+                    self.assertEqual(send_attendee_ticket_email(self.attendee, sender=sender), (True, "Correo enviado."))
+
+        self.assertEqual(send_mock.call_count, 5)
+        self.assertEqual(sender.connections_opened, 3)
+        for connection in connections[:3]:
+            connection.open.assert_called_once()
+            connection.close.assert_called_once()
+        connections[3].open.assert_not_called()
+
+    def test_benchmark_email_sender_reports_persistent_connection_throughput(self):
+        output = StringIO()
+        call_command("benchmark_email_sender", "--messages", "3", "--max-per-connection", "2", stdout=output)
+
+        self.assertIn("Conexion por correo:", output.getvalue())
+        self.assertIn("(3 conexiones", output.getvalue())
+        self.assertIn("Conexion persistente:", output.getvalue())
+        self.assertIn("(2 conexiones", output.getvalue())
+
+    def test_benchmark_attendee_export_measures_both_formats(self):
+        output_path = Path(settings.MEDIA_ROOT) / "benchmark-export.json"
+        output = StringIO()
+
+        call_command(
+            "benchmark_attendee_export",
+            "--branch",
+            str(self.branch.id),
+            "--username",
+            "operador",
+            "--attendees",
+            "25",
+            "--output",
+            str(output_path),
+            stdout=output,
+        )
+
+        result = json.loads(output_path.read_text(encoding="utf-8"))
+        output_path.unlink()
+        self.assertEqual(set(result["formats"]), {"excel", "csv"})
+        self.assertGreater(result["formats"]["csv"]["bytes"], 25 * len("Benchmark 0,BENCH0000000"))
+        self.assertGreater(result["formats"]["excel"]["peak_python_mb"], 0)
+        self.assertIn("csv:", output.getvalue())
+        self.assertFalse(Event.objects.filter(name__startswith="Benchmark exporte").exists())
+
     @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
     def test_attendee_create_sends_email_with_qr_attachment(self):
         client = Client()
@@ -3069,6 +4264,15 @@ class ModularArchitectureTests(TestCase):
         )
 
         self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        ticket_email = TicketEmail.objects.get(attendee__cc="456")
+        self.assertEqual(ticket_email.status, TicketEmail.STATUS_QUEUED)
+
+        call_command("run_email_worker", "--once", stdout=StringIO())
+
+        ticket_email.refresh_from_db()
+        self.assertEqual(ticket_email.status, TicketEmail.STATUS_SENT)
+        self.assertEqual(ticket_email.attempts, 1)
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].to, ["invitado@test.com"])
         self.assertEqual(mail.outbox[0].subject, "Acceso confirmado para Invitado Mail en Evento Norte")
@@ -3079,3 +4283,114 @@ class ModularArchitectureTests(TestCase):
         self.assertContains(response, "Asistente Invitado Mail registrado correctamente.")
         self.assertNotContains(response, "Entrega de correo no confirmada")
         self.assertNotContains(response, "QR para copiar")
+
+    def test_email_worker_backs_off_and_dead_letters_failed_tickets(self):
+        ticket_email = TicketEmail.objects.create(attendee=self.attendee, max_attempts=2)
+
+        with patch(
+            "attendees.application.send_attendee_ticket_email",
+            return_value=(False, "SMTP caido"),
+        ):
+            call_command("run_email_worker", "--once", stdout=StringIO(), stderr=StringIO())
+            ticket_email.refresh_from_db()
+            self.assertEqual(ticket_email.status, TicketEmail.STATUS_FAILED)
+            self.assertEqual(ticket_email.attempts, 1)
+            self.assertGreater(ticket_email.next_attempt_at, timezone.now())
+
+            call_command("run_email_worker", "--once", stdout=StringIO(), stderr=StringIO())
+            ticket_email.refresh_from_db()
+            self.assertEqual(ticket_email.attempts, 1)
+
+            TicketEmail.objects.filter(pk=ticket_email.pk).update(next_attempt_at=timezone.now())
+            call_command("run_email_worker", "--once", stdout=StringIO(), stderr=StringIO())
+
+        ticket_email.refresh_from_db()
+        self.assertEqual(ticket_email.status, TicketEmail.STATUS_DEAD)
+        self.assertEqual(ticket_email.last_error, "SMTP caido")
+
+        self.assertTrue(self.client.login(username="operador", password="12345678"))
+        session = self.client.session
+        session["current_branch_id"] = self.branch.id
+        session["current_event_id"] = self.event.id
+        session.save()
+        response = self.client.get(reverse("attendees:email_status"), {"ids": str(self.attendee.pk)})
+        status = response.json()["statuses"][str(self.attendee.pk)]
+        self.assertEqual(status["status"], TicketEmail.STATUS_DEAD)
+        self.assertFalse(status["pending"])
+
+
+class CheckInConcurrencyTests(TransactionTestCase):
+    def test_concurrent_scans_of_same_code_check_in_once(self):
+        user = User.objects.create_user(username="puerta", password="12345678")
+        branch = Branch.objects.create(name="Sucursal Puerta", slug="sucursal-puerta", code_prefix="PTA")
+        event = Event.objects.create(
+            branch=branch,
+            name="Evento Puerta",
+            slug="evento-puerta",
+            starts_at="2026-03-13T20:00:00Z",
+            ends_at="2026-03-14T06:00:00Z",
+            status=Event.STATUS_ACTIVE,
+            qr_prefix="PTA",
+        )
+        category = Category.objects.create(branch=branch, name="General", included_consumptions=0, price=10000)
+        attendee = Attendee.objects.create(branch=branch, event=event, category=category, name="Doble", cc="404")
+
+        scanners = 6
+        copies = [Attendee.objects.get(pk=attendee.pk) for _ in range(scanners)]
+        barrier = threading.Barrier(scanners)
+        results = []
+        errors = []
+
+        def scan(copy):
+            try:
+                barrier.wait()
+                results.append(check_in_attendee(copy, user))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=scan, args=(copy,)) for copy in copies]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        winners = [checked_in for checked_in, created in results if created]
+        self.assertEqual(len(winners), 1)
+        attendee.refresh_from_db()
+        self.assertTrue(attendee.has_checked_in)
+        self.assertEqual(attendee.checked_in_by, user)
+        self.assertEqual({checked_in.checked_in_at for checked_in, _ in results}, {attendee.checked_in_at})
+
+    def test_check_in_benchmark_scans_every_seeded_attendee_and_saves_json(self):
+        User.objects.create_superuser(username="bench", password="12345678", email="bench@test.com")
+        branch = Branch.objects.create(name="Sucursal Bench", slug="sucursal-bench", code_prefix="BEN")
+        Category.objects.create(branch=branch, name="General", included_consumptions=1, price=10000)
+        output_path = Path(settings.MEDIA_ROOT) / "benchmark-check-in.json"
+        output = StringIO()
+
+        call_command(
+            "benchmark_check_in",
+            "--branch",
+            str(branch.id),
+            "--username",
+            "bench",
+            "--attendees",
+            "8",
+            "--scanners",
+            "2",
+            "--output",
+            str(output_path),
+            stdout=output,
+        )
+
+        result = json.loads(output_path.read_text(encoding="utf-8"))
+        output_path.unlink()
+        self.assertEqual((result["scans"], result["errors"], result["mode"]), (8, 0, "preview_confirm"))
+        self.assertGreater(result["queries_per_scan"], 0)
+        self.assertLessEqual(result["latency_ms"]["p50"], result["latency_ms"]["p99"])
+        self.assertIn("Escaneos: 8", output.getvalue())
+        self.assertFalse(Event.objects.filter(branch=branch).exists())
+
@@ -17,7 +17,6 @@ if (checkInForm) {
     result.innerHTML = `<div class="alert alert-${payload.success ? "success" : "warning"}">${payload.message}</div>`;
     if (payload.success) {
       checkInForm.reset();
-      window.location.reload();
     }
   });
 }
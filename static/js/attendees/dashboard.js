@@ -6,11 +6,18 @@
 
   const config = {
     categoryPrices: JSON.parse(shell.dataset.categoryPrices || "{}"),
-    listUrl: shell.dataset.listUrl,
+    listDataUrl: shell.dataset.listDataUrl,
+    sharePayloadPattern: shell.dataset.sharePayloadPattern || "",
     previewUrl: shell.dataset.previewUrl,
     confirmUrl: shell.dataset.confirmUrl,
+    manifestUrl: shell.dataset.manifestUrl,
+    syncUrl: shell.dataset.syncUrl,
+    liveUrl: shell.dataset.liveUrl,
+    liveStream: shell.dataset.liveStream === "1",
+    eventId: shell.dataset.eventId || "",
     markUrl: shell.dataset.markUrl,
     deleteUrl: shell.dataset.deleteUrl,
+    emailStatusUrl: shell.dataset.emailStatusUrl,
     qrPattern: shell.dataset.qrPattern,
     username: shell.dataset.username || "",
     openModal: shell.dataset.openModal || "",
@@ -19,9 +26,29 @@
   const MODAL_TABS = new Set(["categorias", "evento-dia", "gastos", "vaciar-caja"]);
   const RETURN_TABS = new Set([...CONTENT_TABS, ...MODAL_TABS]);
 
+  const EMAIL_STATUS_POLL_MS = 5000;
+  const OFFLINE_HASH_LENGTH = 16;
+  const OFFLINE_SYNC_MS = 15000;
+  const OFFLINE_MANIFEST_REFRESH_MS = 60000;
+  const OFFLINE_SYNC_BATCH = 200;
+  const LIVE_COUNTERS_POLL_MS = 5000;
+  const OFFLINE_MANIFEST_KEY = `entrada-offline-manifest:${config.eventId}`;
+  const OFFLINE_QUEUE_KEY = `entrada-offline-queue:${config.eventId}`;
+
   let html5QrCode = null;
   let isScanning = false;
   let verificationPayload = null;
+  let emailStatusTimer = null;
+  let liveCountersEtag = "";
+  const listState = { query: "", etag: "" };
+  const offline = {
+    manifest: null,
+    entries: new Map(),
+    byHash: new Map(),
+    categories: new Map(),
+    queue: readStoredJson(OFFLINE_QUEUE_KEY, []),
+    syncing: false,
+  };
 
   function getCsrfToken() {
     const match = document.cookie.match(/csrftoken=([^;]+)/);
@@ -40,7 +67,282 @@
     return { response, payload };
   }
 
-  async function loadList(page = 1) {
+  function readStoredJson(key, fallback) {
+    try {
+      return JSON.parse(localStorage.getItem(key) || "null") ?? fallback;
+    } catch (error) {
+      return fallback;
+    }
+  }
+
+  function offlineEnabled() {
+    return Boolean(config.manifestUrl && config.eventId && window.crypto?.subtle);
+  }
+
+  function storeOfflineState() {
+    localStorage.setItem(OFFLINE_QUEUE_KEY, JSON.stringify(offline.queue));
+    if (!offline.manifest) {
+      return;
+    }
+    localStorage.setItem(
+      OFFLINE_MANIFEST_KEY,
+      JSON.stringify({
+        ...offline.manifest,
+        full: true,
+        categories: [...offline.categories],
+        attendees: [...offline.entries.values()].map((entry) => [
+          entry.id,
+          entry.qrHash,
+          entry.ccHash,
+          entry.categoryId,
+          entry.balance,
+          entry.checkedIn ? 1 : 0,
+        ]),
+      })
+    );
+  }
+
+  function applyManifest(payload) {
+    if (payload.full || !offline.manifest) {
+      offline.entries = new Map();
+      offline.byHash = new Map();
+    }
+    payload.attendees.forEach(([id, qrHash, ccHash, categoryId, balance, checkedIn]) => {
+      const previous = offline.entries.get(id);
+      if (previous) {
+        offline.byHash.delete(previous.qrHash);
+        offline.byHash.delete(previous.ccHash);
+      }
+      const entry = { id, qrHash, ccHash, categoryId, balance, checkedIn: Boolean(checkedIn) };
+      offline.entries.set(id, entry);
+      offline.byHash.set(qrHash, entry);
+      offline.byHash.set(ccHash, entry);
+    });
+    offline.categories = new Map(payload.categories);
+    offline.manifest = { version: payload.version, salt: payload.salt, count: payload.count };
+    // Deletions are not sent in deltas; a count mismatch asks for the full manifest again.
+    return offline.entries.size === payload.count;
+  }
+
+  async function refreshManifest() {
+    if (!offlineEnabled()) {
+      return;
+    }
+    const headers = { "X-Requested-With": "XMLHttpRequest" };
+    try {
+      const since = offline.manifest ? offline.manifest.version : 0;
+      let { payload } = await fetchJson(`${config.manifestUrl}?since=${since}`, { headers });
+      if (payload.success && !applyManifest(payload) && !payload.full) {
+        ({ payload } = await fetchJson(config.manifestUrl, { headers }));
+        if (payload.success) {
+          applyManifest(payload);
+        }
+      }
+      storeOfflineState();
+    } catch (error) {
+      // Keep scanning against the last manifest that was downloaded.
+    }
+  }
+
+  async function hashOfflineCode(value) {
+    const data = new TextEncoder().encode(`${offline.manifest.salt}:${value}`);
+    const digest = await window.crypto.subtle.digest("SHA-256", data);
+    return Array.from(new Uint8Array(digest), (byte) => byte.toString(16).padStart(2, "0"))
+      .join("")
+      .slice(0, OFFLINE_HASH_LENGTH);
+  }
+
+  async function checkInOffline(code) {
+    if (!offlineEnabled() || !offline.manifest) {
+      return { success: false, message: "Sin conexion y sin lista descargada para validar." };
+    }
+    const entry = offline.byHash.get(await hashOfflineCode(code));
+    if (!entry) {
+      return { success: false, message: "Codigo no encontrado en la lista sin conexion." };
+    }
+    if (entry.checkedIn) {
+      return { success: false, message: "Este asistente ya ingreso (validado sin conexion)." };
+    }
+    entry.checkedIn = true;
+    offline.queue.push({ code, scanned_at: new Date().toISOString() });
+    storeOfflineState();
+    const category = offline.categories.get(entry.categoryId) || "Sin categoria";
+    return {
+      success: true,
+      message: `Ingreso guardado sin conexion (${category}, balance ${entry.balance}). Se sincronizara al volver la red.`,
+    };
+  }
+
+  async function syncOfflineQueue() {
+    if (offline.syncing || !offline.queue.length || !config.syncUrl) {
+      return;
+    }
+    offline.syncing = true;
+    try {
+      const batch = offline.queue.slice(0, OFFLINE_SYNC_BATCH);
+      const { response, payload } = await fetchJson(config.syncUrl, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          "X-CSRFToken": getCsrfToken(),
+          "X-Requested-With": "XMLHttpRequest",
+        },
+        body: JSON.stringify({ scans: batch }),
+      });
+      if (response.ok && payload.success) {
+        offline.queue = offline.queue.slice(batch.length);
+        storeOfflineState();
+        await refreshManifest();
+      }
+    } catch (error) {
+      // Still offline; the queue stays in localStorage for the next attempt.
+    } finally {
+      offline.syncing = false;
+    }
+  }
+
+  function isFastLane() {
+    return Boolean(document.getElementById("fast-lane-toggle")?.checked);
+  }
+
+  function bindFastLaneToggle() {
+    const toggle = document.getElementById("fast-lane-toggle");
+    if (!toggle) {
+      return;
+    }
+    toggle.checked = localStorage.getItem("entrada-fast-lane") === "1";
+    toggle.addEventListener("change", () => localStorage.setItem("entrada-fast-lane", toggle.checked ? "1" : "0"));
+  }
+
+  function resumeScanningAfter(delay) {
+    setTimeout(() => {
+      if (!document.getElementById("stop-btn").hidden) {
+        isScanning = true;
+      }
+    }, delay);
+  }
+
+  function listEmailBadge(row) {
+    const ticketEmail = row.ticket_email;
+    if (!ticketEmail) {
+      return "";
+    }
+    let badgeClass = "bg-info text-dark";
+    if (ticketEmail.status === "sent") {
+      badgeClass = "bg-success";
+    } else if (ticketEmail.status === "dead") {
+      badgeClass = "bg-danger";
+    }
+    return `<br><span class="badge ${badgeClass}" data-email-status="${row.id}" data-email-pending="${ticketEmail.pending}" title="${escapeHtml(ticketEmail.error)}">${escapeHtml(ticketEmail.label)}</span>`;
+  }
+
+  function listRowActions(row, canDeleteCheckedIn) {
+    const cc = escapeHtml(row.cc);
+    const payloadUrl = config.sharePayloadPattern.replace("__QR__", encodeURIComponent(row.qr_code));
+    let actions = `
+      <button class="btn btn-outline-info" type="button" onclick="window.verQR('${cc}')">
+        <i class="fas fa-qrcode"></i> QR
+      </button>
+      <button class="btn btn-outline-warning" type="button" title="Enviar por WhatsApp" aria-label="Enviar por WhatsApp" data-whatsapp-share data-share-payload-url="${escapeHtml(payloadUrl)}">
+        <i class="fa-brands fa-whatsapp"></i>
+      </button>`;
+    if (!row.checked_in) {
+      actions += `
+      <button class="btn btn-success" type="button" onclick="window.marcarIngreso('${cc}')">
+        <i class="fas fa-check"></i> Ingreso
+      </button>
+      <button class="btn btn-danger" type="button" onclick="window.eliminarAsistente('${cc}')">
+        <i class="fas fa-trash"></i> Eliminar
+      </button>`;
+    } else if (canDeleteCheckedIn) {
+      actions += `
+      <button class="btn btn-outline-danger" type="button" onclick="window.eliminarAsistente('${cc}', true)">
+        <i class="fas fa-trash"></i> Eliminar ingreso
+      </button>`;
+    }
+    return `<div class="btn-group-vertical btn-group-sm">${actions}</div>`;
+  }
+
+  function renderListRow(row, canDeleteCheckedIn) {
+    const status = row.checked_in
+      ? `<span class="badge bg-success">Ingreso</span><br><small>${escapeHtml(row.checked_in_by || "N/A")}</small>`
+      : '<span class="badge bg-warning text-dark">Pendiente</span>';
+    return `
+      <tr>
+        <td><strong>${escapeHtml(row.name)}</strong></td>
+        <td>${escapeHtml(row.cc)}</td>
+        <td>
+          <span class="badge bg-secondary">${escapeHtml(row.category)}</span><br>
+          <small>${escapeHtml(row.phone || "Sin telefono")}</small>
+        </td>
+        <td>${escapeHtml(row.email || "Sin correo")}${listEmailBadge(row)}</td>
+        <td data-number="${escapeHtml(row.paid_amount || "0")}" data-format="currency">$ ${escapeHtml(row.paid_amount || "0")}</td>
+        <td>${status}</td>
+        <td>${listRowActions(row, canDeleteCheckedIn)}</td>
+      </tr>`;
+  }
+
+  function renderListPager(payload) {
+    if (!payload.has_previous && !payload.has_next) {
+      return "";
+    }
+    const button = (cursor, label, icon) => `
+      <li class="page-item">
+        <button class="page-link" type="button" data-list-cursor="${escapeHtml(cursor)}" aria-label="${label}">
+          <i class="fas ${icon}"></i>
+        </button>
+      </li>`;
+    let items = "";
+    if (payload.has_previous) {
+      items += button("", "Primera pagina", "fa-angle-double-left");
+      items += button(payload.prev_cursor, "Pagina anterior", "fa-angle-left");
+    }
+    if (payload.has_next) {
+      items += button(payload.next_cursor, "Pagina siguiente", "fa-angle-right");
+      items += button(payload.last_cursor, "Ultima pagina", "fa-angle-double-right");
+    }
+    return `
+      <nav class="mt-3">
+        <ul class="pagination pagination-sm justify-content-center mb-2 neon-pagination">${items}</ul>
+      </nav>`;
+  }
+
+  function renderList(payload) {
+    const rows = payload.rows.length
+      ? payload.rows.map((row) => renderListRow(row, payload.can_delete_checked_in)).join("")
+      : '<tr><td colspan="7" class="text-center text-muted">No se encontraron asistentes con los filtros aplicados.</td></tr>';
+    const total = payload.total === null ? "" : ` de ${payload.total}`;
+    const options = [10, 25, 50, 100]
+      .map((size) => `<option value="${size}" ${size === payload.items_per_page ? "selected" : ""}>${size}</option>`)
+      .join("");
+    document.getElementById("lista-asistentes").innerHTML = `
+      <div class="table-responsive">
+        <table class="table table-dark table-striped align-middle mb-0 neon-table-dark">
+          <thead>
+            <tr>
+              <th>Nombre</th>
+              <th>Cedula</th>
+              <th>Categoria</th>
+              <th>Correo</th>
+              <th>Precio</th>
+              <th>Estado</th>
+              <th>Acciones</th>
+            </tr>
+          </thead>
+          <tbody>${rows}</tbody>
+        </table>
+      </div>
+      <div class="table-footer">
+        <div class="footer-meta">Mostrando ${payload.start} - ${payload.end}${total} asistentes</div>
+        <div class="footer-items">
+          <label for="items-selector">Mostrar</label>
+          <select id="items-selector" class="form-control form-control-sm neon-select">${options}</select>
+        </div>
+      </div>
+      ${renderListPager(payload)}`;
+  }
+
+  async function loadList(cursor = "") {
     const search = document.getElementById("filtro-buscar")?.value || "";
     const status = document.getElementById("filtro-estado")?.value || "";
     const items = document.getElementById("items-selector")?.value || "10";
@@ -48,22 +350,127 @@
     if (search) params.append("buscar", search);
     if (status) params.append("estado", status);
     if (items) params.append("items", items);
-    params.append("page", page);
+    if (cursor) params.append("cursor", cursor);
+    const query = params.toString();
 
-    const response = await fetch(`${config.listUrl}?${params.toString()}`, {
-      headers: { "X-Requested-With": "XMLHttpRequest" },
-    });
-    const html = await response.text();
-    document.getElementById("lista-asistentes").innerHTML = html;
+    // The server answers 304 while the event's list version is unchanged, so refreshes skip re-rendering.
+    const headers = { "X-Requested-With": "XMLHttpRequest" };
+    if (listState.query === query && listState.etag) {
+      headers["If-None-Match"] = listState.etag;
+    }
+    const response = await fetch(`${config.listDataUrl}?${query}`, { headers, cache: "no-store" });
+    if (response.status === 304) {
+      return;
+    }
+    const payload = await response.json();
+    if (!payload.success) {
+      showInfoModal("Asistentes", `<div class="alert alert-danger mb-0">${escapeHtml(payload.message)}</div>`);
+      return;
+    }
+    listState.query = query;
+    listState.etag = response.headers.get("ETag") || "";
+    renderList(payload);
     formatNumbers();
     bindListFooter();
+    scheduleEmailStatusPoll();
+  }
+
+  function scheduleEmailStatusPoll() {
+    window.clearTimeout(emailStatusTimer);
+    if (!config.emailStatusUrl || !document.querySelector('[data-email-pending="true"]')) {
+      return;
+    }
+    emailStatusTimer = window.setTimeout(refreshEmailStatuses, EMAIL_STATUS_POLL_MS);
+  }
+
+  async function refreshEmailStatuses() {
+    const badges = Array.from(document.querySelectorAll('[data-email-pending="true"]'));
+    if (!badges.length) {
+      return;
+    }
+    const ids = badges.map((badge) => badge.dataset.emailStatus).join(",");
+    try {
+      const { payload } = await fetchJson(`${config.emailStatusUrl}?ids=${encodeURIComponent(ids)}`, {
+        headers: { "X-Requested-With": "XMLHttpRequest" },
+      });
+      if (payload.success) {
+        badges.forEach((badge) => {
+          const status = payload.statuses[badge.dataset.emailStatus];
+          if (!status) {
+            return;
+          }
+          badge.textContent = status.label;
+          badge.title = status.error || "";
+          badge.dataset.emailPending = String(status.pending);
+          badge.classList.remove("bg-success", "bg-danger", "bg-info", "text-dark");
+          if (status.status === "sent") {
+            badge.classList.add("bg-success");
+          } else if (status.status === "dead") {
+            badge.classList.add("bg-danger");
+          } else {
+            badge.classList.add("bg-info", "text-dark");
+          }
+        });
+      }
+    } catch (error) {
+      // Keep the current badges and try again on the next tick.
+    }
+    scheduleEmailStatusPoll();
+  }
+
+  function renderImportReport(payload) {
+    const rows = (payload.errors || [])
+      .map(
+        (error) =>
+          `<tr><td>${error.row}</td><td>${escapeHtml(error.cc)}</td><td>${escapeHtml(error.errors.join(" "))}</td></tr>`
+      )
+      .join("");
+    const table = rows
+      ? `<div class="table-responsive mt-2"><table class="table table-sm table-dark mb-0"><thead><tr><th>Fila</th><th>Cedula</th><th>Error</th></tr></thead><tbody>${rows}</tbody></table></div>`
+      : "";
+    return `<div class="alert alert-${payload.failed ? "warning" : "success"} mb-0">${escapeHtml(payload.message)}${table}</div>`;
+  }
+
+  function bindImportForm() {
+    const form = document.getElementById("form-importar");
+    if (!form) {
+      return;
+    }
+    form.addEventListener("submit", async (event) => {
+      event.preventDefault();
+      const button = document.getElementById("import-submit");
+      const result = document.getElementById("import-result");
+      button.disabled = true;
+      result.innerHTML = '<div class="alert alert-info mb-0">Importando...</div>';
+      try {
+        const { payload } = await fetchJson(form.action, {
+          method: "POST",
+          body: new FormData(form),
+          headers: { "X-Requested-With": "XMLHttpRequest" },
+        });
+        if (!payload.success) {
+          showMessage("import-result", "danger", escapeHtml(payload.message));
+          return;
+        }
+        result.innerHTML = renderImportReport(payload);
+        form.reset();
+        loadList();
+      } catch (error) {
+        showMessage("import-result", "danger", "No se pudo importar el archivo.");
+      } finally {
+        button.disabled = false;
+      }
+    });
   }
 
   function bindListFooter() {
     const selector = document.getElementById("items-selector");
     if (selector) {
-      selector.addEventListener("change", () => loadList(1));
+      selector.addEventListener("change", () => loadList());
     }
+    document.querySelectorAll("#lista-asistentes [data-list-cursor]").forEach((button) => {
+      button.addEventListener("click", () => loadList(button.dataset.listCursor));
+    });
   }
 
   function showMessage(containerId, kind, message) {
@@ -182,27 +589,42 @@
     isScanning = false;
     showMessage("scan-result", "info", "Verificando codigo QR...");
 
-    const { payload } = await fetchJson(config.previewUrl, {
-      method: "POST",
-      headers: {
-        "Content-Type": "application/json",
-        "X-CSRFToken": getCsrfToken(),
-        "X-Requested-With": "XMLHttpRequest",
-      },
-      body: JSON.stringify({ codigo: decodedText }),
-    });
+    let payload;
+    try {
+      ({ payload } = await fetchJson(config.previewUrl, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          "X-CSRFToken": getCsrfToken(),
+          "X-Requested-With": "XMLHttpRequest",
+        },
+        body: JSON.stringify({ codigo: decodedText, fast_lane: isFastLane() }),
+      }));
+    } catch (error) {
+      const result = await checkInOffline(decodedText);
+      showMessage("scan-result", result.success ? "warning" : "danger", result.message);
+      resumeScanningAfter(result.success ? 1500 : 2500);
+      return;
+    }
 
     if (!payload.success) {
       showMessage("scan-result", "danger", payload.message);
-      setTimeout(() => {
-        if (!document.getElementById("stop-btn").hidden) {
-          isScanning = true;
-        }
-      }, 2500);
+      resumeScanningAfter(2500);
+      return;
+    }
+
+    if (payload.checked_in) {
+      const attendee = payload.attendee;
+      showMessage(
+        "scan-result",
+        "success",
+        `${escapeHtml(attendee.name)} (${escapeHtml(attendee.category)}) ingreso a las ${escapeHtml(attendee.time)}.`
+      );
+      resumeScanningAfter(1500);
       return;
     }
 
-    verificationPayload = { codigo: decodedText, attendee: payload.attendee };
+    verificationPayload = { codigo: decodedText, token: payload.token, attendee: payload.attendee };
     document.getElementById("verification-content").innerHTML = buildVerificationHtml(payload.attendee);
     document.getElementById("scan-result").innerHTML = "";
     bootstrap.Modal.getOrCreateInstance(document.getElementById("verificationModal")).show();
@@ -241,6 +663,7 @@
     document.getElementById("start-btn").hidden = true;
     document.getElementById("stop-btn").hidden = false;
     showMessage("scan-result", "success", "Scanner activo. Posiciona el QR frente a la camara.");
+    refreshManifest();
   }
 
   async function stopScanner() {
@@ -270,8 +693,14 @@
           "X-CSRFToken": getCsrfToken(),
           "X-Requested-With": "XMLHttpRequest",
         },
-        body: JSON.stringify({ codigo: verificationPayload.codigo }),
-      });
+        body: JSON.stringify({ codigo: verificationPayload.codigo, token: verificationPayload.token }),
+      }).catch(async () => ({ payload: { offline: true, ...(await checkInOffline(verificationPayload.codigo)) } }));
+
+      if (payload.offline) {
+        showMessage("scan-result", payload.success ? "warning" : "danger", payload.message);
+        bootstrap.Modal.getOrCreateInstance(document.getElementById("verificationModal")).hide();
+        return;
+      }
 
       if (!payload.success) {
         showMessage("scan-result", "danger", payload.message);
@@ -300,7 +729,7 @@
           </div>
         `
       );
-      setTimeout(() => window.location.reload(), 1800);
+      refreshLiveCounters();
     } finally {
       button.disabled = false;
       button.innerHTML = original;
@@ -308,6 +737,71 @@
     }
   }
 
+  function renderLiveCounters(counters) {
+    const panel = document.getElementById("live-counters");
+    if (!panel || !counters) {
+      return;
+    }
+    panel.hidden = false;
+    panel.querySelectorAll("[data-live-field]").forEach((node) => {
+      node.textContent = counters[node.dataset.liveField] ?? 0;
+    });
+    const bar = panel.querySelector("[data-live-progress]");
+    if (bar) {
+      bar.style.width = `${counters.progress || 0}%`;
+    }
+    const categories = panel.querySelector("[data-live-categories]");
+    if (categories) {
+      categories.innerHTML = (counters.categories || [])
+        .map((category) => `<span class="me-3">${escapeHtml(category.name)}: ${category.checked_in}/${category.total}</span>`)
+        .join("");
+    }
+  }
+
+  async function refreshLiveCounters({ wait = false } = {}) {
+    if (!config.liveUrl) {
+      return false;
+    }
+    const headers = { "X-Requested-With": "XMLHttpRequest" };
+    if (wait && liveCountersEtag) {
+      headers["If-None-Match"] = liveCountersEtag;
+    }
+    try {
+      const response = await fetch(config.liveUrl, { headers, cache: "no-store" });
+      if (response.status === 304) {
+        return false;
+      }
+      const payload = await response.json();
+      if (payload.success) {
+        liveCountersEtag = response.headers.get("ETag") || "";
+        renderLiveCounters(payload);
+        return true;
+      }
+    } catch (error) {
+      // Offline scans keep working; the counters catch up on the next refresh.
+    }
+    return false;
+  }
+
+  async function pollLiveCounters() {
+    // The server holds each request until the counters move; a quiet 304 or an error pauses the loop briefly.
+    const changed = await refreshLiveCounters({ wait: true });
+    setTimeout(pollLiveCounters, changed ? 0 : LIVE_COUNTERS_POLL_MS);
+  }
+
+  function bindLiveCounters() {
+    if (!config.liveUrl) {
+      return;
+    }
+    if (config.liveStream && window.EventSource) {
+      // The server closes each stream after a short while and EventSource reconnects by itself.
+      const source = new EventSource(`${config.liveUrl}?stream=1`);
+      source.onmessage = (message) => renderLiveCounters(JSON.parse(message.data));
+      return;
+    }
+    pollLiveCounters();
+  }
+
   async function viewQr(cc) {
     const url = config.qrPattern.replace("__CC__", cc);
     const { payload } = await fetchJson(url, {
@@ -373,7 +867,7 @@
       window.alert(payload.message);
       return;
     }
-    await loadList(1);
+    await loadList();
     window.location.reload();
   }
 
@@ -684,7 +1178,30 @@
     document.getElementById("scanner")?.scrollIntoView({ behavior: "smooth", block: "start" });
   }
 
+  async function loadSharePayload(button) {
+    const payloadUrl = button.dataset.sharePayloadUrl || "";
+    if (!payloadUrl || button.dataset.whatsappWebUrl) {
+      return;
+    }
+    const response = await fetch(payloadUrl, { credentials: "same-origin" });
+    const data = await response.json();
+    if (!data.success) {
+      throw new Error(data.message || "No se pudo preparar el mensaje de WhatsApp.");
+    }
+    button.dataset.whatsappWebUrl = data.whatsapp_url || "";
+    button.dataset.shareText = data.whatsapp_share_text || "";
+    button.dataset.shareCardUrl = data.whatsapp_card_url || "";
+    button.dataset.qrFileUrl = data.whatsapp_qr_file_url || "";
+    button.dataset.flyerFileUrl = data.whatsapp_flyer_file_url || "";
+  }
+
   async function shareFilesToWhatsApp(button) {
+    try {
+      await loadSharePayload(button);
+    } catch (error) {
+      showInfoModal("WhatsApp", `<div class="alert alert-danger mb-0">${escapeHtml(error.message)}</div>`);
+      return;
+    }
     const whatsappWebUrl = button.dataset.whatsappWebUrl || "";
     const qrFileUrl = button.dataset.qrFileUrl || "";
     const shareCardUrl = button.dataset.shareCardUrl || "";
@@ -731,10 +1248,13 @@
   document.getElementById("start-btn")?.addEventListener("click", startScanner);
   document.getElementById("stop-btn")?.addEventListener("click", stopScanner);
   document.getElementById("floating-scanner-button")?.addEventListener("click", openScannerTab);
-  document.querySelectorAll("[data-whatsapp-share]").forEach((button) => {
-    button.addEventListener("click", (event) => shareFilesToWhatsApp(event.currentTarget));
+  document.addEventListener("click", (event) => {
+    const button = event.target.closest("[data-whatsapp-share]");
+    if (button) {
+      shareFilesToWhatsApp(button);
+    }
   });
-  document.getElementById("refresh-list-btn")?.addEventListener("click", () => loadList(1));
+  document.getElementById("refresh-list-btn")?.addEventListener("click", () => loadList());
   document.getElementById("confirm-access")?.addEventListener("click", confirmAccess);
   document.getElementById("verificationModal")?.addEventListener("hidden.bs.modal", () => {
     if (!document.getElementById("stop-btn").hidden) {
@@ -746,12 +1266,11 @@
   document.getElementById("filtro-buscar")?.addEventListener("keydown", (event) => {
     if (event.key === "Enter") {
       event.preventDefault();
-      loadList(1);
+      loadList();
     }
   });
-  document.getElementById("filtro-estado")?.addEventListener("change", () => loadList(1));
+  document.getElementById("filtro-estado")?.addEventListener("change", () => loadList());
 
-  window.irAPagina = (page) => loadList(page);
   window.verQR = viewQr;
   window.marcarIngreso = markEntry;
   window.eliminarAsistente = deleteAttendee;
@@ -761,11 +1280,29 @@
     bootstrap.Modal.getOrCreateInstance(postCreateNoticeModal).show();
   }
 
+  window.addEventListener("online", syncOfflineQueue);
+  setInterval(syncOfflineQueue, OFFLINE_SYNC_MS);
+  setInterval(() => {
+    if (!document.getElementById("stop-btn")?.hidden) {
+      refreshManifest();
+    }
+  }, OFFLINE_MANIFEST_REFRESH_MS);
+
+  const storedManifest = readStoredJson(OFFLINE_MANIFEST_KEY, null);
+  if (offlineEnabled() && storedManifest) {
+    applyManifest(storedManifest);
+  }
+  syncOfflineQueue();
+
   formatNumbers();
   bindListFooter();
+  scheduleEmailStatusPoll();
   bindTabs();
+  bindFastLaneToggle();
+  bindLiveCounters();
   bindAnalyticsToggle();
   bindCategoryModal();
+  bindImportForm();
   bindPaymentBreakdown();
   bindSinglePaymentForms();
   bindEventDayCalculator();
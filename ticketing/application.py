@@ -1,22 +1,104 @@
 import base64
 import email.policy
+import hashlib
+import multiprocessing
+import os
 import re
 import smtplib
+import string
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from email.message import EmailMessage as PythonEmailMessage
 from decimal import Decimal
 from html import escape
 from io import BytesIO
 from types import SimpleNamespace
 
-import qrcode
 from PIL import Image, ImageDraw, ImageFont, ImageOps
 from django.conf import settings
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
 from django.utils.dateparse import parse_datetime
 from django.utils.timezone import is_naive, make_aware
 
-from media_assets.application import persist_image_asset, resolve_field_file
+from media_assets.application import (
+    bulk_persist_generated_assets,
+    field_file_exists,
+    get_media_asset,
+    persist_derived_asset,
+    persist_image_asset,
+    png_derivative_name,
+    resolve_field_file,
+    store_png_derivative,
+)
+from ticketing.qr_render import (
+    QR_BOX_SIZE,
+    badge_to_payload,
+    build_qr_matrix,
+    build_qr_matrix_image,
+    compose_qr_badge,
+    encode_qr_webp,
+    qr_image_width,
+    qr_overlay_size,
+    render_qr_svg,
+    render_qr_webp_batch,
+)
+
+
+QR_BADGE_CACHE_SIZE = 64
+_qr_badge_cache = OrderedDict()
+_qr_badge_cache_lock = threading.Lock()
+QR_BULK_BATCH_SIZE = 200
+QR_BULK_CHUNK_SIZE = 25
+WHATSAPP_CARD_DIR = "assets/share_cards"
+WHATSAPP_CARD_VERSION = 1
+EMAIL_TEMPLATE_CACHE_SIZE = 32
+EMAIL_ATTACHMENT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_email_template_cache = OrderedDict()
+_email_template_cache_lock = threading.Lock()
+_email_formatter = string.Formatter()
+EMAIL_SLOT_MARKER = "\x00"
+EMAIL_ATTENDEE_FIELDS = frozenset(
+    {
+        "attendee_name",
+        "nombre_asistente",
+        "branch_name",
+        "nombre_sucursal",
+        "category_name",
+        "nombre_categoria",
+        "qr_code",
+        "codigo_qr",
+        "attendee_cc",
+        "cedula_asistente",
+        "category_price",
+        "precio_categoria",
+    }
+)
+EMAIL_TEXT_FIELDS = (
+    ("subject", "email_subject", "Tu acceso esta listo: {event_name}"),
+    ("preheader", "email_preheader", ""),
+    ("heading", "email_heading", "Hola {attendee_name}"),
+    ("intro", "email_intro", ""),
+    ("message_title", "email_message_title", "Mensaje del evento"),
+    ("body", "email_body", ""),
+    ("warning_title", "email_warning_title", "Importante"),
+    ("warning_text", "email_warning_text", ""),
+    ("details_title", "email_details_title", "Detalles"),
+    ("date_text", "email_date_text", "{fecha_evento}"),
+    ("time_text", "email_time_text", "{hora_evento}"),
+    ("venue_name", "venue_name", ""),
+    ("maps_label", "maps_label", "Abrir en Google Maps"),
+    ("dress_code", "dress_code", ""),
+    ("qr_title", "email_qr_title", ""),
+    ("qr_note", "email_qr_note", ""),
+    ("footer", "email_footer", ""),
+    ("closing_text", "email_closing_text", ""),
+    ("team_signature", "email_team_signature", ""),
+    ("legal_note", "email_legal_note", ""),
+)
 
 
 class CompatPythonEmailMessage(PythonEmailMessage):
@@ -116,23 +198,44 @@ def _get_qr_logo_source(event, branch):
     return None
 
 
-def _build_qr_image(code, event, branch):
-    # Give the reader more quiet zone and module size before adding the centered logo.
-    qr = qrcode.QRCode(box_size=10, border=4, error_correction=qrcode.constants.ERROR_CORRECT_H)
-    qr.add_data(code)
-    qr.make(fit=True)
-    image = qr.make_image(
-        fill_color=getattr(event, "qr_fill_color", "#102542"),
-        back_color=getattr(event, "qr_background_color", "#f8f9fa"),
-    ).convert("RGBA")
+def _qr_logo_checksum(event, branch):
+    for instance, kind in ((event, "event_logo"), (branch, "branch_logo")):
+        if not getattr(instance, "pk", None):
+            continue
+        asset = get_media_asset(instance, kind)
+        if asset and asset.checksum:
+            return asset.checksum
+    return ""
+
+
+def _qr_badge_cache_key(event, branch, overlay_size):
+    event_id = getattr(event, "pk", None)
+    if not event_id:
+        return None
+    checksum = _qr_logo_checksum(event, branch)
+    if not checksum:
+        return None
+    return (
+        event_id,
+        checksum,
+        getattr(event, "qr_fill_color", "#102542"),
+        getattr(event, "qr_logo_background_color", "#ffffff"),
+        int(getattr(event, "qr_logo_scale", 4) or 4),
+        overlay_size,
+    )
 
+
+def invalidate_qr_badge_cache(event_id):
+    with _qr_badge_cache_lock:
+        for key in [key for key in _qr_badge_cache if key[0] == event_id]:
+            del _qr_badge_cache[key]
+
+
+def _render_qr_badge(event, branch, overlay_size):
     logo = _get_qr_logo_source(event, branch)
     if not logo:
-        return image
+        return None
 
-    logo_scale = max(int(getattr(event, "qr_logo_scale", 4) or 4), 2)
-    overlay_size = max(image.width // max(logo_scale, 2), 48)
-    overlay_size = min(overlay_size, max(image.width // 4, 48))
     badge = Image.new("RGBA", (overlay_size, overlay_size), (0, 0, 0, 0))
     badge_draw = ImageDraw.Draw(badge)
     badge_draw.ellipse(
@@ -149,10 +252,44 @@ def _build_qr_image(code, event, branch):
         ((overlay_size - logo.size[0]) // 2, (overlay_size - logo.size[1]) // 2),
         mask=logo.split()[-1] if "A" in logo.getbands() else None,
     )
+    return badge
+
 
-    position = ((image.width - overlay_size) // 2, (image.height - overlay_size) // 2)
-    image.alpha_composite(badge, dest=position)
-    return image
+def _get_qr_badge(event, branch, overlay_size):
+    # The badge only depends on the event branding, so attendees of the same event share it.
+    key = _qr_badge_cache_key(event, branch, overlay_size)
+    if key is None:
+        return _render_qr_badge(event, branch, overlay_size)
+
+    with _qr_badge_cache_lock:
+        badge = _qr_badge_cache.get(key)
+        if badge is not None:
+            _qr_badge_cache.move_to_end(key)
+            return badge
+
+    badge = _render_qr_badge(event, branch, overlay_size)
+    if badge is None:
+        return None
+    with _qr_badge_cache_lock:
+        _qr_badge_cache[key] = badge
+        _qr_badge_cache.move_to_end(key)
+        while len(_qr_badge_cache) > QR_BADGE_CACHE_SIZE:
+            _qr_badge_cache.popitem(last=False)
+    return badge
+
+
+def _build_qr_image(code, event, branch):
+    image = build_qr_matrix_image(
+        code,
+        getattr(event, "qr_fill_color", "#102542"),
+        getattr(event, "qr_background_color", "#f8f9fa"),
+    )
+
+    overlay_size = qr_overlay_size(getattr(event, "qr_logo_scale", 4), image.width)
+    badge = _get_qr_badge(event, branch, overlay_size)
+    if not badge:
+        return image
+    return compose_qr_badge(image, badge)
 
 
 def build_qr_png_bytes(code, event, branch):
@@ -162,6 +299,42 @@ def build_qr_png_bytes(code, event, branch):
     return output.getvalue()
 
 
+def _get_qr_badge_data_uri(event, branch, overlay_size):
+    key = _qr_badge_cache_key(event, branch, overlay_size)
+    if key is not None:
+        key = (*key, "data_uri")
+        with _qr_badge_cache_lock:
+            data_uri = _qr_badge_cache.get(key)
+            if data_uri is not None:
+                _qr_badge_cache.move_to_end(key)
+                return data_uri
+
+    badge = _get_qr_badge(event, branch, overlay_size)
+    if badge is None:
+        return ""
+    output = BytesIO()
+    badge.save(output, format="PNG")
+    data_uri = f"data:image/png;base64,{base64.b64encode(output.getvalue()).decode('ascii')}"
+    if key is not None:
+        with _qr_badge_cache_lock:
+            _qr_badge_cache[key] = data_uri
+            while len(_qr_badge_cache) > QR_BADGE_CACHE_SIZE:
+                _qr_badge_cache.popitem(last=False)
+    return data_uri
+
+
+def build_qr_svg(code, event, branch):
+    matrix = build_qr_matrix(code)
+    overlay_size = qr_overlay_size(getattr(event, "qr_logo_scale", 4), len(matrix) * QR_BOX_SIZE)
+    return render_qr_svg(
+        matrix,
+        getattr(event, "qr_fill_color", "#102542"),
+        getattr(event, "qr_background_color", "#f8f9fa"),
+        badge_href=_get_qr_badge_data_uri(event, branch, overlay_size),
+        badge_size=overlay_size / QR_BOX_SIZE,
+    )
+
+
 def build_qr_preview_data_uri(code, event, branch):
     png_bytes = build_qr_png_bytes(code, event, branch)
     return f"data:image/png;base64,{base64.b64encode(png_bytes).decode('ascii')}"
@@ -181,18 +354,131 @@ def build_qr_preview_event(source_event, branch, files=None, data=None):
 
 
 def generate_attendee_qr(attendee):
-    output = BytesIO()
-    _build_qr_image(attendee.qr_code, attendee.event, attendee.branch).convert("RGB").save(
-        output,
-        format="WEBP",
-        quality=88,
-        method=6,
-    )
-    attendee.qr_image.save(f"{attendee.qr_code}.webp", ContentFile(output.getvalue()), save=False)
+    content = encode_qr_webp(_build_qr_image(attendee.qr_code, attendee.event, attendee.branch))
+    attendee.qr_image.save(f"{attendee.qr_code}.webp", ContentFile(content), save=False)
     attendee.__class__.objects.filter(pk=attendee.pk).update(qr_image=attendee.qr_image.name)
     persist_image_asset(attendee, "qr_image", "attendee_qr")
 
 
+def ensure_attendee_qr(attendee):
+    if attendee.qr_image and field_file_exists(attendee.qr_image):
+        return False
+    # Concurrent first requests queue on the row lock and reuse the image the first one stored.
+    with transaction.atomic():
+        current_name = (
+            attendee.__class__.objects.select_for_update()
+            .filter(pk=attendee.pk)
+            .values_list("qr_image", flat=True)
+            .first()
+        )
+        if current_name and default_storage.exists(current_name):
+            attendee.qr_image.name = current_name
+            return False
+        generate_attendee_qr(attendee)
+    return True
+
+
+def _iter_qr_render_jobs(attendees, chunk_size):
+    current_event = None
+    codes = []
+    for attendee in attendees:
+        if current_event is not None and (attendee.event_id != current_event.pk or len(codes) >= chunk_size):
+            yield current_event, current_branch, codes
+            codes = []
+        current_event = attendee.event
+        current_branch = attendee.branch
+        codes.append(attendee.qr_code)
+    if codes:
+        yield current_event, current_branch, codes
+
+
+def _build_qr_render_job(event, branch, codes):
+    logo_scale = getattr(event, "qr_logo_scale", 4)
+    overlay_size = qr_overlay_size(logo_scale, qr_image_width(codes[0]))
+    return (
+        codes,
+        getattr(event, "qr_fill_color", "#102542"),
+        getattr(event, "qr_background_color", "#f8f9fa"),
+        logo_scale,
+        badge_to_payload(_get_qr_badge(event, branch, overlay_size)),
+    )
+
+
+def _store_rendered_qrs(attendees_by_code, rendered):
+    stored = []
+    asset_rows = []
+    for code, content, width, height in rendered:
+        attendee = attendees_by_code[code]
+        previous_name = attendee.qr_image.name if attendee.qr_image else ""
+        if previous_name:
+            attendee.qr_image.storage.delete(previous_name)
+        attendee.qr_image.save(f"{code}.webp", ContentFile(content), save=False)
+        stored.append(attendee)
+        asset_rows.append(
+            {
+                "object_id": attendee.pk,
+                "file": attendee.qr_image.name,
+                "checksum": hashlib.sha256(content).hexdigest(),
+                "width": width,
+                "height": height,
+                "size_bytes": len(content),
+            }
+        )
+    if stored:
+        stored[0].__class__.objects.bulk_update(stored, ["qr_image"])
+        bulk_persist_generated_assets(stored[0].__class__, "attendee_qr", asset_rows)
+    return len(stored)
+
+
+def generate_attendee_qrs(
+    attendees,
+    *,
+    workers=None,
+    only_missing=False,
+    batch_size=QR_BULK_BATCH_SIZE,
+    chunk_size=QR_BULK_CHUNK_SIZE,
+):
+    workers = workers or os.cpu_count() or 1
+    queryset = attendees.select_related("event", "branch").order_by("event_id", "pk")
+    executor = None
+    if workers > 1:
+        # Spawned workers never inherit the parent's database connections.
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    generated = 0
+    batch = []
+    try:
+        for attendee in queryset.iterator(chunk_size=batch_size):
+            if only_missing and attendee.qr_image and field_file_exists(attendee.qr_image):
+                continue
+            batch.append(attendee)
+            if len(batch) >= batch_size:
+                generated += _generate_qr_batch(batch, executor, chunk_size)
+                batch = []
+        if batch:
+            generated += _generate_qr_batch(batch, executor, chunk_size)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return generated
+
+
+def _generate_qr_batch(attendees, executor, chunk_size):
+    jobs = [
+        _build_qr_render_job(event, branch, codes)
+        for event, branch, codes in _iter_qr_render_jobs(attendees, chunk_size)
+    ]
+    if executor is None:
+        results = [render_qr_webp_batch(*job) for job in jobs]
+    else:
+        results = list(executor.map(render_qr_webp_batch, *zip(*jobs)))
+
+    attendees_by_code = {attendee.qr_code: attendee for attendee in attendees}
+    rendered = [item for result in results for item in result]
+    with transaction.atomic():
+        return _store_rendered_qrs(attendees_by_code, rendered)
+
+
 class SafeFormatDict(dict):
     def __missing__(self, key):
         return "{" + key + "}"
@@ -261,18 +547,110 @@ def _normalize_datetime(value):
     return parsed
 
 
-def _file_to_png_bytes(field_file):
+def _file_to_png_bytes(field_file, max_width=0):
     if not field_file:
         return None
     try:
         field_file.open("rb")
         with Image.open(field_file) as image:
-            buffer = BytesIO()
-            image.convert("RGBA").save(buffer, format="PNG")
+            image = image.convert("RGBA")
         field_file.close()
-        return buffer.getvalue()
     except FileNotFoundError:
         return None
+    if max_width and image.width > max_width:
+        image = image.resize(
+            (max_width, max(round(image.height * max_width / image.width), 1)),
+            Image.Resampling.LANCZOS,
+        )
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class _AttachmentBytesCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            content = self.entries.get(key)
+            if content is not None:
+                self.entries.move_to_end(key)
+            return content
+
+    def set(self, key, content):
+        if len(content) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self.entries[key] = content
+            self.size += len(content)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+_email_attachment_cache = _AttachmentBytesCache(EMAIL_ATTACHMENT_CACHE_MAX_BYTES)
+
+
+def _current_media_asset(instance, field_name, kind):
+    field_file = resolve_field_file(instance, field_name, kind) or getattr(instance, field_name, None)
+    if not field_file:
+        return None, None
+    asset = get_media_asset(instance, kind)
+    # The checksum only describes the current file while the asset still points at it.
+    if asset is None or not asset.checksum or asset.file.name != field_file.name:
+        return field_file, None
+    return field_file, asset
+
+
+def _store_png_derivative(field_file, asset, max_width=0):
+    derivative_name = png_derivative_name(asset.checksum, max_width)
+    if default_storage.exists(derivative_name):
+        return derivative_name
+    content = _file_to_png_bytes(field_file, max_width=max_width)
+    if not content:
+        return None
+    return store_png_derivative(derivative_name, content)
+
+
+def get_png_derivative(instance, field_name, kind, max_width=0):
+    field_file, asset = _current_media_asset(instance, field_name, kind)
+    if asset is None:
+        return None, None
+    return _store_png_derivative(field_file, asset, max_width), asset
+
+
+def _email_attachment_png(instance, field_name, kind, max_width=0, spill_to_disk=False):
+    field_file, asset = _current_media_asset(instance, field_name, kind)
+    if asset is None:
+        return _file_to_png_bytes(field_file, max_width=max_width)
+
+    cache_key = png_derivative_name(asset.checksum, max_width)
+    content = _email_attachment_cache.get(cache_key)
+    if content is not None:
+        return content
+
+    if spill_to_disk:
+        derivative_name = _store_png_derivative(field_file, asset, max_width)
+        if derivative_name:
+            with default_storage.open(derivative_name, "rb") as derivative_file:
+                content = derivative_file.read()
+    else:
+        content = _file_to_png_bytes(field_file, max_width=max_width)
+    if content:
+        _email_attachment_cache.set(cache_key, content)
+    return content
 
 
 def _file_to_bytes(field_file):
@@ -320,58 +698,191 @@ def _field_url(field_file):
         return ""
 
 
-def _build_event_rendered_content(event, attendee):
-    price_text = _format_price(attendee.category.price)
+EMAIL_HTML_FIELDS = (
+    ("subject", escape),
+    ("preheader", escape),
+    ("heading", escape),
+    ("intro", _multiline_html),
+    ("message_title", escape),
+    ("warning_title", escape),
+    ("warning_text", _multiline_html),
+    ("details_title", escape),
+    ("date_text", escape),
+    ("time_text", escape),
+    ("venue_name", escape),
+    ("dress_code", escape),
+    ("qr_title", escape),
+    ("qr_note", escape),
+    ("footer", escape),
+    ("closing_text", escape),
+    ("team_signature", escape),
+    ("legal_note", escape),
+)
+EMAIL_HTML_ATTENDEE_SLOTS = (
+    "body",
+    "flyer_html",
+    "qr_html",
+    "attendee_name",
+    "attendee_cc",
+    "category_name",
+    "category_price",
+)
+
+
+def _event_email_context(event):
     starts_at = _normalize_datetime(event.starts_at)
     formatted_date = starts_at.strftime("%d/%m/%Y %H:%M") if starts_at else str(event.starts_at)
     formatted_time = starts_at.strftime("%I:%M %p").lstrip("0") if starts_at else str(event.starts_at)
-    context = SafeFormatDict(
+    return SafeFormatDict(
         {
-            "attendee_name": attendee.name,
-            "nombre_asistente": attendee.name,
             "event_name": event.name,
             "nombre_evento": event.name,
-            "branch_name": attendee.branch.name,
-            "nombre_sucursal": attendee.branch.name,
             "event_date": formatted_date,
             "fecha_evento": formatted_date,
             "event_time": formatted_time,
             "hora_evento": formatted_time,
-            "category_name": attendee.category.name,
-            "nombre_categoria": attendee.category.name,
-            "qr_code": attendee.qr_code,
-            "codigo_qr": attendee.qr_code,
-            "attendee_cc": attendee.cc,
-            "cedula_asistente": attendee.cc,
-            "category_price": price_text,
-            "precio_categoria": price_text,
             "venue_name": event.venue_name,
         }
     )
 
-    rendered = {
-        "subject": (event.email_subject or "Tu acceso esta listo: {event_name}").format_map(context),
-        "preheader": (event.email_preheader or "").format_map(context),
-        "heading": (event.email_heading or "Hola {attendee_name}").format_map(context),
-        "intro": (event.email_intro or "").format_map(context),
-        "message_title": (event.email_message_title or "Mensaje del evento").format_map(context),
-        "body": _remove_branch_lines((event.email_body or "").format_map(context)),
-        "warning_title": (event.email_warning_title or "Importante").format_map(context),
-        "warning_text": (event.email_warning_text or "").format_map(context),
-        "details_title": (event.email_details_title or "Detalles").format_map(context),
-        "date_text": (event.email_date_text or "{fecha_evento}").format_map(context),
-        "time_text": (event.email_time_text or "{hora_evento}").format_map(context),
-        "venue_name": (event.venue_name or "").format_map(context),
-        "maps_label": (event.maps_label or "Abrir en Google Maps").format_map(context),
-        "dress_code": (event.dress_code or "").format_map(context),
-        "qr_title": (event.email_qr_title or "").format_map(context),
-        "qr_note": (event.email_qr_note or "").format_map(context),
-        "footer": (event.email_footer or "").format_map(context),
-        "closing_text": (event.email_closing_text or "").format_map(context),
-        "team_signature": (event.email_team_signature or "").format_map(context),
-        "legal_note": (event.email_legal_note or "").format_map(context),
+
+def _attendee_email_context(attendee):
+    price_text = _format_price(attendee.category.price)
+    return {
+        "attendee_name": attendee.name,
+        "nombre_asistente": attendee.name,
+        "branch_name": attendee.branch.name,
+        "nombre_sucursal": attendee.branch.name,
+        "category_name": attendee.category.name,
+        "nombre_categoria": attendee.category.name,
+        "qr_code": attendee.qr_code,
+        "codigo_qr": attendee.qr_code,
+        "attendee_cc": attendee.cc,
+        "cedula_asistente": attendee.cc,
+        "category_price": price_text,
+        "precio_categoria": price_text,
     }
-    return rendered, price_text
+
+
+def _format_email_field(value, conversion, format_spec):
+    return _email_formatter.format_field(_email_formatter.convert_field(value, conversion), format_spec)
+
+
+def _compile_email_text(template, event_context):
+    # Resolve event placeholders now and keep attendee ones as slots. None means the template
+    # uses something fancier than plain names and has to go through format_map every time.
+    try:
+        parsed = list(_email_formatter.parse(template))
+    except ValueError:
+        return None
+    parts = []
+    for literal_text, field_name, format_spec, conversion in parsed:
+        if literal_text:
+            parts.append(literal_text)
+        if field_name is None:
+            continue
+        if not field_name.isidentifier() or "{" in format_spec:
+            return None
+        if field_name in EMAIL_ATTENDEE_FIELDS:
+            parts.append((field_name, conversion, format_spec))
+            continue
+        try:
+            parts.append(_format_email_field(event_context[field_name], conversion, format_spec))
+        except (TypeError, ValueError):
+            return None
+    if all(isinstance(part, str) for part in parts):
+        return "".join(parts)
+    return tuple(parts)
+
+
+class CompiledEventEmail:
+    def __init__(self, event):
+        self.event_context = _event_email_context(event)
+        self.fields = {}
+        for key, field_name, default in EMAIL_TEXT_FIELDS:
+            template = getattr(event, field_name) or default
+            compiled = _compile_email_text(template, self.event_context)
+            if key == "body" and isinstance(compiled, str):
+                compiled = _remove_branch_lines(compiled)
+            self.fields[key] = (template, compiled)
+
+        self.dynamic_html_fields = []
+        slots = {}
+        for key, html_filter in EMAIL_HTML_FIELDS:
+            compiled = self.fields[key][1]
+            if isinstance(compiled, str):
+                slots[key] = html_filter(compiled)
+            else:
+                slots[key] = f"{EMAIL_SLOT_MARKER}{key}{EMAIL_SLOT_MARKER}"
+                self.dynamic_html_fields.append((key, html_filter))
+
+        self.maps_url = event.maps_url
+        self.dynamic_maps = bool(event.maps_url) and not isinstance(self.fields["maps_label"][1], str)
+        if not event.maps_url:
+            slots["maps_html"] = "<span>No configurada</span>"
+        elif self.dynamic_maps:
+            slots["maps_html"] = f"{EMAIL_SLOT_MARKER}maps_html{EMAIL_SLOT_MARKER}"
+        else:
+            slots["maps_html"] = self._maps_html(self.fields["maps_label"][1])
+        for key in EMAIL_HTML_ATTENDEE_SLOTS:
+            slots[key] = f"{EMAIL_SLOT_MARKER}{key}{EMAIL_SLOT_MARKER}"
+
+        chunks = _build_event_email_html(event, slots).split(EMAIL_SLOT_MARKER)
+        self.html_literals = chunks[0::2]
+        self.html_slots = chunks[1::2]
+
+    def _maps_html(self, maps_label):
+        return f'<a href="{escape(self.maps_url)}">{escape(maps_label)}</a>'
+
+    def render_fields(self, attendee):
+        attendee_context = _attendee_email_context(attendee)
+        rendered = {}
+        for key, (template, compiled) in self.fields.items():
+            if isinstance(compiled, str):
+                rendered[key] = compiled
+                continue
+            if compiled is None:
+                value = template.format_map(SafeFormatDict({**self.event_context, **attendee_context}))
+            else:
+                value = "".join(
+                    part if isinstance(part, str) else _format_email_field(attendee_context[part[0]], *part[1:])
+                    for part in compiled
+                )
+            rendered[key] = _remove_branch_lines(value) if key == "body" else value
+        return rendered, attendee_context["category_price"]
+
+    def render_html(self, rendered, values):
+        for key, html_filter in self.dynamic_html_fields:
+            values[key] = html_filter(rendered[key])
+        if self.dynamic_maps:
+            values["maps_html"] = self._maps_html(rendered["maps_label"])
+        parts = [self.html_literals[0]]
+        for slot, literal in zip(self.html_slots, self.html_literals[1:]):
+            parts.append(values[slot])
+            parts.append(literal)
+        return "".join(parts)
+
+
+def get_compiled_event_email(event):
+    if not event.pk or not event.updated_at:
+        return CompiledEventEmail(event)
+    with _email_template_cache_lock:
+        cached = _email_template_cache.get(event.pk)
+        if cached is not None and cached[0] == event.updated_at:
+            _email_template_cache.move_to_end(event.pk)
+            return cached[1]
+
+    compiled = CompiledEventEmail(event)
+    with _email_template_cache_lock:
+        _email_template_cache[event.pk] = (event.updated_at, compiled)
+        _email_template_cache.move_to_end(event.pk)
+        while len(_email_template_cache) > EMAIL_TEMPLATE_CACHE_SIZE:
+            _email_template_cache.popitem(last=False)
+    return compiled
+
+
+def _build_event_rendered_content(event, attendee):
+    return get_compiled_event_email(event).render_fields(attendee)
 
 
 def build_event_share_text(event, attendee, qr_url="", flyer_url=""):
@@ -456,80 +967,51 @@ def build_whatsapp_share_card_png(attendee):
     return output.getvalue()
 
 
-def build_event_email_payload(event, attendee, flyer_cid="", flyer_data_uri="", flyer_url="", qr_cid="", qr_data_uri=""):
-    rendered, price_text = _build_event_rendered_content(event, attendee)
-
-    flyer_html = ""
-    if flyer_url:
-        flyer_html = """
-            <div class="flyer-wrapper">
-                <img src="{flyer_url}" alt="Flyer del evento">
-            </div>
-        """.format(flyer_url=escape(flyer_url))
-    elif flyer_cid:
-        flyer_html = """
-            <div class="flyer-wrapper">
-                <img src="cid:{flyer_cid}" alt="Flyer del evento">
-            </div>
-        """.format(flyer_cid=escape(flyer_cid))
-    elif flyer_data_uri:
-        flyer_html = """
-            <div class="flyer-wrapper">
-                <img src="{flyer_data_uri}" alt="Flyer del evento">
-            </div>
-        """.format(flyer_data_uri=flyer_data_uri)
-
-    qr_html = ""
-    if qr_cid:
-        qr_html = """
-            <div class="qr-wrapper">
-                <div class="qr-frame">
-                    <img src="cid:{qr_cid}" alt="Codigo QR">
-                </div>
-            </div>
-        """.format(qr_cid=escape(qr_cid))
-    elif qr_data_uri:
-        qr_html = """
-            <div class="qr-wrapper">
-                <div class="qr-frame">
-                    <img src="{qr_data_uri}" alt="Codigo QR">
-                </div>
-            </div>
-        """.format(qr_data_uri=qr_data_uri)
+def _whatsapp_card_inputs_key(attendee):
+    event = attendee.event
+    flyer_asset = get_media_asset(event, "event_flyer")
+    qr_asset = get_media_asset(attendee, "attendee_qr")
+    inputs = [
+        WHATSAPP_CARD_VERSION,
+        attendee.qr_code,
+        attendee.name,
+        attendee.cc,
+        attendee.category.name,
+        event.name,
+        event.starts_at,
+        event.email_footer,
+        event.email_team_signature,
+        flyer_asset.checksum if flyer_asset else getattr(event.flyer, "name", ""),
+        qr_asset.checksum if qr_asset else getattr(attendee.qr_image, "name", ""),
+    ]
+    return hashlib.sha256("\x1f".join(str(value or "") for value in inputs).encode("utf-8")).hexdigest()
 
-    maps_html = "<span>No configurada</span>"
-    if event.maps_url:
-        maps_html = f'<a href="{escape(event.maps_url)}">{escape(rendered["maps_label"])}</a>'
 
-    text_content = "\n\n".join(
-        part
-        for part in [
-            rendered["heading"],
-            rendered["intro"],
-            rendered["body"],
-            f'{rendered["warning_title"]}: {rendered["warning_text"]}' if rendered["warning_text"] else "",
-            f"Evento: {event.name}",
-            f'Fecha: {rendered["date_text"]}',
-            f'Hora: {rendered["time_text"]}',
-            f'Lugar: {rendered["venue_name"]}',
-            f'Dress code: {rendered["dress_code"]}',
-            "Codigo QR visible al final del correo y adjunto como imagen.",
-            rendered["qr_note"],
-            rendered["footer"],
-            rendered["closing_text"],
-            rendered["team_signature"],
-        ]
-        if part
+def get_whatsapp_share_card_asset(attendee):
+    ensure_attendee_qr(attendee)
+    card_name = f"{WHATSAPP_CARD_DIR}/{attendee.qr_code}-{_whatsapp_card_inputs_key(attendee)[:20]}.png"
+    asset = get_media_asset(attendee, "attendee_share_card")
+    if asset and asset.file.name == card_name and default_storage.exists(card_name):
+        return asset
+    return persist_derived_asset(
+        attendee,
+        "attendee_share_card",
+        card_name,
+        build_whatsapp_share_card_png(attendee),
+        width=1200,
+        height=630,
     )
 
-    html_content = f"""
+
+def _build_event_email_html(event, slots):
+    return f"""
     <!DOCTYPE html>
     <html>
     <head>
       <meta charset="UTF-8">
       <meta name="viewport" content="width=device-width, initial-scale=1.0">
       <meta name="x-apple-disable-message-reformatting">
-      <title>{escape(rendered["subject"])}</title>
+      <title>{slots["subject"]}</title>
       <style>
         body, p, h1, h2, h3 {{ margin: 0; padding: 0; }}
         body {{
@@ -657,59 +1139,136 @@ def build_event_email_payload(event, attendee, flyer_cid="", flyer_data_uri="",
       <div class="container">
         <div class="header">
           <h1>{escape(event.name)}</h1>
-          <p>{escape(rendered["preheader"])}</p>
+          <p>{slots["preheader"]}</p>
         </div>
         <div class="content">
           <div class="copy">
-            <h2>{escape(rendered["heading"])}</h2>
-            <p>{_multiline_html(rendered["intro"])}</p>
+            <h2>{slots["heading"]}</h2>
+            <p>{slots["intro"]}</p>
           </div>
 
           <div class="box highlight">
-            <span class="box-title">{escape(rendered["message_title"])}</span>
-            <div>{_render_email_body_html(rendered["body"], attendee.qr_code)}</div>
+            <span class="box-title">{slots["message_title"]}</span>
+            <div>{slots["body"]}</div>
           </div>
 
           <div class="box warning">
-            <span class="box-title">{escape(rendered["warning_title"])}</span>
-            <div>{_multiline_html(rendered["warning_text"])}</div>
+            <span class="box-title">{slots["warning_title"]}</span>
+            <div>{slots["warning_text"]}</div>
           </div>
-          {flyer_html}
+          {slots["flyer_html"]}
           <div class="box details">
-            <span class="box-title">{escape(rendered["details_title"])}</span>
+            <span class="box-title">{slots["details_title"]}</span>
             <p><strong>Evento:</strong> {escape(event.name)}</p>
-            <p><strong>Fecha:</strong> {escape(rendered["date_text"])}</p>
-            <p><strong>Hora:</strong> {escape(rendered["time_text"])}</p>
-            <p><strong>Lugar:</strong> {escape(rendered["venue_name"])}</p>
-            <p><strong>Ubicacion:</strong> {maps_html}</p>
-            <p><strong>Dress code:</strong> <span class="closing-brand">{escape(rendered["dress_code"])}</span></p>
+            <p><strong>Fecha:</strong> {slots["date_text"]}</p>
+            <p><strong>Hora:</strong> {slots["time_text"]}</p>
+            <p><strong>Lugar:</strong> {slots["venue_name"]}</p>
+            <p><strong>Ubicacion:</strong> {slots["maps_html"]}</p>
+            <p><strong>Dress code:</strong> <span class="closing-brand">{slots["dress_code"]}</span></p>
           </div>
 
           <div class="box ticket">
-            <p><strong>Nombre:</strong> {escape(attendee.name)}</p>
-            <p><strong>Cedula:</strong> {escape(attendee.cc)}</p>
-            <p><strong>Categoria:</strong> {escape(attendee.category.name)}</p>
-            <p><strong>Precio:</strong> {escape(price_text)}</p>
-            <p class="ticket-title">{escape(rendered["qr_title"])}</p>
-            <p class="muted">{escape(rendered["qr_note"])}</p>
+            <p><strong>Nombre:</strong> {slots["attendee_name"]}</p>
+            <p><strong>Cedula:</strong> {slots["attendee_cc"]}</p>
+            <p><strong>Categoria:</strong> {slots["category_name"]}</p>
+            <p><strong>Precio:</strong> {slots["category_price"]}</p>
+            <p class="ticket-title">{slots["qr_title"]}</p>
+            <p class="muted">{slots["qr_note"]}</p>
           </div>
 
           <div class="copy">
-            <p class="closing-brand">{escape(rendered["footer"])}</p>
-            <p>{escape(rendered["closing_text"])}</p>
-            <p class="closing-brand">{escape(rendered["team_signature"])}</p>
+            <p class="closing-brand">{slots["footer"]}</p>
+            <p>{slots["closing_text"]}</p>
+            <p class="closing-brand">{slots["team_signature"]}</p>
           </div>
 
-          {qr_html}
+          {slots["qr_html"]}
         </div>
         <div class="footer">
-          <p>{escape(rendered["legal_note"])}</p>
+          <p>{slots["legal_note"]}</p>
         </div>
       </div>
     </body>
     </html>
     """
 
+
+def build_event_email_payload(event, attendee, flyer_cid="", flyer_data_uri="", flyer_url="", qr_cid="", qr_data_uri=""):
+    template = get_compiled_event_email(event)
+    rendered, price_text = template.render_fields(attendee)
+
+    flyer_html = ""
+    if flyer_url:
+        flyer_html = """
+            <div class="flyer-wrapper">
+                <img src="{flyer_url}" alt="Flyer del evento">
+            </div>
+        """.format(flyer_url=escape(flyer_url))
+    elif flyer_cid:
+        flyer_html = """
+            <div class="flyer-wrapper">
+                <img src="cid:{flyer_cid}" alt="Flyer del evento">
+            </div>
+        """.format(flyer_cid=escape(flyer_cid))
+    elif flyer_data_uri:
+        flyer_html = """
+            <div class="flyer-wrapper">
+                <img src="{flyer_data_uri}" alt="Flyer del evento">
+            </div>
+        """.format(flyer_data_uri=flyer_data_uri)
+
+    qr_html = ""
+    if qr_cid:
+        qr_html = """
+            <div class="qr-wrapper">
+                <div class="qr-frame">
+                    <img src="cid:{qr_cid}" alt="Codigo QR">
+                </div>
+            </div>
+        """.format(qr_cid=escape(qr_cid))
+    elif qr_data_uri:
+        qr_html = """
+            <div class="qr-wrapper">
+                <div class="qr-frame">
+                    <img src="{qr_data_uri}" alt="Codigo QR">
+                </div>
+            </div>
+        """.format(qr_data_uri=qr_data_uri)
+
+    text_content = "\n\n".join(
+        part
+        for part in [
+            rendered["heading"],
+            rendered["intro"],
+            rendered["body"],
+            f'{rendered["warning_title"]}: {rendered["warning_text"]}' if rendered["warning_text"] else "",
+            f"Evento: {event.name}",
+            f'Fecha: {rendered["date_text"]}',
+            f'Hora: {rendered["time_text"]}',
+            f'Lugar: {rendered["venue_name"]}',
+            f'Dress code: {rendered["dress_code"]}',
+            "Codigo QR visible al final del correo y adjunto como imagen.",
+            rendered["qr_note"],
+            rendered["footer"],
+            rendered["closing_text"],
+            rendered["team_signature"],
+        ]
+        if part
+    )
+
+    html_content = template.render_html(
+        rendered,
+        {
+            "body": _render_email_body_html(rendered["body"], attendee.qr_code),
+            "flyer_html": flyer_html,
+            "qr_html": qr_html,
+            "attendee_name": escape(attendee.name),
+            "attendee_cc": escape(attendee.cc),
+            "category_name": escape(attendee.category.name),
+            "category_price": escape(price_text),
+        },
+    )
+
     return {
         "subject": rendered["subject"],
         "text_content": text_content,
@@ -717,19 +1276,81 @@ def build_event_email_payload(event, attendee, flyer_cid="", flyer_data_uri="",
     }
 
 
-def send_attendee_ticket_email(attendee):
-    if not attendee.email:
-        return False, "El asistente no tiene correo."
+def _is_smtp_auth_not_supported(exc):
+    return isinstance(exc, smtplib.SMTPNotSupportedError) or "auth extension not supported" in str(exc).lower()
 
-    if not attendee.qr_image:
-        generate_attendee_qr(attendee)
 
-    flyer_file = resolve_field_file(attendee.event, "flyer", "event_flyer") or getattr(attendee.event, "flyer", None)
-    flyer_png = _file_to_png_bytes(flyer_file)
+class TicketEmailSender:
+    def __init__(self, max_messages_per_connection=None, **connection_kwargs):
+        if max_messages_per_connection is None:
+            max_messages_per_connection = getattr(settings, "EMAIL_MAX_MESSAGES_PER_CONNECTION", 100)
+        self.max_messages_per_connection = max(int(max_messages_per_connection), 1)
+        self.connection_kwargs = connection_kwargs
+        self.connection = None
+        self.connections_opened = 0
+        self.sent_on_connection = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def open(self):
+        if self.connection is None:
+            connection = get_connection(**self.connection_kwargs)
+            connection.open()
+            self.connection = connection
+            self.connections_opened += 1
+            self.sent_on_connection = 0
+        return self.connection
+
+    def close(self):
+        connection, self.connection = self.connection, None
+        if connection is None:
+            return
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _send_once(self, email_message):
+        if self.sent_on_connection >= self.max_messages_per_connection:
+            self.close()
+        email_message.connection = self.open()
+        email_message.send()
+        self.sent_on_connection += 1
+
+    def send(self, email_message):
+        try:
+            self._send_once(email_message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._send_once(email_message)
+        except smtplib.SMTPException as exc:
+            if not _is_smtp_auth_not_supported(exc):
+                raise
+            self.close()
+            self.connection_kwargs.update(username="", password="")
+            self._send_once(email_message)
+        except OSError:
+            self.close()
+            self._send_once(email_message)
+
+
+def build_attendee_ticket_email(attendee):
+    ensure_attendee_qr(attendee)
+
+    flyer_png = _email_attachment_png(
+        attendee.event,
+        "flyer",
+        "event_flyer",
+        max_width=getattr(settings, "EMAIL_FLYER_MAX_WIDTH", 0),
+        spill_to_disk=True,
+    )
     flyer_cid = "event_flyer_inline" if flyer_png else ""
 
-    qr_file = resolve_field_file(attendee, "qr_image", "attendee_qr") or getattr(attendee, "qr_image", None)
-    qr_bytes = _file_to_png_bytes(qr_file)
+    qr_bytes = _email_attachment_png(attendee, "qr_image", "attendee_qr")
     if not qr_bytes:
         qr_bytes = build_qr_png_bytes(attendee.qr_code, attendee.event, attendee.branch)
     qr_cid = "event_qr_inline" if qr_bytes else ""
@@ -740,62 +1361,44 @@ def send_attendee_ticket_email(attendee):
         qr_cid=qr_cid,
     )
 
-    def build_email(connection=None):
-        email = RelatedEmailMultiAlternatives(
-            subject=payload["subject"],
-            body=payload["text_content"],
-            from_email=getattr(settings, "DEFAULT_FROM_EMAIL", None),
-            to=[attendee.email],
-            connection=connection,
+    email = RelatedEmailMultiAlternatives(
+        subject=payload["subject"],
+        body=payload["text_content"],
+        from_email=getattr(settings, "DEFAULT_FROM_EMAIL", None),
+        to=[attendee.email],
+    )
+    email.attach_alternative(payload["html_content"], "text/html")
+
+    if qr_bytes:
+        email.attach_inline_image(
+            qr_bytes,
+            qr_cid,
+            f"{attendee.qr_code}.png",
+            mimetype="image/png",
         )
-        email.attach_alternative(payload["html_content"], "text/html")
-
-        if qr_bytes:
-            email.attach_inline_image(
-                qr_bytes,
-                qr_cid,
-                f"{attendee.qr_code}.png",
-                mimetype="image/png",
-            )
-        if flyer_png:
-            email.attach_inline_image(
-                flyer_png,
-                flyer_cid,
-                f"{attendee.event.slug or attendee.event.pk}-flyer.png",
-                mimetype="image/png",
-            )
-        return email
-
-    def send_email_once(connection=None):
-        email_message = build_email(connection=connection)
-        backend = email_message.connection or get_connection()
-        email_message.connection = backend
-        try:
-            backend.open()
-            email_message.send()
-        finally:
-            try:
-                backend.close()
-            except Exception:
-                pass
+    if flyer_png:
+        email.attach_inline_image(
+            flyer_png,
+            flyer_cid,
+            f"{attendee.event.slug or attendee.event.pk}-flyer.png",
+            mimetype="image/png",
+        )
+    return email
+
 
+def send_attendee_ticket_email(attendee, sender=None):
+    if not attendee.email:
+        return False, "El asistente no tiene correo."
+
+    owns_sender = sender is None
+    if owns_sender:
+        sender = TicketEmailSender()
     try:
-        send_email_once()
-    except smtplib.SMTPException as exc:
-        message = str(exc)
-        if not isinstance(exc, smtplib.SMTPNotSupportedError) and "auth extension not supported" not in message.lower():
-            return False, message
-        try:
-            fallback_connection = get_connection(username="", password="")
-            send_email_once(connection=fallback_connection)
-        except Exception as fallback_exc:
-            return False, str(fallback_exc)
-    except OSError as exc:
-        try:
-            send_email_once()
-        except Exception as retry_exc:
-            return False, str(retry_exc)
+        sender.send(build_attendee_ticket_email(attendee))
     except Exception as exc:
         return False, str(exc)
+    finally:
+        if owns_sender:
+            sender.close()
 
     return True, "Correo enviado."
@@ -0,0 +1,114 @@
+from html import escape
+from io import BytesIO
+
+import qrcode
+from PIL import Image
+
+# Kept free of Django imports so process pool workers can load it on any start method.
+
+QR_BOX_SIZE = 10
+
+
+def _build_qr(code):
+    # Give the reader more quiet zone and module size before adding the centered logo.
+    qr = qrcode.QRCode(box_size=QR_BOX_SIZE, border=4, error_correction=qrcode.constants.ERROR_CORRECT_H)
+    qr.add_data(code)
+    qr.make(fit=True)
+    return qr
+
+
+def build_qr_matrix_image(code, fill_color, back_color):
+    return _build_qr(code).make_image(fill_color=fill_color, back_color=back_color).convert("RGBA")
+
+
+def build_qr_matrix(code):
+    return _build_qr(code).get_matrix()
+
+
+def qr_image_width(code):
+    qr = _build_qr(code)
+    return (qr.modules_count + qr.border * 2) * qr.box_size
+
+
+def qr_overlay_size(logo_scale, image_width):
+    logo_scale = max(int(logo_scale or 4), 2)
+    overlay_size = max(image_width // logo_scale, 48)
+    return min(overlay_size, max(image_width // 4, 48))
+
+
+def compose_qr_badge(image, badge):
+    position = ((image.width - badge.width) // 2, (image.height - badge.height) // 2)
+    image.alpha_composite(badge, dest=position)
+    return image
+
+
+def encode_qr_webp(image):
+    output = BytesIO()
+    image.convert("RGB").save(output, format="WEBP", quality=88, method=6)
+    return output.getvalue()
+
+
+def badge_to_payload(badge):
+    if badge is None:
+        return None
+    return (badge.width, badge.height, badge.tobytes())
+
+
+def badge_from_payload(payload):
+    if not payload:
+        return None
+    width, height, raw = payload
+    return Image.frombytes("RGBA", (width, height), raw)
+
+
+def render_qr_webp_batch(codes, fill_color, back_color, logo_scale, badge_payload):
+    badge = badge_from_payload(badge_payload)
+    rendered = []
+    for code in codes:
+        image = build_qr_matrix_image(code, fill_color, back_color)
+        if badge is not None:
+            overlay_size = qr_overlay_size(logo_scale, image.width)
+            code_badge = badge
+            if badge.width != overlay_size:
+                code_badge = badge.resize((overlay_size, overlay_size), Image.Resampling.LANCZOS)
+            compose_qr_badge(image, code_badge)
+        rendered.append((code, encode_qr_webp(image), image.width, image.height))
+    return rendered
+
+
+def render_qr_svg(matrix, fill_color, back_color, badge_href="", badge_size=0):
+    # Each run of dark modules becomes a one-unit stroke along its row, using relative moves
+    # within the row, which keeps the markup to a couple of KB even for long codes.
+    size = len(matrix)
+    commands = []
+    for y, row in enumerate(matrix):
+        x = 0
+        cursor = None
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            if cursor is None:
+                commands.append(f"M{start} {y}.5h{x - start}")
+            else:
+                commands.append(f"m{start - cursor} 0h{x - start}")
+            cursor = x
+
+    pixels = size * QR_BOX_SIZE
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" height="{pixels}" '
+        f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">',
+        f'<rect width="{size}" height="{size}" fill="{escape(back_color)}"/>',
+        f'<path stroke="{escape(fill_color)}" d="{"".join(commands)}"/>',
+    ]
+    if badge_href and badge_size:
+        offset = (size - badge_size) / 2
+        parts.append(
+            f'<image href="{escape(badge_href)}" x="{offset:g}" y="{offset:g}" '
+            f'width="{badge_size:g}" height="{badge_size:g}"/>'
+        )
+    parts.append("</svg>")
+    return "".join(parts)